@@ -0,0 +1,71 @@
+"""work time minutes of the week
+
+Revision ID: 3f9d5f37fa55
+Revises: 41d1b265b4a0
+Create Date: 2026-10-18 17:52:41.218406
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9d5f37fa55'
+down_revision: Union[str, None] = '41d1b265b4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DAY = 24 * 60
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+TIME = re.compile(r"(\d{1,2})[:.](\d{2})")
+
+
+# A copy of services/schedule_index.interval as of this revision, returning None for rows it can't read
+def interval(day_of_week, opening_time, closing_time):
+    day_name = (day_of_week or "").strip().lower()
+    days = [number for number, name in enumerate(DAY_NAMES) if day_name in (name, name[:3])]
+    times = [TIME.fullmatch((value or "").strip()) for value in (opening_time, closing_time)]
+    if not days or not all(times):
+        return None
+
+    minutes = []
+    for match in times:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if minute > 59 or hour > 24 or (hour == 24 and minute):
+            return None
+        minutes.append(hour * 60 + minute)
+
+    start = days[0] * DAY + minutes[0]
+    end = days[0] * DAY + minutes[1]
+    return start, end + DAY if end <= start else end
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('work_time', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('open_minute', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('close_minute', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_work_time_open_minute_close_minute', ['open_minute', 'close_minute'], unique=False)
+
+    # Rows whose strings can't be read keep NULL minutes and are left out of the "open" lookups
+    work_time = sa.table('work_time', sa.column('work_time_id', sa.Integer), sa.column('day_of_week', sa.String),
+                         sa.column('opening_time', sa.String), sa.column('closing_time', sa.String),
+                         sa.column('open_minute', sa.Integer), sa.column('close_minute', sa.Integer))
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(work_time.c.work_time_id, work_time.c.day_of_week,
+                                        work_time.c.opening_time, work_time.c.closing_time)).all()
+    for row in rows:
+        minutes = interval(row.day_of_week, row.opening_time, row.closing_time)
+        if minutes is not None:
+            connection.execute(work_time.update().where(work_time.c.work_time_id == row.work_time_id)
+                               .values(open_minute=minutes[0], close_minute=minutes[1]))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('work_time', schema=None) as batch_op:
+        batch_op.drop_index('ix_work_time_open_minute_close_minute')
+        batch_op.drop_column('close_minute')
+        batch_op.drop_column('open_minute')
@@ -0,0 +1,44 @@
+"""catalog updated_at
+
+Revision ID: 41d1b265b4a0
+Revises: 98ec65b0b58a
+Create Date: 2026-10-18 17:17:55.585735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '41d1b265b4a0'
+down_revision: Union[str, None] = '98ec65b0b58a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CATALOG_TABLES = ["foods", "drinks", "restaurants"]
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+
+    for table in CATALOG_TABLES:
+        # Plain ALTERs rather than batch mode: a SQLite table rebuild would drop the full-text search triggers
+        if dialect == "mysql":
+            op.add_column(table, sa.Column('updated_at', mysql.TIMESTAMP(fsp=6), nullable=False,
+                                           server_default=sa.text('CURRENT_TIMESTAMP(6)')))
+        else:
+            # SQLite can't add a column with a non-constant default, so existing rows are backfilled
+            op.add_column(table, sa.Column('updated_at', sa.TIMESTAMP(), nullable=False,
+                                           server_default='1970-01-01 00:00:00'))
+            op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(CATALOG_TABLES):
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,70 @@
+"""order lines and idempotency keys
+
+Revision ID: 50437f796413
+Revises: 3f9d5f37fa55
+Create Date: 2026-10-18 18:21:07.493120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '50437f796413'
+down_revision: Union[str, None] = '3f9d5f37fa55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('total_price', sa.Integer(), nullable=True))
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite can't add a column with a non-constant default, so existing rows are backfilled
+        op.add_column('orders', sa.Column('created_at', sa.TIMESTAMP(), nullable=False,
+                                          server_default='1970-01-01 00:00:00'))
+        op.execute("UPDATE orders SET created_at = CURRENT_TIMESTAMP")
+    else:
+        op.add_column('orders', sa.Column('created_at', sa.TIMESTAMP(), nullable=False,
+                                          server_default=sa.text('CURRENT_TIMESTAMP')))
+    op.create_index('ix_orders_user_id_order_id', 'orders', ['user_id', 'order_id'], unique=False)
+
+    op.create_table('order_lines',
+    sa.Column('order_line_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('food_id', sa.Integer(), nullable=True),
+    sa.Column('drink_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['drink_id'], ['drinks.drink_id'], ),
+    sa.ForeignKeyConstraint(['food_id'], ['foods.food_id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.order_id'], ),
+    sa.PrimaryKeyConstraint('order_line_id')
+    )
+    op.create_index('ix_order_lines_order_id', 'order_lines', ['order_id'], unique=False)
+
+    op.create_table('idempotency_keys',
+    sa.Column('idempotency_key_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.order_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('idempotency_key_id')
+    )
+    op.create_index('uq_idempotency_keys_user_id_key', 'idempotency_keys', ['user_id', 'key'], unique=True)
+    op.create_index('ix_idempotency_keys_created_at', 'idempotency_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_keys_created_at', table_name='idempotency_keys')
+    op.drop_index('uq_idempotency_keys_user_id_key', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
+    op.drop_index('ix_order_lines_order_id', table_name='order_lines')
+    op.drop_table('order_lines')
+    op.drop_index('ix_orders_user_id_order_id', table_name='orders')
+    op.drop_column('orders', 'created_at')
+    op.drop_column('orders', 'total_price')
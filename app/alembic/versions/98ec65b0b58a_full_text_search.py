@@ -0,0 +1,65 @@
+"""full text search
+
+Revision ID: 98ec65b0b58a
+Revises: 73e11b295284
+Create Date: 2026-10-18 17:14:00.998831
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '98ec65b0b58a'
+down_revision: Union[str, None] = '73e11b295284'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table, primary key, indexed columns (kept in step with services/search.py SEARCH_FIELDS)
+SEARCH_TABLES = [
+    ("foods", "food_id", ["food_name", "description"]),
+    ("drinks", "drink_id", ["drink_name", "description"]),
+    ("restaurants", "restaurant_id", ["restaurant_name", "description"]),
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+
+    for table, primary_key, columns in SEARCH_TABLES:
+        if dialect == "mysql":
+            op.create_index(f"ft_{table}", table, columns, mysql_prefix="FULLTEXT")
+
+        elif dialect == "sqlite":
+            # External-content FTS5 table: the index only, kept in sync with the base table by triggers
+            fts = f"{table}_fts"
+            names = ", ".join(columns)
+            new_values = ", ".join(f"new.{name}" for name in columns)
+            old_values = ", ".join(f"old.{name}" for name in columns)
+
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', "
+                       f"content_rowid='{primary_key}')")
+            op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                       f"INSERT INTO {fts}(rowid, {names}) VALUES (new.{primary_key}, {new_values}); END")
+            op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                       f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.{primary_key}, {old_values}); END")
+            op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                       f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.{primary_key}, {old_values}); "
+                       f"INSERT INTO {fts}(rowid, {names}) VALUES (new.{primary_key}, {new_values}); END")
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+
+    for table, primary_key, columns in reversed(SEARCH_TABLES):
+        if dialect == "mysql":
+            op.drop_index(f"ft_{table}", table_name=table)
+
+        elif dialect == "sqlite":
+            fts = f"{table}_fts"
+            for suffix in ("au", "ad", "ai"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,51 @@
+"""work time updated_at and deleted row tombstones
+
+Revision ID: ae525727e3b0
+Revises: 50437f796413
+Create Date: 2026-10-18 19:04:12.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ae525727e3b0'
+down_revision: Union[str, None] = '50437f796413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+
+    if dialect == "mysql":
+        op.add_column('work_time', sa.Column('updated_at', mysql.TIMESTAMP(fsp=6), nullable=False,
+                                             server_default=sa.text('CURRENT_TIMESTAMP(6)')))
+    else:
+        # SQLite can't add a column with a non-constant default, so existing rows are backfilled
+        op.add_column('work_time', sa.Column('updated_at', sa.TIMESTAMP(), nullable=False,
+                                             server_default='1970-01-01 00:00:00'))
+        op.execute("UPDATE work_time SET updated_at = CURRENT_TIMESTAMP")
+    op.create_index('ix_work_time_updated_at', 'work_time', ['updated_at'], unique=False)
+
+    updated_at = mysql.TIMESTAMP(fsp=6) if dialect == "mysql" else sa.TIMESTAMP()
+    op.create_table('deleted_rows',
+    sa.Column('deleted_row_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', updated_at, nullable=False),
+    sa.PrimaryKeyConstraint('deleted_row_id')
+    )
+    op.create_index('ix_deleted_rows_table_name_deleted_at', 'deleted_rows', ['table_name', 'deleted_at'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deleted_rows_table_name_deleted_at', table_name='deleted_rows')
+    op.drop_table('deleted_rows')
+    op.drop_index('ix_work_time_updated_at', table_name='work_time')
+    op.drop_column('work_time', 'updated_at')
@@ -1,11 +1,11 @@
 from fastapi import HTTPException, status, Depends, APIRouter, Form
-from fastapi.responses import JSONResponse
+from services.serializers import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from core import security
 from schemas.shemas import AddCard
 from models.models import Card
-from database import get_db
+from database import get_db, get_read_db
 
 
 card_router = APIRouter(tags=["cards"], prefix="/api/cards")
@@ -17,7 +17,7 @@ headers = {"Access-Control-Allow-Origin": "*",
 
 
 @card_router.post("/add-card")
-def add_card(card_data: AddCard, db: Session = Depends(get_db), current_user = Depends(security.get_current_user)):
+def add_card(card_data: AddCard, db: Session = Depends(get_db), current_user = Depends(security.current_user)):
     user_id = dict(current_user).get("user_id")
 
     new_card = Card(
@@ -37,14 +37,14 @@ def add_card(card_data: AddCard, db: Session = Depends(get_db), current_user = D
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": f"There was an error adding the card. ERROR: {error}"})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Card successfully added"},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Card successfully added"},
+                          headers=headers)
 
 
 
 @card_router.delete("/delete-card-by-id/{card_id}")
-def delete_card_by_id(card_id: int, db: Session = Depends(get_db), current_user=Depends(security.get_current_user)):
+def delete_card_by_id(card_id: int, db: Session = Depends(get_db), current_user=Depends(security.current_user)):
     user_id = dict(current_user).get("user_id")
 
     card = db.query(Card).filter(Card.card_id == card_id).first()
@@ -61,9 +61,9 @@ def delete_card_by_id(card_id: int, db: Session = Depends(get_db), current_user=
         db.delete(card)
         db.commit()
 
-        return JSONResponse(status_code=status.HTTP_200_OK,
-                            content={"message": "Successfully deleted"},
-                            headers=headers)
+        return ORJSONResponse(status_code=status.HTTP_200_OK,
+                              content={"message": "Successfully deleted"},
+                              headers=headers)
 
     except Exception as error:
         db.rollback()
@@ -73,7 +73,7 @@ def delete_card_by_id(card_id: int, db: Session = Depends(get_db), current_user=
 
 
 @card_router.get("/get-card-by-id/{card_id}")
-def get_card_by_id(card_id: int,  db: Session = Depends(get_db), current_user=Depends(security.get_current_user)):
+def get_card_by_id(card_id: int,  db: Session = Depends(get_read_db), current_user=Depends(security.current_user)):
     user_id = dict(current_user).get("user_id")
 
     try:
@@ -87,16 +87,16 @@ def get_card_by_id(card_id: int,  db: Session = Depends(get_db), current_user=De
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="You do not have permission to access this card.")
 
-        return JSONResponse(status_code=status.HTTP_200_OK,
-                            content={
-                                "card_id": card.card_id,
-                                "card_number": card.card_number,
-                                "card_valid_thru": card.card_valid_thru,
-                                "card_name": card.card_name,
-                                "card_cvv": card.card_cvv,
-                                "user_id": card.user_id
-                            },
-                            headers=headers)
+        return ORJSONResponse(status_code=status.HTTP_200_OK,
+                              content={
+                                  "card_id": card.card_id,
+                                  "card_number": card.card_number,
+                                  "card_valid_thru": card.card_valid_thru,
+                                  "card_name": card.card_name,
+                                  "card_cvv": card.card_cvv,
+                                  "user_id": card.user_id
+                              },
+                              headers=headers)
 
     except Exception as error:
         db.rollback()
@@ -106,7 +106,7 @@ def get_card_by_id(card_id: int,  db: Session = Depends(get_db), current_user=De
 
 
 @card_router.get("/get-all-cards-by-user")
-def get_all_cards_by_user(db: Session = Depends(get_db), current_user = Depends(security.get_current_user)):
+def get_all_cards_by_user(db: Session = Depends(get_read_db), current_user = Depends(security.current_user)):
     user_id = dict(current_user).get("user_id")
 
     try:
@@ -116,7 +116,7 @@ def get_all_cards_by_user(db: Session = Depends(get_db), current_user = Depends(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail={"message": "User doesn't have cards"})
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content=[
                 {
@@ -141,7 +141,7 @@ def get_all_cards_by_user(db: Session = Depends(get_db), current_user = Depends(
 
 
 @card_router.put("/change-main-card/{card_id}")
-def change_main_card(card_id: int, db: Session = Depends(get_db), current_user=Depends(security.get_current_user)):
+def change_main_card(card_id: int, db: Session = Depends(get_db), current_user=Depends(security.current_user)):
     user_id = dict(current_user).get("user_id")
 
     card = db.query(Card).filter(Card.card_id == card_id).first()
@@ -170,7 +170,7 @@ def change_main_card(card_id: int, db: Session = Depends(get_db), current_user=D
         card.status = True
         db.commit()
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={"message": f"{card_id} is now the main card"}
         )
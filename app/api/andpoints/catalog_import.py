@@ -0,0 +1,95 @@
+import os
+import zipfile
+from enum import Enum
+
+from fastapi import HTTPException, status, APIRouter, UploadFile, File, Depends, Query
+from sqlalchemy.orm import Session
+
+from api.andpoints.drinks import Drink
+from api.andpoints.food import FoodKind
+from models.models import Food, Drinks, Restaurant
+from schemas.shemas import ImportFood, ImportDrink
+from services import catalog_counters, catalog_import
+from services.cache import catalog_cache
+from services.serializers import ORJSONResponse
+from database import get_db
+
+IMPORT_PREFIX = "/api/import"
+
+catalog_import_router = APIRouter(tags=["import"], prefix=IMPORT_PREFIX)
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+class ImportType(str, Enum):
+    foods = "foods"
+    drinks = "drinks"
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+# Model, row schema, allowed kinds, image directory and placeholder image per import type
+import_targets = {
+    ImportType.foods: (Food, ImportFood, {kind.value for kind in FoodKind}, "food", "default_food.jpeg"),
+    ImportType.drinks: (Drinks, ImportDrink, {kind.value for kind in Drink}, "drink", "default_drink_image.jpeg"),
+}
+
+format_extensions = {".csv": ImportFormat.csv, ".ndjson": ImportFormat.ndjson, ".jsonl": ImportFormat.ndjson}
+
+
+@catalog_import_router.post("/{restaurant_id}")
+def import_catalog(restaurant_id: int,
+                   type: ImportType = Query(..., description="Import foods or drinks"),
+                   format: ImportFormat | None = Query(default=None, description="Default: from the file extension"),
+                   items: UploadFile = File(..., description="CSV with a header row, or one JSON object per line"),
+                   images: UploadFile | None = File(default=None, description="Zip with the images the rows name"),
+                   db: Session = Depends(get_db)):
+    model, schema, kinds, image_kind, default_image = import_targets[type]
+
+    if db.get(Restaurant, restaurant_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Restaurant with id {restaurant_id} was not found!")
+
+    file_format = format or format_extensions.get(os.path.splitext(items.filename or "")[1].lower())
+    if file_format is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Unknown file format, pass format=csv or format=ndjson")
+
+    archive = None
+    if images is not None:
+        try:
+            archive = zipfile.ZipFile(images.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="images must be a zip archive")
+
+    if file_format == ImportFormat.csv:
+        rows = catalog_import.read_csv(items.file)
+    else:
+        rows = catalog_import.read_ndjson(items.file)
+    resolver = catalog_import.ImageResolver(image_kind, archive, default_image)
+
+    try:
+        result = catalog_import.import_rows(db, model, schema, kinds, restaurant_id, rows, resolver)
+        db.commit()
+    except Exception as error:
+        db.rollback()
+        if isinstance(error, HTTPException):
+            raise
+        if isinstance(error, UnicodeDecodeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="items must be UTF-8 encoded")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"An error occurred while importing {type.value}. ERROR: {error}"})
+
+    if result["imported"]:
+        catalog_counters.invalidate(model)
+        catalog_cache.invalidate(model.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": f"Imported {result['imported']} {type.value}", **result},
+                          headers=headers)
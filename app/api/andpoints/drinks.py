@@ -1,12 +1,19 @@
-from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query, Request
+from fastapi.responses import FileResponse
+from services.serializers import ORJSONResponse, model_to_dict, row_to_dict
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import Drinks
 from schemas.shemas import UpdateDrink
-import datetime
 import os
-import shutil
-from database import get_db
+from core import config
+from services import pagination, catalog_counters, catalog_query
+from services.catalog_query import SortOrder
+from services.cache import catalog_cache
+from services import http_cache, image_store, image_variants, serializers
+from services.image_variants import ImageSize
+from database import get_db, get_read_db, get_async_read_db
 
 drink_router = APIRouter(tags=["drink"], prefix="/api/drink")
 
@@ -35,12 +42,15 @@ def add_drink(
     image_drink: UploadFile = File(...),
     db: Session = Depends(get_db)):
 
-    current_date_time = datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-    drink_image_name = f"drink_image_{current_date_time}.{image_drink.filename.split('.')[-1]}"
-    image_directory = f"{os.getcwd()}/static/images/drink"
-
-    if not os.path.exists(image_directory):
-        os.makedirs(image_directory)
+    try:
+        drink_image_name = image_store.save("drink", image_drink)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": f"Error saving image: {error}"}
+        )
 
     new_drink = Drinks(
         kind=kind,
@@ -64,19 +74,12 @@ def add_drink(
             detail={"message": f"Database error: {error}"}
         )
 
-    try:
-        with open(f"{image_directory}/{drink_image_name}", "wb") as file_object:
-            shutil.copyfileobj(image_drink.file, file_object)
+    catalog_counters.adjust(Drinks, 1, kind, restaurant_id)
+    catalog_cache.invalidate(Drinks.__tablename__)
 
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"Error saving image: {error}"}
-        )
-
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
-        content={"message": "Drink successfully added"},
+        content={"message": "Drink successfully added", "image_url": image_store.url("drink", drink_image_name)},
         headers=headers
     )
 
@@ -88,6 +91,7 @@ def update_drink(drink_id: int, data: UpdateDrink, db: Session = Depends(get_db)
     if target_drink is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Drink not found")
 
+    old_kind, old_restaurant_id = target_drink.kind, target_drink.restaurant_id
 
     target_drink.kind = data.kind
     target_drink.price = data.price
@@ -102,16 +106,18 @@ def update_drink(drink_id: int, data: UpdateDrink, db: Session = Depends(get_db)
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail={"message": f"Database error: {error}"})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Drink updated successfully"}, headers=headers)
+    if (old_kind, old_restaurant_id) != (target_drink.kind, target_drink.restaurant_id):
+        catalog_counters.adjust(Drinks, -1, old_kind, old_restaurant_id)
+        catalog_counters.adjust(Drinks, 1, target_drink.kind, target_drink.restaurant_id)
+    catalog_cache.invalidate(Drinks.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Drink updated successfully"}, headers=headers)
 
 
 
 @drink_router.put("/update_images_drinks/{drink_id}")
 def update_images(drink_id: int, image_drink: UploadFile = File(...), db: Session = Depends(get_db)):
-    current_date_time = (datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
-    drink_image_name = f"drink_image_{current_date_time}.{image_drink.filename.split('.')[-1]}"
-
     # Fetch the drink from the database
     target_drink = db.query(Drinks).filter(Drinks.drink_id == drink_id).first()
 
@@ -119,27 +125,28 @@ def update_images(drink_id: int, image_drink: UploadFile = File(...), db: Sessio
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Drink not found")
 
-    old_image_path = target_drink.image
-
-    target_drink.image = drink_image_name
-    db.commit()
-
     try:
+        drink_image_name = image_store.save("drink", image_drink)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
-        if old_image_path and os.path.exists(f"{os.getcwd()}/static/images/drink/{old_image_path}"):
-            os.remove(f"{os.getcwd()}/static/images/drink/{old_image_path}")
-
-        with open(f"{os.getcwd()}/static/images/drink/{drink_image_name}", "wb") as file_object:
-            shutil.copyfileobj(image_drink.file, file_object)
-
+    try:
+        target_drink.image = drink_image_name
+        db.commit()
     except Exception as error:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Drink image updated successfully"},
-                        headers=headers)
+    catalog_cache.invalidate(Drinks.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Drink image updated successfully",
+                                   "image_url": image_store.url("drink", drink_image_name)},
+                          headers=headers)
 
 
 @drink_router.delete("/delete-drink/{drink_id}")
@@ -152,6 +159,8 @@ def delete_drink(drink_id: int, db: Session = Depends(get_db)):
             detail={"message": "Drink not found"}
         )
 
+    kind, restaurant_id = target_drink.kind, target_drink.restaurant_id
+
     try:
         db.delete(target_drink)
         db.commit()
@@ -162,293 +171,358 @@ def delete_drink(drink_id: int, db: Session = Depends(get_db)):
             detail={"message": str(error)}
         )
 
-    drink_image_path = os.path.join(
-        os.getcwd(), "static", "images", "drink", target_drink.image or ""
-    )
-
-    if os.path.exists(drink_image_path):
-        os.remove(drink_image_path)
+    catalog_counters.adjust(Drinks, -1, kind, restaurant_id)
+    catalog_cache.invalidate(Drinks.__tablename__)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
         content={"message": "Drink successfully deleted"},
         headers=headers
     )
 
 
-def model_to_dict(model):
-    return {c.name: getattr(model, c.name) for c in model.__table__.columns}
+def drinks_cursor_page(db: Session, after: str, *criteria):
+    cursor = pagination.decode_cursor(after, [Drinks.drink_id])
 
-@drink_router.get("/get_drink_by_id/{drink_id}")
-def get_drink_by_id(drink_id: int, db: Session = Depends(get_db)):
     try:
-        drink = db.query(Drinks).filter(Drinks.drink_id == drink_id).first()
+        rows = pagination.keyset(db.query(*serializers.columns(Drinks)).filter(*criteria), [Drinks.drink_id], cursor).all()
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while searching for the drink. ERROR: {error}"
+            detail={"message": f"An error occurred while fetching drinks. ERROR: {error}"}
         )
 
-    if drink is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Drink with id {drink_id} was not found!"
-        )
+    drinks, next_cursor = pagination.split_page(rows, [Drinks.drink_id])
 
-    return JSONResponse(
-        content={"drink": model_to_dict(drink)},
-        headers=headers
-    )
+    return {"drinks": [row_to_dict(drink) for drink in drinks], "next_cursor": next_cursor}
 
 
+def get_drink_by_id(drink_id: int, request: Request, db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
 
-@drink_router.get("/get_all_drinks")
-def get_all_drinks(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+    key = (Drinks.__tablename__, "by_id", drink_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Drinks.__tablename__)
 
-    try:
-        count = db.query(Drinks).count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting drinks. ERROR: {error}"}
-        )
+        try:
+            drink = db.query(Drinks).filter(Drinks.drink_id == drink_id).first()
+        except Exception as error:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred while searching for the drink. ERROR: {error}"
+            )
 
-    if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
+        if drink is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Drink with id {drink_id} was not found!"
+            )
 
-    max_page = (count - 1) // per_page + 1
-    if page > max_page:
-        page = max_page
+        content = {"drink": model_to_dict(drink)}
+        catalog_cache.set(key, content, generation)
 
-    offset = (page - 1) * per_page
+    if http_cache.not_modified_since(request, content["drink"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
 
-    try:
-        drinks = db.query(Drinks).limit(per_page).offset(offset).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching drinks. ERROR: {error}"}
-        )
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["drink"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    if not drinks:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Drinks were not found!"
-        )
 
+async def get_drink_by_id_async(drink_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
 
-    drinks_list = [model_to_dict(drink) for drink in drinks]
+    key = (Drinks.__tablename__, "by_id", drink_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Drinks.__tablename__)
 
-    content = {
-        "drinks": drinks_list,
-        "page": page,
-        "total_pages": max_page,
-        "total_drinks": count
-    }
+        try:
+            drink = (await db.execute(select(Drinks).where(Drinks.drink_id == drink_id))).scalar_one_or_none()
+        except Exception as error:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error occurred while searching for the drink. ERROR: {error}"
+            )
 
-    return JSONResponse(content=content, headers=headers)
+        if drink is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Drink with id {drink_id} was not found!"
+            )
 
+        content = {"drink": model_to_dict(drink)}
+        catalog_cache.set(key, content, generation)
 
-@drink_router.get("/get_all_carbonated_drinks")
-def get_all_carbonated_drinks(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+    if http_cache.not_modified_since(request, content["drink"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
 
-    try:
-        count = db.query(Drinks).filter(Drinks.kind == 'carbonated').count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting carbonated drinks. ERROR: {error}"}
-        )
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["drink"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    if count == 0:
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"drinks": [], "page": 1, "total_pages": 0, "total_drinks": 0},
-            headers=headers,
-        )
 
-    max_page = (count - 1) // per_page + 1
-    page = min(max(page, 1), max_page)
+drink_router.add_api_route("/get_drink_by_id/{drink_id}",
+                           get_drink_by_id_async if config.USE_ASYNC_DB else get_drink_by_id,
+                           methods=["GET"])
 
-    offset = (page - 1) * per_page
 
-    try:
-        # Fetch the drinks
-        drinks = db.query(Drinks).filter(Drinks.kind == 'carbonated').offset(offset).limit(per_page).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching carbonated drinks. ERROR: {error}"}
-        )
-
-    if not drinks:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No carbonated drinks found!")
 
-    # Convert results to dictionary format
-    content = {
-        "drinks": [model_to_dict(drink) for drink in drinks],
-        "page": page,
-        "total_pages": max_page,
-        "total_drinks": count,
-    }
+def get_all_drinks(request: Request, page: int = Query(default=1, ge=1),
+                   after: str | None = Query(default=None),
+                   db: Session = Depends(get_read_db)):
+    per_page = 20
 
-    return JSONResponse(content=content, headers=headers)
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
+    key = (Drinks.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
 
+    generation = catalog_cache.generation(Drinks.__tablename__)
 
-@drink_router.get("/get_all_non_carbonated_drinks")
-def get_all_non_carbonated_drinks(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+    if after is not None:
+        content = drinks_cursor_page(db, after)
+        catalog_cache.set(key, content, generation)
+        return ORJSONResponse(content=content, headers=response_headers)
 
     try:
-        # Count the total number of non-carbonated drinks
-        count = db.query(Drinks).filter(Drinks.kind == 'non_carbonated').count()
+        count = catalog_counters.get_count(db, Drinks)
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting non-carbonated drinks. ERROR: {error}"}
+            detail={"message": f"An error occurred while counting drinks. ERROR: {error}"}
         )
 
-    max_page = (count - 1) // per_page + 1
-    page = min(page, max_page)  # Adjust the page to avoid invalid offsets
-
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"drinks": [], "page": page, "total_pages": max_page, "total_drinks": count})
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=response_headers)
+
+    max_page = (count - 1) // per_page + 1
+    if page > max_page:
+        page = max_page
 
     offset = (page - 1) * per_page
 
     try:
-        # Fetch non-carbonated drinks with pagination
-        drinks = db.query(Drinks).filter(Drinks.kind == 'non_carbonated') \
-            .offset(offset).limit(per_page).all()
+        drinks = db.query(*serializers.columns(Drinks)).order_by(Drinks.drink_id).limit(per_page).offset(offset).all()
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching non-carbonated drinks. ERROR: {error}"}
+            detail={"message": f"An error occurred while fetching drinks. ERROR: {error}"}
         )
 
     if not drinks:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="No non-carbonated drinks found!"
+            detail="Drinks were not found!"
         )
 
-    # Convert the drinks data to a dictionary format
-    drinks_data = [model_to_dict(drink) for drink in drinks]
+
+    drinks_list = [row_to_dict(drink) for drink in drinks]
 
     content = {
-        "drinks": drinks_data,
+        "drinks": drinks_list,
         "page": page,
         "total_pages": max_page,
         "total_drinks": count
     }
+    catalog_cache.set(key, content, generation)
 
-    return JSONResponse(content=content, headers=headers)
+    return ORJSONResponse(content=content, headers=response_headers)
 
 
-@drink_router.get("/get_all_to_alcohol_drinks")
-def get_all_to_alcohol_drinks(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+async def get_all_drinks_async(request: Request, page: int = Query(default=1, ge=1),
+                               after: str | None = Query(default=None),
+                               db: AsyncSession = Depends(get_async_read_db)):
     per_page = 20
 
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    key = (Drinks.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
+
+    generation = catalog_cache.generation(Drinks.__tablename__)
+
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [Drinks.drink_id])
+        try:
+            rows = (await db.execute(pagination.keyset(select(*serializers.columns(Drinks)), [Drinks.drink_id], cursor))).all()
+        except Exception as error:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={"message": f"An error occurred while fetching drinks. ERROR: {error}"}
+            )
+
+        drinks, next_cursor = pagination.split_page(rows, [Drinks.drink_id])
+
+        content = {"drinks": [row_to_dict(drink) for drink in drinks], "next_cursor": next_cursor}
+        catalog_cache.set(key, content, generation)
+        return ORJSONResponse(content=content, headers=response_headers)
+
     try:
-        # Count the total number of to_alcohol drinks
-        count = db.query(Drinks).filter(Drinks.kind == 'to_alcohol').count()
+        count = await catalog_counters.get_count_async(db, Drinks)
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting to_alcohol drinks. ERROR: {error}"}
+            detail={"message": f"An error occurred while counting drinks. ERROR: {error}"}
         )
 
-    max_page = (count - 1) // per_page + 1
-    page = min(page, max_page)  # Adjust the page to avoid invalid offsets
-
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"drinks": [], "page": page, "total_pages": max_page, "total_drinks": count})
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=response_headers)
+
+    max_page = (count - 1) // per_page + 1
+    if page > max_page:
+        page = max_page
 
     offset = (page - 1) * per_page
 
     try:
-        # Fetch to_alcohol drinks with pagination
-        drinks = db.query(Drinks).filter(Drinks.kind == 'to_alcohol') \
-            .offset(offset).limit(per_page).all()
+        drinks = (await db.execute(select(*serializers.columns(Drinks)).order_by(Drinks.drink_id).limit(per_page).offset(offset))).all()
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching to_alcohol drinks. ERROR: {error}"}
+            detail={"message": f"An error occurred while fetching drinks. ERROR: {error}"}
         )
 
     if not drinks:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="No to_alcohol drinks found!"
+            detail="Drinks were not found!"
         )
 
-    drinks_data = [model_to_dict(drink) for drink in drinks]
-
     content = {
-        "drinks": drinks_data,
+        "drinks": [row_to_dict(drink) for drink in drinks],
         "page": page,
         "total_pages": max_page,
         "total_drinks": count
     }
+    catalog_cache.set(key, content, generation)
+
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+drink_router.add_api_route("/get_all_drinks",
+                           get_all_drinks_async if config.USE_ASYNC_DB else get_all_drinks,
+                           methods=["GET"])
+
+
+class DrinkSort(str, Enum):
+    drink_id = "drink_id"
+    price = "price"
+    rating = "rating"
+
+
+@drink_router.get("")
+def query_drinks(
+        request: Request,
+        kind: Drink | None = Query(default=None),
+        restaurant_id: int | None = Query(default=None),
+        min_price: int | None = Query(default=None, ge=0),
+        max_price: int | None = Query(default=None, ge=0),
+        min_rating: float | None = Query(default=None),
+        max_rating: float | None = Query(default=None),
+        sort: DrinkSort = Query(default=DrinkSort.drink_id),
+        order: SortOrder = Query(default=SortOrder.asc),
+        fields: str | None = Query(default=None, description="Comma separated columns, e.g. drink_id,drink_name,price"),
+        page: int = Query(default=1, ge=1),
+        after: str | None = Query(default=None),
+        db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    content = catalog_query.catalog_page(
+        db, Drinks, "drinks",
+        kind=kind, restaurant_id=restaurant_id,
+        min_price=min_price, max_price=max_price,
+        min_rating=min_rating, max_rating=max_rating,
+        sort=sort.value, descending=order == SortOrder.desc,
+        fields=fields, page=page, after=after,
+    )
 
-    return JSONResponse(content=content, headers=headers)
+    return ORJSONResponse(content=content, headers=response_headers)
 
 
+@drink_router.get("/get_all_carbonated_drinks")
+def get_all_carbonated_drinks(request: Request, page: int = Query(default=1, ge=1),
+                              after: str | None = Query(default=None),
+                              db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-@drink_router.get("/get_all_non_alcoholic_drinks")
-def get_all_non_alcoholic_drinks(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    try:
-        count = db.query(Drinks).filter(Drinks.kind == 'non_alcoholic').count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting non_alcoholic drinks. ERROR: {error}"}
-        )
+    content = catalog_query.catalog_page(db, Drinks, "drinks", kind=Drink.carbonated, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    max_page = (count - 1) // per_page + 1
-    page = min(page, max_page)
 
-    if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"drinks": [], "page": page, "total_pages": max_page, "total_drinks": count})
+@drink_router.get("/get_all_non_carbonated_drinks")
+def get_all_non_carbonated_drinks(request: Request, page: int = Query(default=1, ge=1),
+                                  after: str | None = Query(default=None),
+                                  db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    offset = (page - 1) * per_page
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    try:
-        drinks = db.query(Drinks).filter(Drinks.kind == 'non_alcoholic') \
-            .offset(offset).limit(per_page).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching non_alcoholic drinks. ERROR: {error}"}
-        )
+    content = catalog_query.catalog_page(db, Drinks, "drinks", kind=Drink.non_carbonated, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    if not drinks:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No non_alcoholic drinks found!"
-        )
 
-    drinks_data = [model_to_dict(drink) for drink in drinks]
+@drink_router.get("/get_all_to_alcohol_drinks")
+def get_all_to_alcohol_drinks(request: Request, page: int = Query(default=1, ge=1),
+                              after: str | None = Query(default=None),
+                              db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    content = {
-        "drinks": drinks_data,
-        "page": page,
-        "total_pages": max_page,
-        "total_drinks": count
-    }
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    content = catalog_query.catalog_page(db, Drinks, "drinks", kind=Drink.to_alcohol, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+@drink_router.get("/get_all_non_alcoholic_drinks")
+def get_all_non_alcoholic_drinks(request: Request, page: int = Query(default=1, ge=1),
+                                 after: str | None = Query(default=None),
+                                 db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Drinks))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    return JSONResponse(content=content, headers=headers)
+    content = catalog_query.catalog_page(db, Drinks, "drinks", kind=Drink.non_alcoholic, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
 
 
 @drink_router.get("/get_image/{drink_id}")
-def get_drink_image(drink_id: int, db: Session = Depends(get_db)):
+def get_drink_image(drink_id: int, request: Request, size: ImageSize = ImageSize.full,
+                    db: Session = Depends(get_read_db)):
     drink = db.query(Drinks).filter(Drinks.drink_id == drink_id).first()
 
     if not drink:
@@ -458,10 +532,10 @@ def get_drink_image(drink_id: int, db: Session = Depends(get_db)):
         )
 
     image_file = drink.image
-    path = os.path.join(os.getcwd(), "static/images/drink", image_file)
+    path, media_type = image_variants.pick(image_store.image_dir("drink"), image_file, size, request.headers.get("accept"))
 
     if os.path.exists(path):
-        return FileResponse(path)
+        return FileResponse(path, media_type=media_type, headers={"Vary": "Accept"})
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
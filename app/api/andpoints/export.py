@@ -0,0 +1,63 @@
+import datetime
+from enum import Enum
+
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import StreamingResponse
+
+from models.models import Food, Drinks, Restaurant, WorkTime
+from services import catalog_export
+from database import read_session
+
+export_router = APIRouter(tags=["export"], prefix="/api/export")
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+class ExportType(str, Enum):
+    foods = "foods"
+    drinks = "drinks"
+    restaurants = "restaurants"
+    work_times = "work_times"
+
+
+export_models = {
+    ExportType.foods: Food,
+    ExportType.drinks: Drinks,
+    ExportType.restaurants: Restaurant,
+    ExportType.work_times: WorkTime,
+}
+
+
+@export_router.get("")
+def export_catalog(request: Request,
+                   type: ExportType = Query(..., description="Table to export"),
+                   since: datetime.datetime | None = Query(default=None,
+                                                           description="Only rows changed at or after this time "
+                                                                       "(pass the largest updated_at already pulled)"),
+                   gzip: bool = Query(default=False, description="gzip the stream (Content-Encoding: gzip)")):
+    """The whole table as NDJSON, one row per line, streamed straight from the database cursor.
+
+    With since, the rows changed at or after it, followed by a tombstone line for every row deleted since then:
+    {"<primary key>": id, "updated_at": ..., "deleted": true}. Tombstones exist from the deleted_rows migration on.
+    """
+    model = export_models[type]
+
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    statements = [catalog_export.export_statement(model, since)]
+    if since is not None:
+        statements.append(catalog_export.tombstone_statement(model, since))
+
+    # The request's session would be closed before the body is sent, so the stream opens its own
+    chunks = catalog_export.ndjson_chunks(read_session(request), *statements)
+
+    response_headers = {**headers, "Content-Disposition": f'attachment; filename="{type.value}.ndjson"'}
+    if gzip:
+        chunks = catalog_export.gzip_chunks(chunks)
+        response_headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=response_headers)
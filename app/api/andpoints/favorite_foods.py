@@ -1,10 +1,13 @@
 from fastapi import HTTPException, status, APIRouter, Depends, Query
+from sqlalchemy import delete, insert
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from services.serializers import ORJSONResponse
 
 from models.models import User, Food, FavoriteFood
-from database import get_db
+from schemas.shemas import FavoriteFoodsBatch
+from database import get_db, get_read_db
+from services import favorites, pagination, serializers
 
 favorite_foods_router = APIRouter(tags=["favorite_foods"], prefix="/api/favorite_foods")
 
@@ -16,37 +19,35 @@ headers = {"Access-Control-Allow-Origin": "*",
 
 @favorite_foods_router.post("/add_favorite_foods")
 def add_favorite_foods(user_id: int, food_id: int, db: Session = Depends(get_db)):
+    # Insert straight away: the unique (user_id, food_id) index and the foreign keys reject what can't be added,
+    # and only then is it worth finding out why
+    try:
+        db.add(FavoriteFood(user_id=user_id, food_id=food_id))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        if db.query(FavoriteFood.favorite_food_id).filter(FavoriteFood.food_id == food_id,
+                                                          FavoriteFood.user_id == user_id).first():
+            return ORJSONResponse(status_code=status.HTTP_200_OK,
+                                  content={"message": "The food is already on your list"},
+                                  headers=headers)
 
-    favorite_food = db.query(FavoriteFood).filter(FavoriteFood.food_id == food_id, FavoriteFood.user_id == user_id).first()
-    if favorite_food:
-        return JSONResponse(status_code=status.HTTP_200_OK,
-                             content={"message": "The food is already on your list"},
-                             headers=headers)
-
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail={"message": f"User with ID {user_id} not found"})
+        if db.query(User.user_id).filter(User.user_id == user_id).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail={"message": f"User with ID {user_id} not found"})
 
-    # Check if the food exists
-    food = db.query(Food).filter(Food.food_id == food_id).first()
-    if food is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail={"message": f"Food with ID {food_id} not found"})
-
-
-    try:
-        new_favorite_food = FavoriteFood(user_id=user_id, food_id=food_id)
-        db.add(new_favorite_food)
-        db.commit()
+                            detail={"message": f"Food with ID {food_id} not found"})
     except SQLAlchemyError as error:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                              detail={"message": f"There was an error adding favorite food. ERROR: {str(error)}"})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Favorite food successfully added"},
-                        headers=headers)
+    favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Favorite food successfully added"},
+                          headers=headers)
 
 
 @favorite_foods_router.delete("/delete_favorite_food/{food_id}")
@@ -69,15 +70,114 @@ def delete_favorite_food(food_id: int, user_id: int, db: Session = Depends(get_d
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": f"An error occurred while deleting, please try again. ERROR: {str(error)}"})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Favorite food successfully deleted"},
-                        headers=headers)
+    favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Favorite food successfully deleted"},
+                          headers=headers)
+
+
+@favorite_foods_router.post("/add_favorite_foods_batch")
+def add_favorite_foods_batch(user_id: int, batch: FavoriteFoodsBatch, db: Session = Depends(get_db)):
+    food_ids = set(batch.food_ids)
+
+    if db.query(User.user_id).filter(User.user_id == user_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail={"message": f"User with ID {user_id} not found"})
+
+    try:
+        existing = {row.food_id for row in db.query(Food.food_id).filter(Food.food_id.in_(food_ids))}
+        already = {row.food_id for row in db.query(FavoriteFood.food_id)
+                   .filter(FavoriteFood.user_id == user_id, FavoriteFood.food_id.in_(existing))}
+
+        added = sorted(existing - already)
+        if added:
+            db.execute(insert(FavoriteFood.__table__), [{"user_id": user_id, "food_id": food_id} for food_id in added])
+        db.commit()
+    except IntegrityError:
+        # Another request added one of them in the meantime
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail={"message": "The favorites changed while adding, please retry"})
+    except SQLAlchemyError as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"There was an error adding favorite foods. ERROR: {str(error)}"})
+
+    if added:
+        favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"added": added, "already_added": sorted(already),
+                                   "not_found": sorted(food_ids - existing)},
+                          headers=headers)
+
+
+@favorite_foods_router.post("/delete_favorite_foods_batch")
+def delete_favorite_foods_batch(user_id: int, batch: FavoriteFoodsBatch, db: Session = Depends(get_db)):
+    food_ids = set(batch.food_ids)
+
+    try:
+        deleted = {row.food_id for row in db.query(FavoriteFood.food_id)
+                   .filter(FavoriteFood.user_id == user_id, FavoriteFood.food_id.in_(food_ids))}
+        if deleted:
+            db.execute(delete(FavoriteFood).where(FavoriteFood.user_id == user_id,
+                                                  FavoriteFood.food_id.in_(deleted)))
+        db.commit()
+    except SQLAlchemyError as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"An error occurred while deleting, please try again. ERROR: {str(error)}"})
+
+    if deleted:
+        favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"deleted": sorted(deleted), "not_found": sorted(food_ids - deleted)},
+                          headers=headers)
+
+
+def favorite_foods_query(db: Session, user_id: int, expand: bool):
+    # expand: the foods themselves, joined in the same query, instead of their ids
+    if expand:
+        return db.query(FavoriteFood.favorite_food_id, *serializers.columns(Food)) \
+            .join(Food, Food.food_id == FavoriteFood.food_id).filter(FavoriteFood.user_id == user_id)
+    return db.query(FavoriteFood.favorite_food_id, FavoriteFood.food_id).filter(FavoriteFood.user_id == user_id)
+
+
+def favorite_foods_content(rows, expand: bool) -> dict:
+    if expand:
+        foods = []
+        for row in rows:
+            food = serializers.row_to_dict(row)
+            del food["favorite_food_id"]
+            foods.append(food)
+        return {"foods": foods}
+    return {"food_ids": [row.food_id for row in rows]}
 
 
 @favorite_foods_router.get("/get_all_favorite_foods_by_user_id/{user_id}")
-def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1, ge=1),
+                                      after: str | None = Query(default=None),
+                                      expand: bool = Query(default=False, description="Return the foods, not their ids"),
+                                      db: Session = Depends(get_read_db)):
     per_page = 20
 
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [FavoriteFood.favorite_food_id])
+        try:
+            rows = pagination.keyset(favorite_foods_query(db, user_id, expand),
+                                     [FavoriteFood.favorite_food_id], cursor).all()
+        except SQLAlchemyError as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": str(error)})
+
+        favorite_foods, next_cursor = pagination.split_page(rows, [FavoriteFood.favorite_food_id])
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK,
+                              content={**favorite_foods_content(favorite_foods, expand), "next_cursor": next_cursor},
+                              headers=headers)
+
     try:
         count = db.query(FavoriteFood).filter(FavoriteFood.user_id == user_id).count()
     except SQLAlchemyError as error:
@@ -85,7 +185,7 @@ def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1,
                             detail={"message": str(error)})
 
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
 
     max_page = (count - 1) // per_page + 1
 
@@ -95,7 +195,8 @@ def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1,
     offset = (page - 1) * per_page
 
     try:
-        favorite_foods = db.query(FavoriteFood.food_id).filter(FavoriteFood.user_id == user_id).limit(per_page).offset(offset).all()
+        favorite_foods = favorite_foods_query(db, user_id, expand) \
+            .order_by(FavoriteFood.favorite_food_id).limit(per_page).offset(offset).all()
     except SQLAlchemyError as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
@@ -104,8 +205,6 @@ def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1,
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail={"message": f"User with id {user_id} has no favorite foods"})
 
-    food_ids = [food[0] for food in favorite_foods]
-
     data = {
         "page": page,
         "total_pages": max_page,
@@ -113,8 +212,8 @@ def get_all_favorite_foods_by_user_id(user_id: int, page: int = Query(default=1,
     }
 
     content = {
-        "food_ids": food_ids,
+        **favorite_foods_content(favorite_foods, expand),
         "data": data
     }
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
\ No newline at end of file
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
\ No newline at end of file
@@ -1,8 +1,12 @@
 from fastapi import HTTPException, status, APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from services.serializers import ORJSONResponse
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_read_db
 from models.models import FavoriteRestaurant, User, Restaurant
+from schemas.shemas import FavoriteRestaurantsBatch
+from services import favorites, pagination, serializers
 
 favorite_restaurants_router = APIRouter(tags=["favorite_restaurants"], prefix="/api/favorite_restaurants")
 
@@ -13,35 +17,35 @@ headers = {"Access-Control-Allow-Origin": "*",
 
 @favorite_restaurants_router.post("/add_favorite_restaurants")
 def add_favorite_restaurants(user_id: int, restaurant_id: int, db: Session = Depends(get_db)):
-    existing_favorite = db.query(FavoriteRestaurant).filter_by(user_id=user_id, restaurant_id=restaurant_id).first()
-    if existing_favorite:
-        return JSONResponse(status_code=status.HTTP_200_OK,
-                            content={"message": "The restaurant is already on your list"},
-                            headers=headers)
-
-    user = db.query(User).filter_by(user_id=user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail=f"User by {user_id} id not found")
-
-    restaurant = db.query(Restaurant).filter_by(restaurant_id=restaurant_id).first()
-    if not restaurant:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail=f"Restaurant by {restaurant_id} id not found")
-
-    new_favorite = FavoriteRestaurant(user_id=user_id, restaurant_id=restaurant_id)
-    db.add(new_favorite)
-
+    # Insert straight away: the unique (user_id, restaurant_id) index and the foreign keys reject what can't be
+    # added, and only then is it worth finding out why
     try:
+        db.add(FavoriteRestaurant(user_id=user_id, restaurant_id=restaurant_id))
         db.commit()
+    except IntegrityError:
+        db.rollback()
+        if db.query(FavoriteRestaurant.favorite_restaurant_id).filter_by(user_id=user_id,
+                                                                         restaurant_id=restaurant_id).first():
+            return ORJSONResponse(status_code=status.HTTP_200_OK,
+                                  content={"message": "The restaurant is already on your list"},
+                                  headers=headers)
+
+        if db.query(User.user_id).filter_by(user_id=user_id).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"User by {user_id} id not found")
+
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Restaurant by {restaurant_id} id not found")
     except Exception as error:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                              detail=f"There was an error adding favorite restaurant: {error}")
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Favorite restaurant successfully added"},
-                        headers=headers)
+    favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Favorite restaurant successfully added"},
+                          headers=headers)
 
 @favorite_restaurants_router.delete("/delete_favorite_restaurant/{restaurant_id}")
 def delete_favorite_restaurant(restaurant_id: int, user_id: int, db: Session = Depends(get_db)):
@@ -66,24 +70,124 @@ def delete_favorite_restaurant(restaurant_id: int, user_id: int, db: Session = D
             detail=f"An error occurred while deleting the favorite restaurant. ERROR: {error}"
         )
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Favorite restaurant successfully deleted"},
-                        headers=headers)
+    favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Favorite restaurant successfully deleted"},
+                          headers=headers)
 
 
+@favorite_restaurants_router.post("/add_favorite_restaurants_batch")
+def add_favorite_restaurants_batch(user_id: int, batch: FavoriteRestaurantsBatch, db: Session = Depends(get_db)):
+    restaurant_ids = set(batch.restaurant_ids)
+
+    if db.query(User.user_id).filter_by(user_id=user_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"User by {user_id} id not found")
+
+    try:
+        existing = {row.restaurant_id for row in db.query(Restaurant.restaurant_id)
+                    .filter(Restaurant.restaurant_id.in_(restaurant_ids))}
+        already = {row.restaurant_id for row in db.query(FavoriteRestaurant.restaurant_id)
+                   .filter(FavoriteRestaurant.user_id == user_id, FavoriteRestaurant.restaurant_id.in_(existing))}
+
+        added = sorted(existing - already)
+        if added:
+            db.execute(insert(FavoriteRestaurant.__table__),
+                       [{"user_id": user_id, "restaurant_id": restaurant_id} for restaurant_id in added])
+        db.commit()
+    except IntegrityError:
+        # Another request added one of them in the meantime
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="The favorites changed while adding, please retry")
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"There was an error adding favorite restaurants: {error}")
+
+    if added:
+        favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"added": added, "already_added": sorted(already),
+                                   "not_found": sorted(restaurant_ids - existing)},
+                          headers=headers)
+
+
+@favorite_restaurants_router.post("/delete_favorite_restaurants_batch")
+def delete_favorite_restaurants_batch(user_id: int, batch: FavoriteRestaurantsBatch, db: Session = Depends(get_db)):
+    restaurant_ids = set(batch.restaurant_ids)
+
+    try:
+        deleted = {row.restaurant_id for row in db.query(FavoriteRestaurant.restaurant_id)
+                   .filter(FavoriteRestaurant.user_id == user_id, FavoriteRestaurant.restaurant_id.in_(restaurant_ids))}
+        if deleted:
+            db.execute(delete(FavoriteRestaurant).where(FavoriteRestaurant.user_id == user_id,
+                                                        FavoriteRestaurant.restaurant_id.in_(deleted)))
+        db.commit()
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"An error occurred while deleting the favorite restaurants. ERROR: {error}")
+
+    if deleted:
+        favorites.invalidate(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"deleted": sorted(deleted), "not_found": sorted(restaurant_ids - deleted)},
+                          headers=headers)
+
+
+def favorite_restaurants_query(db: Session, user_id: int, expand: bool):
+    # expand: the restaurants themselves, joined in the same query, instead of their ids
+    if expand:
+        return db.query(FavoriteRestaurant.favorite_restaurant_id, *serializers.columns(Restaurant)) \
+            .join(Restaurant, Restaurant.restaurant_id == FavoriteRestaurant.restaurant_id) \
+            .filter(FavoriteRestaurant.user_id == user_id)
+    return db.query(FavoriteRestaurant.favorite_restaurant_id, FavoriteRestaurant.restaurant_id) \
+        .filter(FavoriteRestaurant.user_id == user_id)
+
+
+def favorite_restaurants_content(rows, expand: bool) -> dict:
+    if expand:
+        restaurants = []
+        for row in rows:
+            restaurant = serializers.row_to_dict(row)
+            del restaurant["favorite_restaurant_id"]
+            restaurants.append(restaurant)
+        return {"restaurants": restaurants}
+    return {"restaurant_ids": [row.restaurant_id for row in rows]}
+
 
 @favorite_restaurants_router.get("/get_all_favorite_restaurants_by_user_id/{user_id}")
 def get_all_favorite_restaurants_by_user_id(
         user_id: int,
         page: int = Query(default=1, ge=1),
-        db: Session = Depends(get_db)
+        after: str | None = Query(default=None),
+        expand: bool = Query(default=False, description="Return the restaurants, not their ids"),
+        db: Session = Depends(get_read_db)
 ):
     per_page = 20
 
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [FavoriteRestaurant.favorite_restaurant_id])
+        rows = pagination.keyset(favorite_restaurants_query(db, user_id, expand),
+                                 [FavoriteRestaurant.favorite_restaurant_id], cursor).all()
+
+        favorite_restaurants, next_cursor = pagination.split_page(rows, [FavoriteRestaurant.favorite_restaurant_id])
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK,
+                              content={
+                                  **favorite_restaurants_content(favorite_restaurants, expand),
+                                  "next_cursor": next_cursor
+                              },
+                              headers=headers)
+
     count = db.query(FavoriteRestaurant).filter(FavoriteRestaurant.user_id == user_id).count()
 
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
 
     max_page = (count - 1) // per_page + 1
 
@@ -92,15 +196,13 @@ def get_all_favorite_restaurants_by_user_id(
 
     offset = (page - 1) * per_page
 
-    favorite_restaurants = db.query(FavoriteRestaurant.restaurant_id).filter(FavoriteRestaurant.user_id == user_id) \
-        .limit(per_page).offset(offset).all()
+    favorite_restaurants = favorite_restaurants_query(db, user_id, expand) \
+        .order_by(FavoriteRestaurant.favorite_restaurant_id).limit(per_page).offset(offset).all()
 
     if not favorite_restaurants:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"User with id {user_id} has no favorite restaurants")
 
-    restaurant_ids = [restaurant_id[0] for restaurant_id in favorite_restaurants]
-
     data = {
         "page": page,
         "total_pages": max_page,
@@ -108,8 +210,8 @@ def get_all_favorite_restaurants_by_user_id(
     }
 
     content = {
-        "restaurant_ids": restaurant_ids,
+        **favorite_restaurants_content(favorite_restaurants, expand),
         "data": data
     }
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
\ No newline at end of file
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
\ No newline at end of file
@@ -0,0 +1,31 @@
+from fastapi import HTTPException, status, APIRouter, Depends, Query
+from services.serializers import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database import get_read_db
+from services import favorites
+
+favorites_router = APIRouter(tags=["favorites"], prefix="/api/favorites")
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+@favorites_router.get("/contains/{user_id}")
+def favorites_contain(user_id: int,
+                      food_ids: list[int] = Query(default=[], max_length=500),
+                      restaurant_ids: list[int] = Query(default=[], max_length=500),
+                      db: Session = Depends(get_read_db)):
+    """Which of the given foods and restaurants are the user's favorites (the heart icons of a menu page)."""
+    try:
+        content = {"foods": favorites.membership(db, user_id, "foods", food_ids) if food_ids else {},
+                   "restaurants": favorites.membership(db, user_id, "restaurants", restaurant_ids)
+                   if restaurant_ids else {}}
+    except SQLAlchemyError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
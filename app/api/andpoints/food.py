@@ -1,12 +1,19 @@
-from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query, Request
+from fastapi.responses import FileResponse
+from services.serializers import ORJSONResponse, model_to_dict, row_to_dict
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import Food, Restaurant
 from schemas.shemas import UpdateFood
-import datetime
 import os
-import shutil
-from database import get_db
+from core import config
+from services import pagination, catalog_counters, catalog_query
+from services.catalog_query import SortOrder
+from services.cache import catalog_cache
+from services import http_cache, image_store, image_variants, serializers
+from services.image_variants import ImageSize
+from database import get_db, get_read_db, get_async_read_db
 
 food_router = APIRouter(tags=["food"], prefix="/api/food")
 
@@ -36,8 +43,15 @@ def add_food(
         image_food: UploadFile = File(...),
         db: Session = Depends(get_db)):
 
-    current_date_time = datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-    food_image_name = f"food_image_{current_date_time}.{image_food.filename.split('.')[-1]}"
+    try:
+        food_image_name = image_store.save("food", image_food)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error occurred while saving the image: {error}"
+        )
 
     new_food = Food(
         kind=kind,
@@ -62,19 +76,12 @@ def add_food(
             detail=f"Error occurred while saving food: {error}"
         )
 
-    try:
-        image_path = f"{os.getcwd()}/static/images/food/{food_image_name}"
-        with open(image_path, "wb") as file_object:
-            shutil.copyfileobj(image_food.file, file_object)
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error occurred while saving the image: {error}"
-        )
+    catalog_counters.adjust(Food, 1, kind, restaurant_id)
+    catalog_cache.invalidate(Food.__tablename__)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
-        content={"message": "Food successfully added"},
+        content={"message": "Food successfully added", "image_url": image_store.url("food", food_image_name)},
         headers=headers
     )
 
@@ -86,6 +93,8 @@ def update_food(food_id: int, data: UpdateFood, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Food not found")
 
+    old_kind, old_restaurant_id = target_food.kind, target_food.restaurant_id
+
     try:
         target_food.kind = data.kind
         target_food.price = data.price
@@ -108,7 +117,12 @@ def update_food(food_id: int, data: UpdateFood, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error occurred while updating food: {error}")
 
-    return JSONResponse(
+    if (old_kind, old_restaurant_id) != (target_food.kind, target_food.restaurant_id):
+        catalog_counters.adjust(Food, -1, old_kind, old_restaurant_id)
+        catalog_counters.adjust(Food, 1, target_food.kind, target_food.restaurant_id)
+    catalog_cache.invalidate(Food.__tablename__)
+
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
         content={"message": "Food updated successfully"},
         headers=headers
@@ -117,17 +131,19 @@ def update_food(food_id: int, data: UpdateFood, db: Session = Depends(get_db)):
 
 @food_router.put("/update_images_foods/{food_id}")
 def update_images(food_id: int, image_food: UploadFile = File(...), db: Session = Depends(get_db)):
-    current_date_time = datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-    food_image_name = f"food_image_{current_date_time}.{image_food.filename.split('.')[-1]}"
-
     target_food = db.query(Food).filter(Food.food_id == food_id).first()
 
     if target_food is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Food not found")
 
-
-    old_image_path = target_food.image
+    try:
+        food_image_name = image_store.save("food", image_food)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"Error occurred while saving the image: {error}")
 
     try:
         target_food.image = food_image_name
@@ -138,22 +154,11 @@ def update_images(food_id: int, image_food: UploadFile = File(...), db: Session
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error occurred while updating food image in database: {error}")
 
-    try:
-
-        if old_image_path and os.path.exists(f"{os.getcwd()}/static/images/food/{old_image_path}"):
-            os.remove(f"{os.getcwd()}/static/images/food/{old_image_path}")
-
-        with open(f"{os.getcwd()}/static/images/food/{food_image_name}", "wb") as file_object:
-            shutil.copyfileobj(image_food.file, file_object)
-
-    except Exception as error:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Error occurred while saving the image: {error}")
+    catalog_cache.invalidate(Food.__tablename__)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_200_OK,
-        content={"message": "Food images updated successfully"},
+        content={"message": "Food images updated successfully", "image_url": image_store.url("food", food_image_name)},
         headers=headers
     )
 
@@ -166,12 +171,7 @@ def delete_food(food_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Food not found")
 
-    try:
-        if target_food.image and os.path.exists(f"{os.getcwd()}/static/images/food/{target_food.image}"):
-            os.remove(f"{os.getcwd()}/static/images/food/{target_food.image}")
-    except Exception as error:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Error occurred while removing image: {error}")
+    kind, restaurant_id = target_food.kind, target_food.restaurant_id
 
     try:
         db.delete(target_food)
@@ -181,42 +181,128 @@ def delete_food(food_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Error occurred while deleting food: {error}")
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Food successfully deleted"},
-                        headers=headers)
+    catalog_counters.adjust(Food, -1, kind, restaurant_id)
+    catalog_cache.invalidate(Food.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Food successfully deleted"},
+                          headers=headers)
 
 
 
-def model_to_dict(model):
-    return {c.name: getattr(model, c.name) for c in model.__table__.columns}
+def foods_cursor_page(db: Session, after: str, *criteria):
+    cursor = pagination.decode_cursor(after, [Food.food_id])
 
-@food_router.get("/get_food_by_id/{food_id}")
-def get_food_by_id(food_id: int, db: Session = Depends(get_db)):
     try:
-        food = db.query(Food).filter(Food.food_id == food_id).first()
+        rows = pagination.keyset(db.query(*serializers.columns(Food)).filter(*criteria), [Food.food_id], cursor).all()
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"An error occurred while searching for the food. ERROR: {error}")
+                            detail=f"An error occurred while searching for foods. ERROR: {error}")
 
-    if food is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail=f"Food with id {food_id} was not found!")
+    foods, next_cursor = pagination.split_page(rows, [Food.food_id])
+
+    return {"foods": [row_to_dict(food) for food in foods], "next_cursor": next_cursor}
+
+
+def get_food_by_id(food_id: int, request: Request, db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    key = (Food.__tablename__, "by_id", food_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Food.__tablename__)
 
-    return JSONResponse(content={"food": model_to_dict(food)}, headers=headers)
+        try:
+            food = db.query(Food).filter(Food.food_id == food_id).first()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while searching for the food. ERROR: {error}")
 
+        if food is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                 detail=f"Food with id {food_id} was not found!")
 
-@food_router.get("/get_all_foods")
-def get_all_foods(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+        content = {"food": model_to_dict(food)}
+        catalog_cache.set(key, content, generation)
+
+    if http_cache.not_modified_since(request, content["food"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["food"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+async def get_food_by_id_async(food_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    key = (Food.__tablename__, "by_id", food_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Food.__tablename__)
+
+        try:
+            food = (await db.execute(select(Food).where(Food.food_id == food_id))).scalar_one_or_none()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while searching for the food. ERROR: {error}")
+
+        if food is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                 detail=f"Food with id {food_id} was not found!")
+
+        content = {"food": model_to_dict(food)}
+        catalog_cache.set(key, content, generation)
+
+    if http_cache.not_modified_since(request, content["food"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["food"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+food_router.add_api_route("/get_food_by_id/{food_id}",
+                          get_food_by_id_async if config.USE_ASYNC_DB else get_food_by_id,
+                          methods=["GET"])
+
+
+def get_all_foods(request: Request, page: int = Query(default=1, ge=1),
+                  after: str | None = Query(default=None),
+                  db: Session = Depends(get_read_db)):
     per_page = 20
 
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    key = (Food.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
+
+    generation = catalog_cache.generation(Food.__tablename__)
+
+    if after is not None:
+        content = foods_cursor_page(db, after)
+        catalog_cache.set(key, content, generation)
+        return ORJSONResponse(content=content, headers=response_headers)
+
     try:
-        count = db.query(Food).count()
+        count = catalog_counters.get_count(db, Food)
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"An error occurred while counting foods. ERROR: {error}")
 
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=response_headers)
 
     max_page = (count - 1) // per_page + 1
 
@@ -226,7 +312,7 @@ def get_all_foods(page: int = Query(default=1, ge=1), db: Session = Depends(get_
     offset = (page - 1) * per_page
 
     try:
-        foods = db.query(Food).offset(offset).limit(per_page).all()
+        foods = db.query(*serializers.columns(Food)).order_by(Food.food_id).offset(offset).limit(per_page).all()
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"An error occurred while searching for foods. ERROR: {error}")
@@ -236,209 +322,192 @@ def get_all_foods(page: int = Query(default=1, ge=1), db: Session = Depends(get_
                             detail="Foods were not found!")
 
     content = {
-        "foods": [model_to_dict(food) for food in foods],
+        "foods": [row_to_dict(food) for food in foods],
         "page": page,
         "total_pages": max_page,
         "total_foods": count
     }
+    catalog_cache.set(key, content, generation)
 
-    return JSONResponse(content=content, headers=headers)
+    return ORJSONResponse(content=content, headers=response_headers)
 
 
-@food_router.get("/get_all_salads")
-def get_all_salads(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+async def get_all_foods_async(request: Request, page: int = Query(default=1, ge=1),
+                              after: str | None = Query(default=None),
+                              db: AsyncSession = Depends(get_async_read_db)):
     per_page = 20
 
-    try:
-        count = db.query(Food).filter(Food.kind == 'salads').count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting salads. ERROR: {error}"}
-        )
-
-    if count == 0:
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"foods": [], "page": 1, "total_pages": 0, "total_foods": 0},
-            headers=headers,
-        )
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    max_page = (count - 1) // per_page + 1
-    page = min(max(page, 1), max_page)
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    offset = (page - 1) * per_page
-
-    try:
-        # Fetch the foods
-        foods = db.query(Food).filter(Food.kind == 'salads').offset(offset).limit(per_page).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching salads. ERROR: {error}"}
-        )
-
-    if not foods:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No salads found!")
+    key = (Food.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
 
-    # Convert results to dictionary format
-    content = {
-        "foods": [model_to_dict(food) for food in foods],
-        "page": page,
-        "total_pages": max_page,
-        "total_foods": count,
-    }
+    generation = catalog_cache.generation(Food.__tablename__)
 
-    return JSONResponse(content=content, headers=headers)
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [Food.food_id])
+        try:
+            rows = (await db.execute(pagination.keyset(select(*serializers.columns(Food)), [Food.food_id], cursor))).all()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while searching for foods. ERROR: {error}")
 
+        foods, next_cursor = pagination.split_page(rows, [Food.food_id])
 
-@food_router.get("/get_all_hot_dishes")
-def get_all_hot_dishes(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+        content = {"foods": [row_to_dict(food) for food in foods], "next_cursor": next_cursor}
+        catalog_cache.set(key, content, generation)
+        return ORJSONResponse(content=content, headers=response_headers)
 
     try:
-        count = db.query(Food).filter(Food.kind == 'hot_dishes').count()
+        count = await catalog_counters.get_count_async(db, Food)
     except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting hot dishes. ERROR: {error}"}
-        )
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"An error occurred while counting foods. ERROR: {error}")
 
     if count == 0:
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"foods": [], "page": 1, "total_pages": 0, "total_foods": 0},
-            headers=headers,
-        )
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=response_headers)
 
     max_page = (count - 1) // per_page + 1
-    page = min(max(page, 1), max_page)
+
+    if page > max_page:
+        page = max_page
 
     offset = (page - 1) * per_page
 
     try:
-        # Fetch the foods
-        foods = db.query(Food).filter(Food.kind == 'hot_dishes').offset(offset).limit(per_page).all()
+        foods = (await db.execute(select(*serializers.columns(Food)).order_by(Food.food_id).offset(offset).limit(per_page))).all()
     except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching hot dishes. ERROR: {error}"}
-        )
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"An error occurred while searching for foods. ERROR: {error}")
 
     if not foods:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hot dishes found!")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Foods were not found!")
 
-    # Convert results to dictionary format
     content = {
-        "foods": [model_to_dict(food) for food in foods],
+        "foods": [row_to_dict(food) for food in foods],
         "page": page,
         "total_pages": max_page,
-        "total_foods": count,
+        "total_foods": count
     }
+    catalog_cache.set(key, content, generation)
+
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+food_router.add_api_route("/get_all_foods",
+                          get_all_foods_async if config.USE_ASYNC_DB else get_all_foods,
+                          methods=["GET"])
+
+
+class FoodSort(str, Enum):
+    food_id = "food_id"
+    price = "price"
+    rating = "rating"
+    cook_time = "cook_time"
+
+
+@food_router.get("")
+def query_foods(
+        request: Request,
+        kind: FoodKind | None = Query(default=None),
+        restaurant_id: int | None = Query(default=None),
+        min_price: int | None = Query(default=None, ge=0),
+        max_price: int | None = Query(default=None, ge=0),
+        min_rating: float | None = Query(default=None),
+        max_rating: float | None = Query(default=None),
+        sort: FoodSort = Query(default=FoodSort.food_id),
+        order: SortOrder = Query(default=SortOrder.asc),
+        fields: str | None = Query(default=None, description="Comma separated columns, e.g. food_id,food_name,price"),
+        page: int = Query(default=1, ge=1),
+        after: str | None = Query(default=None),
+        db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    content = catalog_query.catalog_page(
+        db, Food, "foods",
+        kind=kind, restaurant_id=restaurant_id,
+        min_price=min_price, max_price=max_price,
+        min_rating=min_rating, max_rating=max_rating,
+        sort=sort.value, descending=order == SortOrder.desc,
+        fields=fields, page=page, after=after,
+    )
 
-    return JSONResponse(content=content, headers=headers)
-
-
-
-@food_router.get("/get_all_fast_food")
-def get_all_fast_food(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
-
-    try:
-        count = db.query(Food).filter(Food.kind == 'fast_food').count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting fast food items. ERROR: {error}"}
-        )
-
-    if count == 0:
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"foods": [], "page": 1, "total_pages": 0, "total_foods": 0},
-            headers=headers,
-        )
-
-    max_page = (count - 1) // per_page + 1
-    page = min(max(page, 1), max_page)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    offset = (page - 1) * per_page
 
-    try:
-        # Fetch the foods
-        foods = db.query(Food).filter(Food.kind == 'fast_food').offset(offset).limit(per_page).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching fast food items. ERROR: {error}"}
-        )
+@food_router.get("/get_all_salads")
+def get_all_salads(request: Request, page: int = Query(default=1, ge=1),
+                   after: str | None = Query(default=None),
+                   db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    if not foods:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No fast food items found!")
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    # Convert results to dictionary format
-    content = {
-        "foods": [model_to_dict(food) for food in foods],
-        "page": page,
-        "total_pages": max_page,
-        "total_foods": count,
-    }
+    content = catalog_query.catalog_page(db, Food, "foods", kind=FoodKind.salads, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    return JSONResponse(content=content, headers=headers)
 
+@food_router.get("/get_all_hot_dishes")
+def get_all_hot_dishes(request: Request, page: int = Query(default=1, ge=1),
+                       after: str | None = Query(default=None),
+                       db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-@food_router.get("/get_all_desserts")
-def get_all_desserts(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
-    per_page = 20
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    try:
-        count = db.query(Food).filter(Food.kind == 'desserts').count()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while counting dessert items. ERROR: {error}"}
-        )
+    content = catalog_query.catalog_page(db, Food, "foods", kind=FoodKind.hot_dishes, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    if count == 0:
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"foods": [], "page": 1, "total_pages": 0, "total_foods": 0},
-            headers=headers,
-        )
 
-    max_page = (count - 1) // per_page + 1
-    page = min(max(page, 1), max_page)
+@food_router.get("/get_all_fast_food")
+def get_all_fast_food(request: Request, page: int = Query(default=1, ge=1),
+                      after: str | None = Query(default=None),
+                      db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    offset = (page - 1) * per_page
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
-    try:
-        # Fetch the foods
-        foods = db.query(Food).filter(Food.kind == 'desserts').offset(offset).limit(per_page).all()
-    except Exception as error:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"message": f"An error occurred while fetching dessert items. ERROR: {error}"}
-        )
+    content = catalog_query.catalog_page(db, Food, "foods", kind=FoodKind.fast_food, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
-    if not foods:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No desserts found!")
 
-    # Convert results to dictionary format
-    content = {
-        "foods": [model_to_dict(food) for food in foods],
-        "page": page,
-        "total_pages": max_page,
-        "total_foods": count,
-    }
+@food_router.get("/get_all_desserts")
+def get_all_desserts(request: Request, page: int = Query(default=1, ge=1),
+                     after: str | None = Query(default=None),
+                     db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Food))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
 
-    return JSONResponse(content=content, headers=headers)
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
 
+    content = catalog_query.catalog_page(db, Food, "foods", kind=FoodKind.desserts, page=page, after=after)
+    return ORJSONResponse(content=content, headers=response_headers)
 
 
 
 
 @food_router.get("/get_food_image/{food_id}")
-def get_food_image(food_id: int, db: Session = Depends(get_db)):
+def get_food_image(food_id: int, request: Request, size: ImageSize = ImageSize.full,
+                   db: Session = Depends(get_read_db)):
     food = db.query(Food).filter(Food.food_id == food_id).first()
 
     if not food or not food.image:
@@ -448,10 +517,10 @@ def get_food_image(food_id: int, db: Session = Depends(get_db)):
         )
 
     file_name = food.image
-    file_path = f"{os.getcwd()}/static/images/food/{file_name}"
+    file_path, media_type = image_variants.pick(image_store.image_dir("food"), file_name, size, request.headers.get("accept"))
 
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return FileResponse(file_path, media_type=media_type, headers={"Vary": "Accept"})
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,44 @@
+import os
+
+from fastapi import APIRouter, status
+from services.serializers import ORJSONResponse
+
+from core import password_pool, security
+from services import db_metrics, favorites
+from services.cache import catalog_cache
+from services.mail_queue import mail_queue
+
+metrics_router = APIRouter(tags=["metrics"], prefix="/api/metrics")
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+@metrics_router.get("/db-pool")
+def get_db_pool_metrics():
+    # Pools are per process, so every uvicorn worker reports its own numbers (keyed by pid)
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=db_metrics.pool_stats(), headers=headers)
+
+
+@metrics_router.get("/cache")
+def get_cache_metrics():
+    # Like the pools, the cache is per process
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"pid": os.getpid(), "catalog": catalog_cache.stats(),
+                                   "principals": security.principal_cache.stats(),
+                                   "favorites": favorites.favorites_cache.stats()},
+                          headers=headers)
+
+
+@metrics_router.get("/mail")
+def get_mail_metrics():
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"pid": os.getpid(), "mail": mail_queue.stats()}, headers=headers)
+
+
+@metrics_router.get("/passwords")
+def get_password_metrics():
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"pid": os.getpid(), "passwords": password_pool.stats()}, headers=headers)
@@ -0,0 +1,86 @@
+from fastapi import HTTPException, status, APIRouter, Depends, Header, Query
+from services.serializers import ORJSONResponse
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from core import security
+from database import get_db, get_read_db
+from models.models import Order
+from schemas.shemas import OrderAdd
+from services import orders, pagination
+
+order_router = APIRouter(tags=["orders"], prefix="/api/orders")
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization, Idempotency-Key",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+@order_router.post("/place_order")
+def place_order(order: OrderAdd,
+                idempotency_key: str | None = Header(default=None, max_length=255,
+                                                     description="Retries with the same key return the same order"),
+                db: Session = Depends(get_db), current_user=Depends(security.current_user)):
+    user_id = current_user["user_id"]
+
+    try:
+        content = orders.place_order(db, user_id, order, idempotency_key)
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        # Most likely the key of an order that is already placed: send that order back
+        content = orders.replay(db, user_id, order, idempotency_key) if idempotency_key else None
+        if content is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail={"message": f"The order could not be placed, please retry. ERROR: {error}"})
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=content,
+                              headers={**headers, "Idempotent-Replayed": "true"})
+    except HTTPException:
+        db.rollback()
+        raise
+    except SQLAlchemyError as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"There was an error placing the order. ERROR: {error}"})
+
+    return ORJSONResponse(status_code=status.HTTP_201_CREATED, content=content, headers=headers)
+
+
+@order_router.get("/get_order/{order_id}")
+def get_order(order_id: int, db: Session = Depends(get_read_db), current_user=Depends(security.current_user)):
+    order = db.query(Order).options(selectinload(Order.lines)).filter(Order.order_id == order_id).first()
+
+    if order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Order with ID {order_id} not found.")
+
+    if order.user_id != current_user["user_id"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="You do not have permission to access this order.")
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=orders.order_content(order), headers=headers)
+
+
+@order_router.get("/get_orders")
+def get_orders(after: str | None = Query(default=None), db: Session = Depends(get_read_db),
+               current_user=Depends(security.current_user)):
+    """The user's orders, newest first, 20 per page with their lines (two queries per page)."""
+    cursor = pagination.decode_cursor(after, [Order.order_id])
+
+    try:
+        rows = pagination.keyset(
+            db.query(Order).options(selectinload(Order.lines)).filter(Order.user_id == current_user["user_id"]),
+            [Order.order_id], cursor, descending=True
+        ).all()
+    except SQLAlchemyError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
+
+    placed, next_cursor = pagination.split_page(rows, [Order.order_id])
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"orders": [orders.order_content(order) for order in placed],
+                                   "next_cursor": next_cursor},
+                          headers=headers)
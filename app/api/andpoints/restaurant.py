@@ -1,14 +1,21 @@
-from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import HTTPException, status, APIRouter, UploadFile, File, Form, Depends, Query, Request
+from fastapi.responses import FileResponse, Response
+from services.serializers import ORJSONResponse, model_to_dict, row_to_dict
 from enum import Enum
+import hashlib
 import os
-import shutil
-import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from schemas.shemas import UpdateRestaurant
-from models.models import Restaurant, Food
-from database import get_db
+from models.models import Restaurant, Food, Drinks, WorkTime
+from core import config
+from services import pagination, catalog_counters
+from services.cache import catalog_cache
+from services import http_cache, image_store, image_variants, serializers
+from services.image_variants import ImageSize
+from api.andpoints.food import FoodKind
+from database import get_db, get_read_db, get_async_read_db
 
 restaurant_router = APIRouter(tags=["restaurant"], prefix="/api/restaurant")
 
@@ -30,9 +37,15 @@ def add_restaurant(restaurant_name: str = Form(...), kind: RestaurantType = Form
                    address: str = Form(...), rating: float = Form(), image_logo: UploadFile = File(...),
                    image_background: UploadFile = File(...), db: Session = Depends(get_db)):
 
-    current_date_time = datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-    logo_image_name = f"logo_image_{current_date_time}.{image_logo.filename.split('.')[-1]}"
-    background_image_name = f"background_image_{current_date_time}.{image_background.filename.split('.')[-1]}"
+    try:
+        # Save images to disk
+        logo_image_name = image_store.save("logo", image_logo)
+        background_image_name = image_store.save("background", image_background)
+    except Exception as error:
+        if isinstance(error, HTTPException):
+            raise
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
     try:
         new_restaurant = Restaurant(
@@ -53,21 +66,14 @@ def add_restaurant(restaurant_name: str = Form(...), kind: RestaurantType = Form
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    try:
-        # Save images to disk
-        with open(f"{os.getcwd()}/static/images/logo/{logo_image_name}", "wb") as file_object:
-            shutil.copyfileobj(image_logo.file, file_object)
+    catalog_counters.adjust(Restaurant, 1, kind)
+    catalog_cache.invalidate(Restaurant.__tablename__)
 
-        with open(f"{os.getcwd()}/static/images/background/{background_image_name}", "wb") as file_object:
-            shutil.copyfileobj(image_background.file, file_object)
-    except Exception as error:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail={"message": str(error)})
-
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Restaurant successfully added"},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Restaurant successfully added",
+                                   "logo_url": image_store.url("logo", logo_image_name),
+                                   "background_url": image_store.url("background", background_image_name)},
+                          headers=headers)
 
 @restaurant_router.put("/update_restaurant/{restaurant_id}")
 def update_restaurant(restaurant_id: int, data: UpdateRestaurant, db: Session = Depends(get_db)):
@@ -89,17 +95,16 @@ def update_restaurant(restaurant_id: int, data: UpdateRestaurant, db: Session =
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Restaurant updated successfully"},
-                        headers=headers)
+    catalog_cache.invalidate(Restaurant.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Restaurant updated successfully"},
+                          headers=headers)
 
 
 @restaurant_router.put("/update_logo_restaurants/{restaurant_id}")
 def update_logo(restaurant_id: int, image_logo: UploadFile = File(...), db: Session = Depends(get_db)):
 
-    current_date_time = (datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
-    logo_image_name = f"logo_image_{current_date_time}.{image_logo.filename.split('.')[-1]}"
-
     try:
         target_restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
 
@@ -110,7 +115,13 @@ def update_logo(restaurant_id: int, image_logo: UploadFile = File(...), db: Sess
     if target_restaurant is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
 
-    old_image_logo = target_restaurant.logo
+    try:
+        logo_image_name = image_store.save("logo", image_logo)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
     try:
         target_restaurant.logo = logo_image_name
@@ -121,26 +132,18 @@ def update_logo(restaurant_id: int, image_logo: UploadFile = File(...), db: Sess
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    logo_path = f"{os.getcwd()}/static/images/logo/"
-
-    if old_image_logo and os.path.exists(os.path.join(logo_path, old_image_logo)):
-        os.remove(os.path.join(logo_path, old_image_logo))
+    catalog_cache.invalidate(Restaurant.__tablename__)
 
-    with open(os.path.join(logo_path, logo_image_name), "wb") as file_object:
-        shutil.copyfileobj(image_logo.file, file_object)
-
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Restaurant logo updated successfully"},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Restaurant logo updated successfully",
+                                   "logo_url": image_store.url("logo", logo_image_name)},
+                          headers=headers)
 
 
 
 @restaurant_router.put("/update_background_restaurants/{restaurant_id}")
 def update_background(restaurant_id: int, image_background: UploadFile = File(...), db: Session = Depends(get_db)):
 
-    current_date_time = (datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
-    background_image_name = f"background_image_{current_date_time}.{image_background.filename.split('.')[-1]}"
-
     try:
         target_restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
 
@@ -151,7 +154,13 @@ def update_background(restaurant_id: int, image_background: UploadFile = File(..
     if target_restaurant is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
 
-    old_image_background = target_restaurant.background_image
+    try:
+        background_image_name = image_store.save("background", image_background)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
     try:
         target_restaurant.background_image = background_image_name
@@ -162,17 +171,12 @@ def update_background(restaurant_id: int, image_background: UploadFile = File(..
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    background_path = f"{os.getcwd()}/static/images/background/"
-
-    if old_image_background and os.path.exists(os.path.join(background_path, old_image_background)):
-        os.remove(os.path.join(background_path, old_image_background))
+    catalog_cache.invalidate(Restaurant.__tablename__)
 
-    with open(os.path.join(background_path, background_image_name), "wb") as file_object:
-        shutil.copyfileobj(image_background.file, file_object)
-
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Restaurant background updated successfully"},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Restaurant background updated successfully",
+                                   "background_url": image_store.url("background", background_image_name)},
+                          headers=headers)
 
 
 @restaurant_router.delete("/delete_restaurant/{restaurant_id}")
@@ -189,14 +193,7 @@ def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                              detail="Restaurant not found")
 
-    logo_path = os.path.join(os.getcwd(), "static", "images", "logo", target_restaurant.logo or '')
-    background_path = os.path.join(os.getcwd(), "static", "images", "background", target_restaurant.background_image or '')
-
-    if os.path.exists(logo_path):
-        os.remove(logo_path)
-
-    if os.path.exists(background_path):
-        os.remove(background_path)
+    kind = target_restaurant.kind
 
     try:
         db.delete(target_restaurant)
@@ -207,41 +204,295 @@ def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Restaurant successfully deleted"},
-                        headers=headers)
+    catalog_counters.adjust(Restaurant, -1, kind)
+    catalog_cache.invalidate(Restaurant.__tablename__)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Restaurant successfully deleted"},
+                          headers=headers)
+
+
+
+def get_restaurant_by_id(restaurant_id: int, request: Request, db: Session = Depends(get_read_db)):
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Restaurant))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    key = (Restaurant.__tablename__, "by_id", restaurant_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Restaurant.__tablename__)
+
+        try:
+            restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while searching for the restaurant. ERROR: {error}")
+
+        if restaurant is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                 detail=f"Restaurant with id {restaurant_id} was not found!")
+
+        content = {"restaurant": model_to_dict(restaurant)}
+        catalog_cache.set(key, content, generation)
+
+    if http_cache.not_modified_since(request, content["restaurant"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["restaurant"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+async def get_restaurant_by_id_async(restaurant_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Restaurant))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    key = (Restaurant.__tablename__, "by_id", restaurant_id)
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(Restaurant.__tablename__)
+
+        try:
+            restaurant = (await db.execute(
+                select(Restaurant).where(Restaurant.restaurant_id == restaurant_id)
+            )).scalar_one_or_none()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while searching for the restaurant. ERROR: {error}")
+
+        if restaurant is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                 detail=f"Restaurant with id {restaurant_id} was not found!")
+
+        content = {"restaurant": model_to_dict(restaurant)}
+        catalog_cache.set(key, content, generation)
+
+    if http_cache.not_modified_since(request, content["restaurant"]["updated_at"]):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL,
+                                                              content["restaurant"]["updated_at"])}
+    return ORJSONResponse(content=content, headers=response_headers)
+
+
+restaurant_router.add_api_route("/get_restaurant_by_id/{restaurant_id}",
+                                get_restaurant_by_id_async if config.USE_ASYNC_DB else get_restaurant_by_id,
+                                methods=["GET"])
+
+
+# A restaurant page in one response: the restaurant, its foods and drinks grouped by kind and its work times.
+# Cached rendered, under its own namespace that every write to one of the four tables invalidates.
+MENU_NAMESPACE = "menu"
+MENU_MODELS = (Restaurant, Food, Drinks, WorkTime)
+catalog_cache.add_dependency(MENU_NAMESPACE, *(model.__tablename__ for model in MENU_MODELS))
+
+menu_options = (selectinload(Restaurant.foods), selectinload(Restaurant.drinks), selectinload(Restaurant.work_times))
+
+
+def menu_entry(restaurant: Restaurant) -> tuple[bytes, str]:
+    foods, drinks = {}, {}
+    for food in restaurant.foods:
+        foods.setdefault(food.kind, []).append(model_to_dict(food))
+    for drink in restaurant.drinks:
+        drinks.setdefault(drink.kind, []).append(model_to_dict(drink))
+
+    body = serializers.dumps({"restaurant": model_to_dict(restaurant), "foods": foods, "drinks": drinks,
+                              "work_times": [model_to_dict(work_time) for work_time in restaurant.work_times]})
+    # The ETag comes from the body itself, so every worker gives the same one for the same menu
+    return body, hashlib.sha1(body).hexdigest()
+
+
+def menu_response(request: Request, entry: tuple[bytes, str]) -> Response:
+    body, version = entry
+    current_etag = http_cache.etag(request, version)
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.ITEM_CACHE_CONTROL, headers)
+
+    return Response(content=body, media_type="application/json",
+                    headers={**headers, **http_cache.cache_headers(current_etag, http_cache.ITEM_CACHE_CONTROL)})
 
 
+def get_restaurant_menu(restaurant_id: int, request: Request, db: Session = Depends(get_read_db)):
+    # Drops this worker's cached menus when another worker changed one of the tables
+    http_cache.table_version(db, *MENU_MODELS)
 
-def model_to_dict(model):
-    return {c.name: getattr(model, c.name) for c in model.__table__.columns}
+    key = (MENU_NAMESPACE, restaurant_id)
+    entry = catalog_cache.get(key)
+    if entry is None:
+        generation = catalog_cache.generation(MENU_NAMESPACE)
+
+        try:
+            # One query for the restaurant and one per relationship, however big the menu is
+            restaurant = db.query(Restaurant).options(*menu_options) \
+                .filter(Restaurant.restaurant_id == restaurant_id).first()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while loading the menu. ERROR: {error}")
+
+        if restaurant is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Restaurant with id {restaurant_id} was not found!")
+
+        entry = menu_entry(restaurant)
+        catalog_cache.set(key, entry, generation)
+
+    return menu_response(request, entry)
+
+
+async def get_restaurant_menu_async(restaurant_id: int, request: Request,
+                                    db: AsyncSession = Depends(get_async_read_db)):
+    await http_cache.table_version_async(db, *MENU_MODELS)
+
+    key = (MENU_NAMESPACE, restaurant_id)
+    entry = catalog_cache.get(key)
+    if entry is None:
+        generation = catalog_cache.generation(MENU_NAMESPACE)
+
+        try:
+            restaurant = (await db.execute(
+                select(Restaurant).options(*menu_options).where(Restaurant.restaurant_id == restaurant_id)
+            )).scalar_one_or_none()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"An error occurred while loading the menu. ERROR: {error}")
+
+        if restaurant is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Restaurant with id {restaurant_id} was not found!")
+
+        entry = menu_entry(restaurant)
+        catalog_cache.set(key, entry, generation)
+
+    return menu_response(request, entry)
+
+
+restaurant_router.add_api_route("/menu/{restaurant_id}",
+                                get_restaurant_menu_async if config.USE_ASYNC_DB else get_restaurant_menu,
+                                methods=["GET"])
+
+
+def get_all_restaurants(request: Request, page: int = Query(default=1, ge=1),
+                        after: str | None = Query(default=None),
+                        db: Session = Depends(get_read_db)):
+    per_page = 20
+
+    current_etag = http_cache.etag(request, http_cache.table_version(db, Restaurant))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    key = (Restaurant.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
+
+    generation = catalog_cache.generation(Restaurant.__tablename__)
+
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [Restaurant.restaurant_id])
+        try:
+            rows = pagination.keyset(db.query(*serializers.columns(Restaurant)), [Restaurant.restaurant_id], cursor).all()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": str(error)})
+
+        restaurants, next_cursor = pagination.split_page(rows, [Restaurant.restaurant_id])
+
+        content = {
+            "restaurants": [row_to_dict(restaurant) for restaurant in restaurants],
+            "next_cursor": next_cursor
+        }
+        catalog_cache.set(key, content, generation)
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=response_headers)
+
+    try:
+        count = catalog_counters.get_count(db, Restaurant)
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
+
+    if count == 0:
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(content=[], headers=response_headers)
+
+    max_page = (count - 1) // per_page + 1
+    if page > max_page:
+        page = max_page
+
+    offset = (page - 1) * per_page
 
-@restaurant_router.get("/get_restaurant_by_id/{restaurant_id}")
-def get_restaurant_by_id(restaurant_id: int, db: Session = Depends(get_db)):
     try:
-        restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
+        restaurants = db.query(*serializers.columns(Restaurant)).order_by(Restaurant.restaurant_id).limit(per_page).offset(offset).all()
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"An error occurred while searching for the restaurant. ERROR: {error}")
+                            detail={"message": str(error)})
 
-    if restaurant is None:
+    if not restaurants:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                             detail=f"Restaurant with id {restaurant_id} was not found!")
+                            detail="Restaurants were not found!")
+
+    content = {
+        "restaurants": [row_to_dict(restaurant) for restaurant in restaurants],
+        "page": page,
+        "total_pages": max_page,
+        "total_restaurants": count
+    }
+    catalog_cache.set(key, content, generation)
 
-    return JSONResponse(content={"restaurant": model_to_dict(restaurant)}, headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=response_headers)
 
 
-@restaurant_router.get("/get_all_restaurants")
-def get_all_restaurants(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+async def get_all_restaurants_async(request: Request, page: int = Query(default=1, ge=1),
+                                    after: str | None = Query(default=None),
+                                    db: AsyncSession = Depends(get_async_read_db)):
     per_page = 20
+
+    current_etag = http_cache.etag(request, await http_cache.table_version_async(db, Restaurant))
+    if http_cache.etag_matches(request, current_etag):
+        return http_cache.not_modified(current_etag, http_cache.LIST_CACHE_CONTROL, headers)
+
+    response_headers = {**headers, **http_cache.cache_headers(current_etag, http_cache.LIST_CACHE_CONTROL)}
+
+    key = (Restaurant.__tablename__, "all", page, after)
+    content = catalog_cache.get(key)
+    if content is not None:
+        return ORJSONResponse(content=content, headers=response_headers)
+
+    generation = catalog_cache.generation(Restaurant.__tablename__)
+
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [Restaurant.restaurant_id])
+        try:
+            rows = (await db.execute(
+                pagination.keyset(select(*serializers.columns(Restaurant)), [Restaurant.restaurant_id], cursor)
+            )).all()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": str(error)})
+
+        restaurants, next_cursor = pagination.split_page(rows, [Restaurant.restaurant_id])
+
+        content = {
+            "restaurants": [row_to_dict(restaurant) for restaurant in restaurants],
+            "next_cursor": next_cursor
+        }
+        catalog_cache.set(key, content, generation)
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=response_headers)
+
     try:
-        count = db.query(func.count(Restaurant.restaurant_id)).scalar()
+        count = await catalog_counters.get_count_async(db, Restaurant)
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
 
     if count == 0:
-        return JSONResponse(content=[], headers=headers)
+        catalog_cache.set(key, [], generation)
+        return ORJSONResponse(content=[], headers=response_headers)
 
     max_page = (count - 1) // per_page + 1
     if page > max_page:
@@ -250,7 +501,9 @@ def get_all_restaurants(page: int = Query(default=1, ge=1), db: Session = Depend
     offset = (page - 1) * per_page
 
     try:
-        restaurants = db.query(Restaurant).limit(per_page).offset(offset).all()
+        restaurants = (await db.execute(
+            select(*serializers.columns(Restaurant)).order_by(Restaurant.restaurant_id).limit(per_page).offset(offset)
+        )).all()
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": str(error)})
@@ -259,19 +512,25 @@ def get_all_restaurants(page: int = Query(default=1, ge=1), db: Session = Depend
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Restaurants were not found!")
 
-    restaurants_data = [model_to_dict(restaurant) for restaurant in restaurants]
+    content = {
+        "restaurants": [row_to_dict(restaurant) for restaurant in restaurants],
+        "page": page,
+        "total_pages": max_page,
+        "total_restaurants": count
+    }
+    catalog_cache.set(key, content, generation)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=response_headers)
+
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={
-                            "restaurants": restaurants_data,
-                            "page": page,
-                            "total_pages": max_page,
-                            "total_restaurants": count
-                        }, headers=headers)
+restaurant_router.add_api_route("/get_all_restaurants",
+                                get_all_restaurants_async if config.USE_ASYNC_DB else get_all_restaurants,
+                                methods=["GET"])
 
 
 @restaurant_router.get("/get_logo/{restaurant_id}")
-def get_logo_image(restaurant_id: int, db: Session = Depends(get_db)):
+def get_logo_image(restaurant_id: int, request: Request, size: ImageSize = ImageSize.full,
+                   db: Session = Depends(get_read_db)):
     restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
 
     if not restaurant or not restaurant.logo:
@@ -281,10 +540,11 @@ def get_logo_image(restaurant_id: int, db: Session = Depends(get_db)):
         )
 
     file_name = restaurant.logo
-    file_path = f"{os.getcwd()}/static/images/logo/{file_name}"
+    file_path, media_type = image_variants.pick(image_store.image_dir("logo"), file_name, size,
+                                                request.headers.get("accept"))
 
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return FileResponse(file_path, media_type=media_type, headers={"Vary": "Accept"})
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -293,7 +553,8 @@ def get_logo_image(restaurant_id: int, db: Session = Depends(get_db)):
 
 
 @restaurant_router.get("/get_background/{restaurant_id}")
-def get_background_image(restaurant_id: int, db: Session = Depends(get_db)):
+def get_background_image(restaurant_id: int, request: Request, size: ImageSize = ImageSize.full,
+                         db: Session = Depends(get_read_db)):
     restaurant = db.query(Restaurant).filter(Restaurant.restaurant_id == restaurant_id).first()
 
     if not restaurant or not restaurant.background_image:
@@ -303,10 +564,11 @@ def get_background_image(restaurant_id: int, db: Session = Depends(get_db)):
         )
 
     file_name = restaurant.background_image
-    file_path = f"{os.getcwd()}/static/images/background/{file_name}"
+    file_path, media_type = image_variants.pick(image_store.image_dir("background"), file_name, size,
+                                                request.headers.get("accept"))
 
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return FileResponse(file_path, media_type=media_type, headers={"Vary": "Accept"})
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -319,9 +581,9 @@ def get_background_image(restaurant_id: int, db: Session = Depends(get_db)):
 @restaurant_router.get("/get-all-foods-by-type/{restaurant_id}")
 def get_all_foods_by_type(
     restaurant_id: int,
-    food_kind: str,
+    food_kind: FoodKind,
     page: int = Query(default=1, ge=1),
-    db: Session = Depends(get_db)):
+    db: Session = Depends(get_read_db)):
     per_page = 20
 
 
@@ -332,12 +594,10 @@ def get_all_foods_by_type(
             detail={"message": f"Restaurant with ID {restaurant_id} not found"}
         )
 
-    count = db.query(func.count(Food.food_id)).filter(
-        Food.restaurant_id == restaurant_id, Food.kind == food_kind
-    ).scalar()
+    count = catalog_counters.get_count(db, Food, kind=food_kind, restaurant_id=restaurant_id)
 
     if count == 0:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={"food_ids": [], "data": {"page": 1, "total_pages": 0, "total_foods": 0}},
             headers=headers
@@ -348,12 +608,12 @@ def get_all_foods_by_type(
     page = min(page, max_page)
     offset = (page - 1) * per_page
 
-    foods = db.query(Food).filter(
+    foods = db.query(Food.food_id).filter(
         Food.restaurant_id == restaurant_id,
         Food.kind == food_kind
-    ).offset(offset).limit(per_page).all()
+    ).order_by(Food.food_id).offset(offset).limit(per_page).all()
 
-    food_ids = [food.id for food in foods]
+    food_ids = [food.food_id for food in foods]
 
 
     content = {
@@ -365,4 +625,4 @@ def get_all_foods_by_type(
         }
     }
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
@@ -1,9 +1,16 @@
-from fastapi import HTTPException, status, APIRouter
-from fastapi.responses import JSONResponse
+import datetime
 
+from fastapi import HTTPException, status, APIRouter, Depends, Query
+from services.serializers import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
-from services.db_service import get_row, add_row
+from database import get_db, get_read_db
+from models.models import Restaurant, WorkTime
 from schemas.shemas import RestaurantWorkTimeAdd
+from services import schedule_index, serializers
+from services.cache import catalog_cache
 
 restaurant_work_time_router = APIRouter(tags=["Work Times"], prefix="/api/restaurant/work-time")
 
@@ -14,30 +21,31 @@ headers = {"Access-Control-Allow-Origin": "*",
 
 
 @restaurant_work_time_router.post("/add")
-def add_work_time(data: RestaurantWorkTimeAdd):
-    restaurant = get_row(
-        "restaurants",
-        {
-            "restaurant_id": data.restaurant_id
-        }
-    )
-
-    if not restaurant:
+def add_work_time(data: RestaurantWorkTimeAdd, db: Session = Depends(get_db)):
+    if db.get(Restaurant, data.restaurant_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Restaurant with ID ({data.restaurant_id}) not found"
         )
 
-    row = add_row(
-        "work_time",
-        {
-            "restaurant_id": data.restaurant_id,
-            "day_of_week": data.day_of_week,
-            "opening_time": data.opening_time,
-            "closing_time": data.closing_time
-        }
-    )
-    return JSONResponse(
+    try:
+        open_minute, close_minute = schedule_index.interval(data.day_of_week, data.opening_time, data.closing_time)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    try:
+        db.add(WorkTime(restaurant_id=data.restaurant_id, day_of_week=data.day_of_week,
+                        opening_time=data.opening_time, closing_time=data.closing_time,
+                        open_minute=open_minute, close_minute=close_minute))
+        db.commit()
+    except SQLAlchemyError as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"An error occurred while adding the work time. ERROR: {error}")
+
+    catalog_cache.invalidate(WorkTime.__tablename__)
+
+    return ORJSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
             "message": "Work time added successfully"
@@ -47,24 +55,40 @@ def add_work_time(data: RestaurantWorkTimeAdd):
 
 
 @restaurant_work_time_router.get("/get_all_work_times/{restaurant_id}")
-def get_restaurant_work_times(restaurant_id: int):
-    restaurant = get_row(
-        "work_time",
-        {
-            "restaurant_id": restaurant_id
-        }
-    )
-    if not restaurant:
+def get_restaurant_work_times(restaurant_id: int, db: Session = Depends(get_read_db)):
+    if db.get(Restaurant, restaurant_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Restaurant with ID ({restaurant_id}) not found"
         )
 
-    times = get_row(
-        "work_time",
-        {
-            "restaurant_id": restaurant_id
-        }
-    )
+    times = db.query(*serializers.columns(WorkTime)).filter(WorkTime.restaurant_id == restaurant_id) \
+        .order_by(WorkTime.open_minute, WorkTime.work_time_id).all()
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content=[serializers.row_to_dict(time) for time in times],
+                          headers=headers)
+
+
+@restaurant_work_time_router.get("/open")
+def get_open_restaurants(at: datetime.datetime | None = Query(default=None,
+                                                              description="Default: now. Without a time zone "
+                                                                          "it is the restaurants' local time"),
+                         expand: bool = Query(default=False, description="Return the restaurants, not their ids"),
+                         db: Session = Depends(get_read_db)):
+    minute = schedule_index.minute_of_week(at)
+
+    try:
+        if expand:
+            # One query on the (open_minute, close_minute) index, joined to the restaurants
+            restaurants = db.query(*serializers.columns(Restaurant)).filter(Restaurant.restaurant_id.in_(
+                select(WorkTime.restaurant_id).where(schedule_index.open_criteria(minute))
+            )).order_by(Restaurant.restaurant_id).all()
+            content = {"restaurants": [serializers.row_to_dict(restaurant) for restaurant in restaurants]}
+        else:
+            content = {"restaurant_ids": schedule_index.get_index(db).open_at(minute)}
+    except SQLAlchemyError as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=times, headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
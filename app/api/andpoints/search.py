@@ -0,0 +1,49 @@
+from fastapi import HTTPException, status, APIRouter, Depends, Query
+from services.serializers import ORJSONResponse
+from sqlalchemy.orm import Session
+from enum import Enum
+
+from models.models import Food, Drinks, Restaurant
+from services import search
+from database import get_read_db
+
+search_router = APIRouter(tags=["search"], prefix="/api/search")
+
+headers = {"Access-Control-Allow-Origin": "*",
+           "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+           "Access-Control-Allow-Headers": "Content-Type, Authorization",
+           "Access-Control-Allow-Credentials": "true"}
+
+
+class SearchType(str, Enum):
+    foods = "foods"
+    drinks = "drinks"
+    restaurants = "restaurants"
+
+
+search_models = {
+    SearchType.foods: Food,
+    SearchType.drinks: Drinks,
+    SearchType.restaurants: Restaurant,
+}
+
+
+@search_router.get("")
+def search_catalog(q: str = Query(..., min_length=1, max_length=200),
+                   type: SearchType | None = Query(default=None, description="Search only foods, drinks or restaurants"),
+                   page: int = Query(default=1, ge=1, le=50),
+                   db: Session = Depends(get_read_db)):
+
+    content = {"query": q, "page": page, "has_next": False}
+
+    for search_type in ([type] if type else list(SearchType)):
+        try:
+            rows, has_next = search.search(db, search_models[search_type], q, page)
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": f"An error occurred while searching {search_type.value}. ERROR: {error}"})
+
+        content[search_type.value] = rows
+        content["has_next"] = content["has_next"] or has_next
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
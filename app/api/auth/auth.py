@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Form, UploadFile, File, Query
-from fastapi.responses import JSONResponse, FileResponse
-from sqlalchemy.orm import Session
-import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Form, UploadFile, File, Query, Request
+from fastapi.responses import FileResponse
+from services.serializers import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
 import os
-import shutil
-from models.models import User  # Assuming the SQLAlchemy User model is in the models.py file
+import queue
+from models.models import User, FavoriteFood, FavoriteRestaurant  # Assuming the SQLAlchemy User model is in the models.py file
 from core import security
 from core.confirm_registration import mail_verification_email
 from schemas.shemas import UserAdd, UserLogin
-from database import get_db
+from services import pagination, image_store, image_variants, serializers
+from services.image_variants import ImageSize
+from services.mail_queue import MailNotConfigured
+from database import get_db, get_read_db
 
 auth_router = APIRouter(tags=["auth"], prefix="/api/auth")
 
@@ -30,24 +33,17 @@ def verify_email(email: str, db: Session = Depends(get_db)):
     user.status = True
     db.commit()
     db.refresh(user)
+    security.invalidate_user(user.user_id)
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "You have successfully passed the verification"},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "You have successfully passed the verification"},
+                          headers=headers)
 
 
 @auth_router.post("/add-user")
 def add_user(name: str = Form(...), email: str = Form(...), password: str = Form(...),
              confirm_password: str = Form(...), phone_number: str = Form(...),
              profile_image: UploadFile = File(...), db: Session = Depends(get_db)):
-    global profile_image_name
-    current_date_time = (datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
-
-    if profile_image:
-        profile_image_name = f"profile_image_{current_date_time}.{profile_image.filename.split('.')[-1]}"
-    # else:
-        # profile_image_name = f"default-avatar_{current_date_time}.png"
-
     if password != confirm_password:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                             detail="Incorrect password")
@@ -60,6 +56,17 @@ def add_user(name: str = Form(...), email: str = Form(...), password: str = Form
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Email already exists")
 
+    # Save profile image if provided
+    profile_image_name = None
+    if profile_image:
+        try:
+            profile_image_name = image_store.save("profile_image", profile_image)
+        except HTTPException:
+            raise
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": str(error)})
+
     # Insert user into database
     new_user = User(
         name=name,
@@ -69,30 +76,30 @@ def add_user(name: str = Form(...), email: str = Form(...), password: str = Form
         profile_image=profile_image_name
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    # Save profile image if provided
-    if profile_image:
-        try:
-            with open(f"{os.getcwd()}/static/images/profile_image/{profile_image_name}", "wb") as file_object:
-                shutil.copyfileobj(profile_image.file, file_object)
-        except Exception as error:
-            db.rollback()
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail={"message": error})
+    try:
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": str(error)})
 
-    # Send verification email
-    mail_verification_email(email)
+    # Send verification email (queued; the registration stands even if the queue is full or mail is off)
+    try:
+        mail_verification_email(email)
+    except queue.Full:
+        print(f"Mail queue full, verification email to {email} dropped")
+    except MailNotConfigured as error:
+        print(f"Verification email to {email} not sent: {error}")
 
-    return JSONResponse(status_code=status.HTTP_201_CREATED,
-                        content={"message": "You have successfully registered"})
+    return ORJSONResponse(status_code=status.HTTP_201_CREATED,
+                          content={"message": "You have successfully registered"})
 
 
 
 @auth_router.get("/get-one-user-by-id/{user_id}")
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
+def get_user_by_id(user_id: int, db: Session = Depends(get_read_db)):
     try:
         user = db.query(User).filter(User.user_id == user_id).first()
     except Exception as error:
@@ -104,19 +111,59 @@ def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
                              detail=f"User with id {user_id} was not found!")
 
     # Return the user data as a JSON response
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"user_id": user.user_id, "name": user.name, "email": user.email,
-                                 "phone_number": user.phone_number, "address": user.address,
-                                 "profile_image": user.profile_image, "status": user.status},
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"user_id": user.user_id, "name": user.name, "email": user.email,
+                                   "phone_number": user.phone_number, "address": user.address,
+                                   "profile_image": user.profile_image, "status": user.status},
+                          headers=headers)
+
+
+
+@auth_router.get("/profile")
+def get_profile(db: Session = Depends(get_read_db), current_user=Depends(security.current_user)):
+    """The signed-in user with their cards, favorites and orders, for the profile screen."""
+    user_id = current_user["user_id"]
 
+    try:
+        # One query per collection (selectin), each favorite joined to its food or restaurant: five in all
+        user = db.query(User).options(
+            selectinload(User.cards),
+            selectinload(User.favorite_foods).joinedload(FavoriteFood.food),
+            selectinload(User.favorite_restaurants).joinedload(FavoriteRestaurant.restaurant),
+            selectinload(User.orders),
+        ).filter(User.user_id == user_id).first()
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f'Error occurred while fetching the profile of user {user_id} ERROR: {error}')
+
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"User with id {user_id} was not found!")
+
+    profile = serializers.model_to_dict(user)
+    del profile["password"]
+
+    cards = []
+    for card in user.cards:
+        card = serializers.model_to_dict(card)
+        del card["card_cvv"]
+        cards.append(card)
+
+    content = {
+        "user": profile,
+        "cards": cards,
+        "favorite_foods": [serializers.model_to_dict(favorite.food) for favorite in user.favorite_foods
+                           if favorite.food is not None],
+        "favorite_restaurants": [serializers.model_to_dict(favorite.restaurant)
+                                 for favorite in user.favorite_restaurants if favorite.restaurant is not None],
+        "orders": [serializers.model_to_dict(order) for order in user.orders],
+    }
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=content, headers=headers)
 
 
 @auth_router.put("/update_profile_image/{user_id}")
 def update_profile_image(user_id: int, profile_image: UploadFile = File(...), db: Session = Depends(get_db)):
-    current_date_time = datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-    profile_image_name = f"profile_image_{current_date_time}.{profile_image.filename.split('.')[-1]}"
-
     # Query to find the user by ID
     target_user = db.query(User).filter(User.user_id == user_id).first()
 
@@ -124,32 +171,34 @@ def update_profile_image(user_id: int, profile_image: UploadFile = File(...), db
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                              detail="User not found")
 
-    old_image_path = target_user.profile_image
+    try:
+        profile_image_name = image_store.save("profile_image", profile_image)
+    except HTTPException:
+        raise
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                             detail=f"Error updating profile image: {str(error)}")
 
     try:
         target_user.profile_image = profile_image_name
         db.commit()
-
-
-        if old_image_path and os.path.exists(f"{os.getcwd()}/static/images/profile_image/{old_image_path}"):
-            os.remove(f"{os.getcwd()}/static/images/profile_image/{old_image_path}")
-
-        with open(f"{os.getcwd()}/static/images/profile_image/{profile_image_name}", "wb") as file_object:
-            shutil.copyfileobj(profile_image.file, file_object)
-
     except Exception as error:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                              detail=f"Error updating profile image: {str(error)}")
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "Profile picture updated successfully"},
-                        headers=headers)
+    security.invalidate_user(user_id)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "Profile picture updated successfully",
+                                   "image_url": image_store.url("profile_image", profile_image_name)},
+                          headers=headers)
 
 
 
 @auth_router.get("/get_profile_image/{user_id}")
-def get_profile_image(user_id: int, db: Session = Depends(get_db)):
+def get_profile_image(user_id: int, request: Request, size: ImageSize = ImageSize.full,
+                      db: Session = Depends(get_read_db)):
     user = db.query(User).filter(User.user_id == user_id).first()
 
     if not user or not user.profile_image:
@@ -158,10 +207,11 @@ def get_profile_image(user_id: int, db: Session = Depends(get_db)):
             detail="Profile image not found"
         )
 
-    file_path = f"{os.getcwd()}/static/images/profile_image/{user.profile_image}"
+    file_path, media_type = image_variants.pick(image_store.image_dir("profile_image"), user.profile_image, size,
+                                                request.headers.get("accept"))
 
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return FileResponse(file_path, media_type=media_type, headers={"Vary": "Accept"})
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -185,12 +235,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail={"message": str(error)})
 
-    profile_image_path = os.path.join(os.getcwd(), "static", "images", "profile_image", target_user.profile_image)
-
-    if os.path.exists(profile_image_path):
-        os.remove(profile_image_path)
+    security.invalidate_user(user_id)
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "Successfully deleted"}, headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content={"message": "Successfully deleted"}, headers=headers)
 
 
 
@@ -214,23 +261,36 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
 
     access_token = security.create_access_token({"user_id": user.user_id})
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={
-                            "Message": "Successfully logged in! Your access token",
-                            "access_token": access_token,
-                            "user_id": user.user_id
-                        },
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={
+                              "Message": "Successfully logged in! Your access token",
+                              "access_token": access_token,
+                              "user_id": user.user_id
+                          },
+                          headers=headers)
 
 
 @auth_router.get("/get_all_users")
-def get_all_users(page: int = Query(default=1, ge=1), db: Session = Depends(get_db)):
+def get_all_users(page: int = Query(default=1, ge=1), after: str | None = Query(default=None),
+                  db: Session = Depends(get_read_db)):
     per_page = 20
 
+    user_columns = (User.user_id, User.name, User.email, User.phone_number, User.address, User.profile_image, User.status)
+
+    if after is not None:
+        cursor = pagination.decode_cursor(after, [User.user_id])
+        users, next_cursor = pagination.split_page(
+            pagination.keyset(db.query(*user_columns), [User.user_id], cursor).all(), [User.user_id]
+        )
+
+        return ORJSONResponse(status_code=status.HTTP_200_OK,
+                              content={"users": [dict(user._mapping) for user in users], "next_cursor": next_cursor},
+                              headers=headers)
+
     count = db.query(User).count()
 
     if count == 0:
-        return JSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
+        return ORJSONResponse(status_code=status.HTTP_200_OK, content=[], headers=headers)
 
     max_page = (count - 1) // per_page + 1
 
@@ -239,7 +299,8 @@ def get_all_users(page: int = Query(default=1, ge=1), db: Session = Depends(get_
 
     offset = (page - 1) * per_page
 
-    users = db.query(User.user_id, User.name, User.email, User.phone_number, User.address, User.profile_image, User.status) \
+    users = db.query(*user_columns) \
+              .order_by(User.user_id) \
               .limit(per_page) \
               .offset(offset) \
               .all()
@@ -257,11 +318,11 @@ def get_all_users(page: int = Query(default=1, ge=1), db: Session = Depends(get_
         for user in users
     ]
 
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={
-                            "users": users_list,
-                            "page": page,
-                            "total_pages": max_page,
-                            "total_users": count
-                        },
-                        headers=headers)
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={
+                              "users": users_list,
+                              "page": page,
+                              "total_pages": max_page,
+                              "total_users": count
+                          },
+                          headers=headers)
@@ -3,7 +3,7 @@ from sqlalchemy import text
 
 import random
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+from services.serializers import ORJSONResponse
 
 from services.service_email import send_email
 from core import security
@@ -14,9 +14,6 @@ from schemas.shemas import PasswordReset
 
 forgot_router = APIRouter(tags=["Forgot password"], prefix="/api/password_reset")
 
-sender = "niddleproject@gmail.com"
-password = "ngzr kwsw jvcs oiae"
-
 
 @forgot_router.post("/request/{email}")
 def forgot_password(email: str, db: Session = Depends(get_db)):
@@ -32,9 +29,19 @@ def forgot_password(email: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"User with email '{email}' was not found!")
 
+    code = random.randint(99999, 1000000)
+
     try:
-        code = random.randint(99999, 1000000)
+        reset_entry = ResetPassword(user_id=target_user.user_id, code=code)  # Create instance of RessetPassword model
+        db.add(reset_entry)
+        db.commit()
+        db.refresh(reset_entry)
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"detail": str(error)})
 
+    # Queued after the commit, so the code in the mail always exists
+    try:
         subject = "Password Reset E-mail"
 
         body = f"""You received this email because
@@ -45,24 +52,15 @@ def forgot_password(email: str, db: Session = Depends(get_db)):
 
                     If you did not request a password reset you can safely ignore this email
                   """
-        send_email(subject, body, sender, email, password)
+        send_email(subject, body, email)
 
     except Exception as error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail={"message": "Mail service fail, please contact us",
                                     "detail": str(error)})
 
-    try:
-        reset_entry = ResetPassword(user_id=target_user.user_id, code=code)  # Create instance of RessetPassword model
-        db.add(reset_entry)
-        db.commit()
-        db.refresh(reset_entry)
-    except Exception as error:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail={"detail": str(error)})
-
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content={"message": "We sent you a personal CODE, please check your mail"})
+    return ORJSONResponse(status_code=status.HTTP_200_OK,
+                          content={"message": "We sent you a personal CODE, please check your mail"})
 
 
 
@@ -114,12 +112,16 @@ def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)):
         )
 
         db.commit()
+        security.invalidate_user(target_user.user_id)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={"message": "Password changed successfully"}
         )
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as error:
         db.rollback()
         raise HTTPException(
@@ -16,9 +16,7 @@ def mail_body(email):
 
 
 subject = "Confirm Registration"
-sender = "niddleproject@gmail.com"
-password = "ngzr kwsw jvcs oiae"
 
 
 def mail_verification_email(email):
-    send_email(subject, mail_body(email), sender, email, password)
+    send_email(subject, mail_body(email), email)
@@ -0,0 +1,30 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from database import engine
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Revision matching the schema the old Base.metadata.create_all() produced
+BASELINE_REVISION = "f6812c1ecfc6"
+
+
+def alembic_config() -> Config:
+    return Config(os.path.join(APP_DIR, "alembic.ini"))
+
+
+def run_migrations():
+    alembic_cfg = alembic_config()
+
+    with engine.begin() as connection:
+        alembic_cfg.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+
+        # Databases created by create_all() have the baseline tables but no alembic_version table yet
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(alembic_cfg, BASELINE_REVISION)
+
+        command.upgrade(alembic_cfg, "head")
@@ -0,0 +1,107 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from core import config
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+pool = None
+pool_lock = threading.Lock()
+
+# Requests allowed in password work at once (running in a worker or waiting for one). The requests wait
+# in the API's threadpool, so this is what keeps a burst of logins from taking every thread.
+slots = threading.BoundedSemaphore(config.PASSWORD_MAX_PENDING)
+
+metrics_lock = threading.Lock()
+metrics = {"in_flight": 0, "peak_in_flight": 0, "completed": 0, "rejected": 0, "errors": 0,
+           "queue_seconds": 0.0, "max_queue_seconds": 0.0, "compute_seconds": 0.0}
+
+
+def run(operation: str, *args):
+    """Executed in the worker processes; returns the result and the seconds bcrypt took."""
+    start = time.perf_counter()
+    result = pwd_context.hash(*args) if operation == "hash" else pwd_context.verify(*args)
+    return result, time.perf_counter() - start
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global pool
+    with pool_lock:
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=config.PASSWORD_WORKERS)
+        return pool
+
+
+def reset_pool():
+    global pool
+    with pool_lock:
+        pool = None
+
+
+def submit(operation: str, *args):
+    if not slots.acquire(blocking=False):
+        with metrics_lock:
+            metrics["rejected"] += 1
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many password checks at the moment, please retry",
+                            headers={"Retry-After": "1"})
+
+    with metrics_lock:
+        metrics["in_flight"] += 1
+        metrics["peak_in_flight"] = max(metrics["peak_in_flight"], metrics["in_flight"])
+
+    start = time.perf_counter()
+    try:
+        if config.PASSWORD_WORKERS > 0:
+            result, compute = get_pool().submit(run, operation, *args).result()
+        else:
+            result, compute = run(operation, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool for the next request
+        reset_pool()
+        with metrics_lock:
+            metrics["errors"] += 1
+        raise
+    finally:
+        slots.release()
+        with metrics_lock:
+            metrics["in_flight"] -= 1
+
+    queued = time.perf_counter() - start - compute
+    with metrics_lock:
+        metrics["completed"] += 1
+        metrics["queue_seconds"] += queued
+        metrics["max_queue_seconds"] = max(metrics["max_queue_seconds"], queued)
+        metrics["compute_seconds"] += compute
+
+    return result
+
+
+def hash_password(plain_password: str) -> str:
+    return submit("hash", plain_password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return submit("verify", plain_password, hashed_password)
+
+
+def stats() -> dict:
+    with metrics_lock:
+        completed = metrics["completed"]
+        return {
+            "workers": config.PASSWORD_WORKERS,
+            "max_pending": config.PASSWORD_MAX_PENDING,
+            "in_flight": metrics["in_flight"],
+            "peak_in_flight": metrics["peak_in_flight"],
+            "completed": completed,
+            "rejected": metrics["rejected"],
+            "errors": metrics["errors"],
+            "avg_queue_ms": round(metrics["queue_seconds"] / completed * 1000, 2) if completed else None,
+            "max_queue_ms": round(metrics["max_queue_seconds"] * 1000, 2),
+            "avg_compute_ms": round(metrics["compute_seconds"] / completed * 1000, 2) if completed else None,
+        }
@@ -1,30 +1,43 @@
 import datetime
+import time
 
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security.oauth2 import OAuth2PasswordBearer
 
+from core import config, password_pool
 from models.models import User
-from database import get_db
+from database import get_read_db, get_async_read_db
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.cache import TTLCache
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 ACCESS_TOKEN_EXPIRE_MINUETS = 43200
 ACCESS_TOKEN_ALGORITHM = "HS256"
 ACCESS_TOKEN_SECRET = "SECRET"
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl="login")
 
+# Decoded tokens (("tokens", token) -> payload) and the users they authenticate (("user:<id>", "principal") ->
+# column dict), so the common authenticated request neither decodes the JWT nor queries users. Every user
+# has its own namespace, so a change to one user only drops that user's entry. Per process: other workers
+# see a change once their copy expires.
+principal_cache = TTLCache(config.AUTH_CACHE_SIZE, config.AUTH_CACHE_TTL)
+
+# What current_user returns (everything but the password hash)
+PRINCIPAL_COLUMNS = (User.user_id, User.name, User.email, User.phone_number, User.address, User.profile_image,
+                     User.status)
 
+
+# bcrypt runs in the password worker processes (503 when too many requests are already waiting for them)
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    return password_pool.hash_password(plain_password)
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.verify_password(plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -54,23 +67,79 @@ def verify_token(token: str, credentials_exception):
 
 
 
-def get_current_user(token: str = Depends(oauth2_schema), db: Session = Depends(get_db)):
-    try:
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid Credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def cached_token(token: str, credentials_exception) -> dict:
+    key = ("tokens", token)
+    payload = principal_cache.get(key)
+
+    if payload is None:
         payload = verify_token(token, credentials_exception)
+        principal_cache.set(key, payload)
+    elif payload.get("exp", float("inf")) <= time.time():
+        # The entry may outlive the token by up to the cache TTL
+        raise credentials_exception
 
-        user_id = payload.get("user_id")
+    return payload
+
+
+def principal_namespace(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def invalidate_user(user_id: int):
+    """Call after committing any change to (or the deletion of) a user."""
+    principal_cache.invalidate(principal_namespace(user_id))
+
+
+def get_current_user(token: str = Depends(oauth2_schema), db: Session = Depends(get_read_db)) -> dict:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid Credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = cached_token(token, credentials_exception)
 
-        user = db.query(User).filter(User.user_id == user_id).first()
+    user_id = payload.get("user_id")
+    key = (principal_namespace(user_id), "principal")
+    principal = principal_cache.get(key)
+
+    if principal is None:
+        generation = principal_cache.generation(key[0])
+        user = db.execute(select(*PRINCIPAL_COLUMNS).where(User.user_id == user_id)).first()
+
+        if not user:
+            raise credentials_exception
+
+        principal = dict(user._mapping)
+        principal_cache.set(key, principal, generation)
+
+    return dict(principal)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_schema),
+                                 db: AsyncSession = Depends(get_async_read_db)) -> dict:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid Credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = cached_token(token, credentials_exception)
+
+    user_id = payload.get("user_id")
+    key = (principal_namespace(user_id), "principal")
+    principal = principal_cache.get(key)
+
+    if principal is None:
+        generation = principal_cache.generation(key[0])
+        user = (await db.execute(select(*PRINCIPAL_COLUMNS).where(User.user_id == user_id))).first()
 
         if not user:
             raise credentials_exception
 
-        return user
-    except Exception as error:
-        raise error
+        principal = dict(user._mapping)
+        principal_cache.set(key, principal, generation)
+
+    return dict(principal)
+
 
+# Dependency used by the routers, switched by USE_ASYNC_DB
+current_user = get_current_user_async if config.USE_ASYNC_DB else get_current_user
@@ -1,11 +1,14 @@
 # FastAPI
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from services.serializers import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-# Database and models
-from database import engine, check_connection
-from models.models import Base
+# Database and migrations
+from core import config
+from core.migrations import run_migrations
+from database import check_connection, ReadYourWritesMiddleware
+from services.image_store import ImmutableStaticFiles, UploadLimitMiddleware, URL_PREFIX
+from services.mail_queue import mail_queue
 
 
 # Routers
@@ -13,17 +16,33 @@ from api.andpoints.food import food_router
 from api.andpoints.favorite_foods import favorite_foods_router
 from api.andpoints.restaurant import restaurant_router
 from api.andpoints.favorite_restaurants import favorite_restaurants_router
+from api.andpoints.favorites import favorites_router
 from api.andpoints.restaurant_work_time import restaurant_work_time_router
 from api.auth.auth import auth_router
 from api.auth.forgot_password import forgot_router
 from api.andpoints.cards import card_router
 from api.andpoints.drinks import drink_router
+from api.andpoints.metrics import metrics_router
+from api.andpoints.search import search_router
+from api.andpoints.catalog_import import catalog_import_router, IMPORT_PREFIX
+from api.andpoints.export import export_router
+from api.andpoints.orders import order_router
 
 
-Base.metadata.create_all(bind=engine)
 check_connection()
+if config.RUN_MIGRATIONS_ON_STARTUP:
+    run_migrations()
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Send the mail still queued before the worker exits
+app.add_event_handler("shutdown", mail_queue.close)
+
+# Rejects oversized image uploads before their body is read
+app.add_middleware(UploadLimitMiddleware, import_prefixes=(IMPORT_PREFIX,))
+
+# Sends a client that just wrote a last_write cookie, so its next reads skip the replicas
+app.add_middleware(ReadYourWritesMiddleware)
 
 # CORS
 origins = ["*"]
@@ -36,17 +55,27 @@ app.add_middleware(
 )
 
 
+# Uploaded images under their content-addressed names (the *_url fields returned by the upload endpoints)
+app.mount(URL_PREFIX, ImmutableStaticFiles(directory="static/images", check_dir=False), name="images")
+
+
 @app.get("/")
 def main():
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "OK"})
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content={"message": "OK"})
 
 
 app.include_router(food_router)
 app.include_router(favorite_foods_router)
 app.include_router(restaurant_router)
 app.include_router(favorite_restaurants_router)
+app.include_router(favorites_router)
 app.include_router(restaurant_work_time_router)
 app.include_router(drink_router)
 app.include_router(auth_router)
 app.include_router(forgot_router)
 app.include_router(card_router)
+app.include_router(metrics_router)
+app.include_router(search_router)
+app.include_router(catalog_import_router)
+app.include_router(export_router)
+app.include_router(order_router)
@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, text, Float, Boolean, TEXT
+from sqlalchemy import Column, Integer, String, ForeignKey, text, Float, Boolean, TEXT, Index, event, insert
 from sqlalchemy.sql.sqltypes import TIMESTAMP
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import relationship
+import datetime
 
 from database import Base
 
 
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+# Last change of a catalog row, to the microsecond so two writes in the same second still get different versions.
+# Set by the ORM (default/onupdate), which is how every write to these tables goes.
+UpdatedAt = TIMESTAMP().with_variant(mysql.TIMESTAMP(fsp=6), "mysql")
+
+
 # class User(Base):
 #     __tablename__ = "users"
 #
@@ -31,6 +43,13 @@ class User(Base):
     created_at = Column(TIMESTAMP, nullable=False,
         server_default=text("CURRENT_TIMESTAMP"))
 
+    # Loaded only where an endpoint asks for them; passive_deletes="all" leaves deleting a user to the foreign keys
+    cards = relationship("Card", order_by="Card.card_id", passive_deletes="all")
+    favorite_foods = relationship("FavoriteFood", order_by="FavoriteFood.favorite_food_id", passive_deletes="all")
+    favorite_restaurants = relationship("FavoriteRestaurant", order_by="FavoriteRestaurant.favorite_restaurant_id",
+                                        passive_deletes="all")
+    orders = relationship("Order", order_by="Order.order_id", passive_deletes="all")
+
 
 # class Card(Base):
 #     __tablename__ = "cards"
@@ -54,6 +73,10 @@ class Card(Base):
     status = Column(Boolean, nullable=False, server_default=text("0"))
     user_id = Column(Integer, ForeignKey("users.user_id"))
 
+    __table_args__ = (
+        Index("ix_cards_user_id_status", "user_id", "status"),
+    )
+
 
 # class Order(Base):
 #     __tablename__ = "orders"
@@ -70,8 +93,51 @@ class Order(Base):
     order_id = Column(Integer, nullable=False, primary_key=True, autoincrement=True)
     address_to = Column(String(255), nullable=False)
     user_id = Column(Integer, ForeignKey("users.user_id"))
+    # Single item of the orders placed before order lines existed; new orders keep their items in order_lines
     food_id = Column(Integer, ForeignKey("foods.food_id"))
     drink_id = Column(Integer, ForeignKey("drinks.drink_id"))
+    total_price = Column(Integer)
+    created_at = Column(TIMESTAMP, nullable=False, default=utcnow, server_default=text("CURRENT_TIMESTAMP"))
+
+    lines = relationship("OrderLine", order_by="OrderLine.order_line_id", passive_deletes="all")
+
+    __table_args__ = (
+        Index("ix_orders_user_id_order_id", "user_id", "order_id"),
+    )
+
+
+class OrderLine(Base):
+    __tablename__ = "order_lines"
+
+    order_line_id = Column(Integer, nullable=False, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=False)
+    food_id = Column(Integer, ForeignKey("foods.food_id"))
+    drink_id = Column(Integer, ForeignKey("drinks.drink_id"))
+    quantity = Column(Integer, nullable=False)
+    # Price of one item when the order was placed
+    unit_price = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_order_lines_order_id", "order_id"),
+    )
+
+
+class IdempotencyKey(Base):
+    """Idempotency-Key of a placed order: a retry with the same key gets that order back instead of a new one."""
+    __tablename__ = "idempotency_keys"
+
+    idempotency_key_id = Column(Integer, nullable=False, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    # sha256 of the request body, so the same key sent with a different order is refused
+    request_hash = Column(String(64), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False, default=utcnow, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        Index("uq_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
 
 
 # class FavoriteFood(Base):
@@ -88,6 +154,12 @@ class FavoriteFood(Base):
     user_id = Column(Integer, ForeignKey("users.user_id"))
     food_id = Column(Integer, ForeignKey("foods.food_id"))
 
+    food = relationship("Food")
+
+    __table_args__ = (
+        Index("uq_favorite_foods_user_id_food_id", "user_id", "food_id", unique=True),
+    )
+
 
 # class Food(Base):
 #     __tablename__ = "foods"
@@ -115,6 +187,17 @@ class Food(Base):
     description = Column(String(255), nullable=False)
     rating = Column(Float, nullable=False)
     restaurant_id = Column(Integer, ForeignKey("restaurants.restaurant_id"))
+    updated_at = Column(UpdatedAt, nullable=False, default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        Index("ix_foods_kind", "kind"),
+        Index("ix_foods_restaurant_id_kind", "restaurant_id", "kind"),
+        Index("ix_foods_price", "price"),
+        Index("ix_foods_rating", "rating"),
+        Index("ix_foods_kind_price", "kind", "price"),
+        Index("ix_foods_kind_rating", "kind", "rating"),
+        Index("ix_foods_updated_at", "updated_at"),
+    )
 
 
 # class WorkTime(Base):
@@ -135,6 +218,17 @@ class WorkTime(Base):
     opening_time = Column(String(255), nullable=False)
     closing_time = Column(String(255), nullable=False)
     restaurant_id = Column(Integer, ForeignKey("restaurants.restaurant_id"))
+    # The same span in minutes of the week (Monday 00:00 is 0), set from the strings above by
+    # services/schedule_index. close_minute goes past the end of the week for a span from Sunday into Monday.
+    open_minute = Column(Integer)
+    close_minute = Column(Integer)
+    updated_at = Column(UpdatedAt, nullable=False, default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        Index("ix_work_time_restaurant_id", "restaurant_id"),
+        Index("ix_work_time_open_minute_close_minute", "open_minute", "close_minute"),
+        Index("ix_work_time_updated_at", "updated_at"),
+    )
 
 
 class Restaurant(Base):
@@ -150,6 +244,18 @@ class Restaurant(Base):
     logo = Column(String(255), nullable=False)
     background_image = Column(String(255), nullable=False)
     rating = Column(Float, nullable=False)
+    updated_at = Column(UpdatedAt, nullable=False, default=utcnow, onupdate=utcnow)
+
+    # Endpoints pick the loading (selectinload) where they need these. passive_deletes="all": deleting a restaurant
+    # leaves its rows to the foreign keys, as before, instead of the ORM setting their restaurant_id to NULL.
+    foods = relationship("Food", order_by="Food.food_id", passive_deletes="all")
+    drinks = relationship("Drinks", order_by="Drinks.drink_id", passive_deletes="all")
+    work_times = relationship("WorkTime", order_by="[WorkTime.open_minute, WorkTime.work_time_id]",
+                              passive_deletes="all")
+
+    __table_args__ = (
+        Index("ix_restaurants_updated_at", "updated_at"),
+    )
 
 #
 # class FavoriteRestaurant(Base):
@@ -190,6 +296,12 @@ class FavoriteRestaurant(Base):
     user_id = Column(Integer, ForeignKey("users.user_id"))
     restaurant_id = Column(Integer, ForeignKey("restaurants.restaurant_id"))
 
+    restaurant = relationship("Restaurant")
+
+    __table_args__ = (
+        Index("uq_favorite_restaurants_user_id_restaurant_id", "user_id", "restaurant_id", unique=True),
+    )
+
 class ResetPassword(Base):
     __tablename__ = "password_reset"
 
@@ -197,6 +309,10 @@ class ResetPassword(Base):
     user_id = Column(Integer, ForeignKey("users.user_id"))
     code = Column(Integer, nullable=False, unique=True)
 
+    __table_args__ = (
+        Index("ix_password_reset_user_id", "user_id"),
+    )
+
 class Drinks(Base):
     __tablename__ = "drinks"
 
@@ -207,4 +323,39 @@ class Drinks(Base):
     drink_name = Column(String(255), nullable=False)
     description = Column(String(255), nullable=False)
     rating = Column(Float, nullable=False)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.restaurant_id"))
\ No newline at end of file
+    restaurant_id = Column(Integer, ForeignKey("restaurants.restaurant_id"))
+    updated_at = Column(UpdatedAt, nullable=False, default=utcnow, onupdate=utcnow)
+
+    __table_args__ = (
+        Index("ix_drinks_kind", "kind"),
+        Index("ix_drinks_restaurant_id_kind", "restaurant_id", "kind"),
+        Index("ix_drinks_price", "price"),
+        Index("ix_drinks_rating", "rating"),
+        Index("ix_drinks_kind_price", "kind", "price"),
+        Index("ix_drinks_kind_rating", "kind", "rating"),
+        Index("ix_drinks_updated_at", "updated_at"),
+    )
+
+
+class DeletedRow(Base):
+    """Tombstone of a deleted catalog row, so incremental exports (since=) can pass the deletion on."""
+    __tablename__ = "deleted_rows"
+
+    deleted_row_id = Column(Integer, nullable=False, primary_key=True, autoincrement=True)
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(UpdatedAt, nullable=False, default=utcnow)
+
+    __table_args__ = (
+        Index("ix_deleted_rows_table_name_deleted_at", "table_name", "deleted_at"),
+    )
+
+
+def record_deletion(mapper, connection, target):
+    # In the deleting transaction, so the tombstone exists exactly when the delete is committed
+    connection.execute(insert(DeletedRow.__table__), {"table_name": mapper.local_table.name,
+                                                      "row_id": mapper.primary_key_from_instance(target)[0]})
+
+
+for catalog_model in (Food, Drinks, Restaurant, WorkTime):
+    event.listen(catalog_model, "after_delete", record_deletion)
@@ -1,5 +1,5 @@
 # For Data Validations
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserAdd(BaseModel):
@@ -45,7 +45,7 @@ class UpdateFood(BaseModel):
 
 
 class RestaurantWorkTimeAdd(BaseModel):
-    restaurant_id: str
+    restaurant_id: int
     day_of_week: str
     opening_time: str
     closing_time: str
@@ -66,4 +66,45 @@ class UpdateDrink(BaseModel):
     price: float
     drink_name: str
     description: str
-    restaurant_id: int
\ No newline at end of file
+    restaurant_id: int
+
+
+# Rows of a bulk catalog import (image: a file in the uploaded archive or the sha256 of a stored image)
+class ImportFood(BaseModel):
+    kind: str
+    price: int = Field(ge=0)
+    cook_time: int = Field(ge=0)
+    food_name: str = Field(min_length=1, max_length=255)
+    description: str = Field(max_length=255)
+    rating: float = Field(ge=0)
+    image: str | None = None
+
+
+class ImportDrink(BaseModel):
+    kind: str
+    price: int = Field(ge=0)
+    drink_name: str = Field(min_length=1, max_length=255)
+    description: str = Field(max_length=255)
+    rating: float = Field(ge=0)
+    image: str | None = None
+
+
+# Batch add/delete of favorites, up to 100 ids per request
+class FavoriteFoodsBatch(BaseModel):
+    food_ids: list[int] = Field(min_length=1, max_length=100)
+
+
+class FavoriteRestaurantsBatch(BaseModel):
+    restaurant_ids: list[int] = Field(min_length=1, max_length=100)
+
+
+# An order with up to 100 lines, each naming either a food or a drink
+class OrderLineAdd(BaseModel):
+    food_id: int | None = None
+    drink_id: int | None = None
+    quantity: int = Field(ge=1, le=100)
+
+
+class OrderAdd(BaseModel):
+    address_to: str = Field(min_length=1, max_length=255)
+    lines: list[OrderLineAdd] = Field(min_length=1, max_length=100)
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from core import config
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after ttl seconds.
+
+    Keys are tuples whose first element is a namespace (a table name). A write invalidates its whole
+    namespace: cheap for a catalog that changes a few times a day and it never leaves a stale list behind.
+    Every namespace has a generation number, bumped on invalidation, so a value loaded before a write can't
+    be stored after it, nor for settle seconds after it (while replicas may still return the old rows).
+    """
+
+    def __init__(self, maxsize: int, ttl: float, settle: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.settle = settle
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()
+        self.generations: dict[str, int] = {}
+        self.invalidated_at: dict[str, float] = {}
+        # namespace -> namespaces holding entries built from it, invalidated along with it
+        self.dependents: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, namespace: str) -> int:
+        with self.lock:
+            return self.generations.get(namespace, 0)
+
+    def set(self, key, value, generation: int | None = None):
+        """Store value; skipped when key's namespace was invalidated since generation was read."""
+        if self.maxsize <= 0:
+            return
+
+        now = time.monotonic()
+        with self.lock:
+            if generation is not None and generation != self.generations.get(key[0], 0):
+                return
+            if now - self.invalidated_at.get(key[0], -self.settle) < self.settle:
+                return
+
+            self.entries[key] = (now + self.ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def add_dependency(self, namespace: str, *sources: str):
+        """Entries of namespace are built from the sources too: invalidating any of them invalidates namespace."""
+        with self.lock:
+            for source in sources:
+                self.dependents.setdefault(source, set()).add(namespace)
+
+    def invalidate(self, namespace: str):
+        with self.lock:
+            namespaces = {namespace, *self.dependents.get(namespace, ())}
+            now = time.monotonic()
+            for name in namespaces:
+                self.generations[name] = self.generations.get(name, 0) + 1
+                self.invalidated_at[name] = now
+            for key in [key for key in self.entries if key[0] in namespaces]:
+                del self.entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            for namespace in {key[0] for key in self.entries}:
+                self.generations[namespace] = self.generations.get(namespace, 0) + 1
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Catalog reads (foods, drinks, restaurants): response contents keyed by (table name, endpoint, *arguments).
+# Per process; other workers see a write once their copy expires, so the TTL bounds staleness across workers.
+catalog_cache = TTLCache(config.CATALOG_CACHE_SIZE, config.CATALOG_CACHE_TTL,
+                         settle=config.READ_YOUR_WRITES_SECONDS if config.REPLICA_DATABASE_URLS else 0)
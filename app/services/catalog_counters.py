@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import func, select
+
+from core import config
+
+# Row counts for the paginated listings, keyed by (table, kind, restaurant_id); None means "any".
+# The add/update/delete endpoints adjust them in place, and every entry is recounted from the
+# database once it is older than COUNTER_RECONCILE_SECONDS, which also picks up writes made by
+# other workers. Per-restaurant keys come from requests, so at most COUNTER_CACHE_SIZE are kept (LRU).
+lock = threading.Lock()
+counts: OrderedDict[tuple, list] = OrderedDict()
+
+
+def counter_key(model, kind=None, restaurant_id=None) -> tuple:
+    return model.__tablename__, getattr(kind, "value", kind), restaurant_id
+
+
+def cached_count(key: tuple) -> int | None:
+    with lock:
+        entry = counts.get(key)
+        if entry is not None and time.monotonic() - entry[1] < config.COUNTER_RECONCILE_SECONDS:
+            counts.move_to_end(key)
+            return entry[0]
+    return None
+
+
+def store_count(key: tuple, count: int):
+    with lock:
+        counts[key] = [count, time.monotonic()]
+        counts.move_to_end(key)
+        while len(counts) > config.COUNTER_CACHE_SIZE:
+            counts.popitem(last=False)
+
+
+def count_statement(model, kind=None, restaurant_id=None):
+    statement = select(func.count()).select_from(model)
+    if kind is not None:
+        statement = statement.where(model.kind == kind)
+    if restaurant_id is not None:
+        statement = statement.where(model.restaurant_id == restaurant_id)
+    return statement
+
+
+def get_count(db, model, kind=None, restaurant_id=None) -> int:
+    key = counter_key(model, kind, restaurant_id)
+    count = cached_count(key)
+
+    if count is None:
+        count = db.execute(count_statement(model, kind, restaurant_id)).scalar()
+        store_count(key, count)
+
+    return count
+
+
+async def get_count_async(db, model, kind=None, restaurant_id=None) -> int:
+    key = counter_key(model, kind, restaurant_id)
+    count = cached_count(key)
+
+    if count is None:
+        count = (await db.execute(count_statement(model, kind, restaurant_id))).scalar()
+        store_count(key, count)
+
+    return count
+
+
+def adjust(model, delta: int, kind=None, restaurant_id=None):
+    """Apply an insert (+1) or delete (-1) to every cached counter the row falls into."""
+    table, kind, _ = counter_key(model, kind)
+    affected = {(table, None, None), (table, kind, None), (table, None, restaurant_id), (table, kind, restaurant_id)}
+
+    with lock:
+        for key in affected:
+            if key in counts:
+                counts[key][0] = max(counts[key][0] + delta, 0)
+
+
+def invalidate(model):
+    with lock:
+        for key in [key for key in counts if key[0] == model.__tablename__]:
+            del counts[key]
@@ -0,0 +1,58 @@
+import datetime
+import zlib
+
+import orjson
+from sqlalchemy import Boolean, literal, select
+from sqlalchemy.orm import Session
+
+from core import config
+from models.models import DeletedRow
+from services.serializers import columns, encode_default, row_to_dict
+
+
+def export_statement(model, since: datetime.datetime | None = None):
+    """Every row of model as plain columns; with since, the rows changed at or after it, oldest change first."""
+    statement = select(*columns(model))
+    primary_key = model.__table__.primary_key.columns
+
+    if since is None:
+        return statement.order_by(*primary_key)
+    return statement.where(model.updated_at >= since).order_by(model.updated_at, *primary_key)
+
+
+def tombstone_statement(model, since: datetime.datetime):
+    """The rows of model deleted at or after since, as {<primary key>: id, "updated_at": deleted at, "deleted": true}.
+
+    deleted_at is named updated_at so the largest updated_at of a pull stays the since of the next one.
+    """
+    primary_key = model.__table__.primary_key.columns[0]
+    return (select(DeletedRow.row_id.label(primary_key.name), DeletedRow.deleted_at.label("updated_at"),
+                   literal(True, Boolean).label("deleted"))
+            .where(DeletedRow.table_name == model.__tablename__, DeletedRow.deleted_at >= since)
+            .order_by(DeletedRow.deleted_at, DeletedRow.row_id))
+
+
+def ndjson_chunks(db: Session, *statements):
+    """One bytes chunk of NDJSON lines per EXPORT_BATCH_SIZE rows, of each statement in turn.
+
+    stream_results asks the driver for a server-side cursor and yield_per fetches that many rows at a time,
+    so only one batch is in memory however big the table is. Closes db when done (or when the client goes away).
+    """
+    try:
+        for statement in statements:
+            result = db.execute(statement.execution_options(stream_results=True,
+                                                            yield_per=config.EXPORT_BATCH_SIZE))
+            for rows in result.partitions():
+                yield b"".join(orjson.dumps(row_to_dict(row), default=encode_default,
+                                            option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+    finally:
+        db.close()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(config.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
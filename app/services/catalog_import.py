@@ -0,0 +1,132 @@
+import csv
+import io
+import zipfile
+
+import orjson
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from core import config
+from services import image_store
+
+# Per-row errors returned to the client; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def read_csv(file_object):
+    """(line number, row) pairs; empty cells count as missing values."""
+    text = io.TextIOWrapper(file_object, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if name and value != ""}
+    finally:
+        # Leave the upload open; Starlette closes it
+        text.detach()
+
+
+def read_ndjson(file_object):
+    """(line number, object) pairs, with a ValueError in place of a line that isn't a JSON object."""
+    for number, line in enumerate(file_object, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as error:
+            yield number, ValueError(f"Invalid JSON: {error}")
+            continue
+        yield number, row if isinstance(row, dict) else ValueError("Each line must be a JSON object")
+
+
+class ImageResolver:
+    """Turns the image column of imported rows into stored image names.
+
+    A value is either the sha256 (or full name) of an image that is already stored, or the path of an
+    entry in the uploaded zip archive, which is stored like any upload. Rows without one get the kind's
+    placeholder image. Every value is resolved once per import.
+    """
+
+    def __init__(self, kind: str, archive: zipfile.ZipFile | None, default: str):
+        self.kind = kind
+        self.archive = archive
+        self.default = default
+        self.resolved: dict[str, str] = {}
+
+    def resolve(self, reference: str | None) -> str:
+        if not reference:
+            return self.default
+
+        name = self.resolved.get(reference)
+        if name is None:
+            name = image_store.find_stored(self.kind, reference) or self.store_entry(reference)
+            self.resolved[reference] = name
+        return name
+
+    def store_entry(self, reference: str) -> str:
+        if self.archive is None:
+            raise ValueError(f"image: '{reference}' is not a stored image and no archive was uploaded")
+        try:
+            info = self.archive.getinfo(reference)
+        except KeyError:
+            raise ValueError(f"image: '{reference}' is not in the archive")
+
+        try:
+            with self.archive.open(info) as entry:
+                return image_store.save_file(self.kind, entry)
+        except HTTPException as error:
+            raise ValueError(f"image: {error.detail}")
+
+
+def error_messages(error: Exception) -> list[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()]
+    return [str(error)]
+
+
+def import_rows(db: Session, model, schema: type[BaseModel], kinds: set[str], restaurant_id: int, rows,
+                images: ImageResolver) -> dict:
+    """Validate rows and insert the valid ones in batches of IMPORT_BATCH_SIZE (executemany).
+
+    Nothing is committed here: the caller commits once every row is processed, so an import is applied
+    whole or not at all, apart from the rows reported as errors.
+    """
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    for count, (number, row) in enumerate(rows, start=1):
+        if count > config.MAX_IMPORT_ROWS:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"An import can have at most {config.MAX_IMPORT_ROWS} rows")
+
+        try:
+            if isinstance(row, Exception):
+                raise row
+
+            item = schema.model_validate(row)
+            if item.kind not in kinds:
+                raise ValueError(f"kind: must be one of {', '.join(sorted(kinds))}")
+
+            values = item.model_dump()
+            values["image"] = images.resolve(item.image)
+            values["restaurant_id"] = restaurant_id
+        except ValueError as error:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": number, "errors": error_messages(error)})
+            continue
+
+        batch.append(values)
+        if len(batch) >= config.IMPORT_BATCH_SIZE:
+            db.execute(insert(model.__table__), batch)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        db.execute(insert(model.__table__), batch)
+        imported += len(batch)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
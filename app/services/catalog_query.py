@@ -0,0 +1,135 @@
+from enum import Enum
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from services import pagination, catalog_counters
+from services.cache import catalog_cache
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+def parse_fields(model, fields: str | None) -> list[str]:
+    """Column names for ?fields=a,b,c (all columns when omitted)."""
+    columns = [column.name for column in model.__table__.columns]
+
+    if not fields:
+        return columns
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in columns]
+
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail={"message": f"Unknown fields: {', '.join(unknown)}",
+                                    "allowed": columns})
+
+    return list(dict.fromkeys(requested))
+
+
+def row_to_dict(row, field_names: list[str]) -> dict:
+    # Only the requested fields: the sort key columns may have been selected for the cursor alone
+    values = row._mapping
+    return {name: values[name] for name in field_names}
+
+
+def catalog_criteria(model, kind=None, restaurant_id=None, min_price=None, max_price=None,
+                     min_rating=None, max_rating=None) -> list:
+    criteria = []
+
+    if kind is not None:
+        criteria.append(model.kind == kind)
+    if restaurant_id is not None:
+        criteria.append(model.restaurant_id == restaurant_id)
+    if min_price is not None:
+        criteria.append(model.price >= min_price)
+    if max_price is not None:
+        criteria.append(model.price <= max_price)
+    if min_rating is not None:
+        criteria.append(model.rating >= min_rating)
+    if max_rating is not None:
+        criteria.append(model.rating <= max_rating)
+
+    return criteria
+
+
+def catalog_page(db: Session, model, items_key: str, *, kind=None, restaurant_id=None,
+                 min_price=None, max_price=None, min_rating=None, max_rating=None,
+                 sort: str | None = None, descending: bool = False, fields: str | None = None,
+                 page: int = 1, after: str | None = None, per_page: int = pagination.PER_PAGE) -> dict:
+    """Filtered, sorted, projected page of foods or drinks, served from catalog_cache when possible."""
+    kind = getattr(kind, "value", kind)
+    key = (model.__tablename__, "query", kind, restaurant_id, min_price, max_price, min_rating, max_rating,
+           sort, descending, fields, page, after, per_page)
+
+    content = catalog_cache.get(key)
+    if content is None:
+        generation = catalog_cache.generation(model.__tablename__)
+        content = fetch_catalog_page(db, model, items_key, kind, restaurant_id, min_price, max_price,
+                                     min_rating, max_rating, sort, descending, fields, page, after, per_page)
+        catalog_cache.set(key, content, generation)
+
+    return content
+
+
+def fetch_catalog_page(db: Session, model, items_key: str, kind, restaurant_id, min_price, max_price,
+                       min_rating, max_rating, sort, descending, fields, page, after, per_page) -> dict:
+    """Only the requested columns are selected. Sorting is on (sort column, primary key) so the
+    (kind, price) / (kind, rating) indexes serve both the ORDER BY and the cursor seek.
+    """
+    primary_key = model.__mapper__.primary_key[0].key
+    sort = sort or primary_key
+    key_names = [sort] if sort == primary_key else [sort, primary_key]
+    key_columns = [getattr(model, name) for name in key_names]
+
+    field_names = parse_fields(model, fields)
+    selected = list(dict.fromkeys([*field_names, *key_names]))
+    criteria = catalog_criteria(model, kind, restaurant_id, min_price, max_price, min_rating, max_rating)
+
+    query = db.query(*(getattr(model, name) for name in selected)).filter(*criteria)
+
+    if after is not None:
+        cursor = pagination.decode_cursor(after, key_columns)
+        try:
+            rows = pagination.keyset(query, key_columns, cursor, per_page, descending).all()
+        except Exception as error:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail={"message": f"An error occurred while fetching {items_key}. ERROR: {error}"})
+
+        rows, next_cursor = pagination.split_page(rows, key_columns, per_page)
+
+        return {items_key: [row_to_dict(row, field_names) for row in rows],
+                "next_cursor": next_cursor}
+
+    try:
+        if len(criteria) == (kind is not None) + (restaurant_id is not None):
+            count = catalog_counters.get_count(db, model, kind=kind, restaurant_id=restaurant_id)
+        else:
+            count = query.order_by(None).count()
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"An error occurred while counting {items_key}. ERROR: {error}"})
+
+    if count == 0:
+        return {items_key: [], "page": 1, "total_pages": 0, f"total_{items_key}": 0}
+
+    max_page = (count - 1) // per_page + 1
+    page = min(max(page, 1), max_page)
+
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+
+    try:
+        rows = query.order_by(*order).offset((page - 1) * per_page).limit(per_page).all()
+    except Exception as error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail={"message": f"An error occurred while fetching {items_key}. ERROR: {error}"})
+
+    return {
+        items_key: [row_to_dict(row, field_names) for row in rows],
+        "page": page,
+        "total_pages": max_page,
+        f"total_{items_key}": count,
+    }
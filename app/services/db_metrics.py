@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float):
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS) if seconds <= bound), len(WAIT_BUCKETS))
+        with self.lock:
+            self.checkouts += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[index] += 1
+
+    def observe_overflow(self):
+        with self.lock:
+            self.overflow_events += 1
+
+    def observe_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self.lock:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip([*WAIT_BUCKETS, "+Inf"], self.wait_buckets):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_seconds_sum": round(self.wait_sum, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "wait_seconds_histogram": histogram,
+            }
+
+
+class MeteredPoolMixin:
+    """Times every checkout (including the wait for a free connection) and counts overflow/timeouts."""
+    metrics: PoolMetrics = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def _inc_overflow(self):
+        created = super()._inc_overflow()
+        if created and self._overflow > 0:
+            self.metrics.observe_overflow()
+        return created
+
+
+registry: dict[str, tuple[PoolMetrics, object]] = {}
+
+
+def metered_pool_class(name: str, base):
+    # A class per engine, so metrics survive pool.recreate() (which only passes the standard pool arguments)
+    metrics = registry[name][0] if name in registry else PoolMetrics()
+    return type(f"Metered{base.__name__}", (MeteredPoolMixin, base), {"metrics": metrics})
+
+
+def register(name: str, engine):
+    registry[name] = (engine.pool.metrics, engine)
+
+
+def pool_stats() -> dict:
+    return {
+        "pid": os.getpid(),
+        "pools": {name: metrics.snapshot(engine.pool) for name, (metrics, engine) in registry.items()},
+    }
@@ -0,0 +1,51 @@
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy.orm import Session
+
+from core import config
+from models.models import FavoriteFood, FavoriteRestaurant
+from services.cache import TTLCache
+
+# A user's favorite food ids and restaurant ids as sorted arrays of 8-byte ints
+# (("favorites:<user id>", "foods" | "restaurants") -> array), for the "is favorite" flags on menu pages
+favorites_cache = TTLCache(config.FAVORITES_CACHE_SIZE, config.FAVORITES_CACHE_TTL,
+                           settle=config.READ_YOUR_WRITES_SECONDS if config.REPLICA_DATABASE_URLS else 0)
+
+favorite_columns = {
+    "foods": (FavoriteFood.user_id, FavoriteFood.food_id),
+    "restaurants": (FavoriteRestaurant.user_id, FavoriteRestaurant.restaurant_id),
+}
+
+
+def namespace(user_id: int) -> str:
+    return f"favorites:{user_id}"
+
+
+def invalidate(user_id: int):
+    """Called after every committed change to a user's favorites; the next lookup reloads the set."""
+    favorites_cache.invalidate(namespace(user_id))
+
+
+def favorite_ids(db: Session, user_id: int, kind: str) -> array:
+    key = (namespace(user_id), kind)
+    ids = favorites_cache.get(key)
+
+    if ids is None:
+        generation = favorites_cache.generation(key[0])
+        user_column, id_column = favorite_columns[kind]
+        # The (user_id, item id) unique index covers this query and returns the ids already sorted
+        ids = array("q", (row[0] for row in db.query(id_column).filter(user_column == user_id).order_by(id_column)))
+        favorites_cache.set(key, ids, generation)
+
+    return ids
+
+
+def contains(ids: array, item_id: int) -> bool:
+    position = bisect_left(ids, item_id)
+    return position < len(ids) and ids[position] == item_id
+
+
+def membership(db: Session, user_id: int, kind: str, item_ids: list[int]) -> dict[int, bool]:
+    ids = favorite_ids(db, user_id, kind)
+    return {item_id: contains(ids, item_id) for item_id in item_ids}
@@ -0,0 +1,122 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, status
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.models import DeletedRow
+from services import catalog_counters
+from services.cache import catalog_cache
+
+# Cache-Control per kind of catalog route. Lists change whenever anything in the table does, so clients
+# revalidate every time (a 304 costs one aggregate query); a single item may be reused for a short while.
+LIST_CACHE_CONTROL = "public, no-cache"
+ITEM_CACHE_CONTROL = "public, max-age=30, must-revalidate"
+
+# Table name -> the version this worker last read
+seen_versions: dict[str, str] = {}
+
+
+def version_statement(*models):
+    """count(*), max(updated_at) and the newest tombstone of every table, in one round trip.
+
+    Inserts and updates move max(updated_at), deletes through the ORM add a tombstone and any other delete
+    (a foreign key cascade, a script) changes the count. All three come from indexes.
+    """
+    columns = []
+    for model in models:
+        columns += [
+            select(func.count()).select_from(model).scalar_subquery(),
+            select(func.max(model.updated_at)).scalar_subquery(),
+            select(func.max(DeletedRow.deleted_at)).where(DeletedRow.table_name == model.__tablename__)
+            .scalar_subquery(),
+        ]
+    return select(*columns)
+
+
+def version_token(models, row) -> str:
+    """Version of the tables, read from the database on every request so all workers agree on it.
+
+    A table whose version moved since this worker last saw it was written by someone else (another worker,
+    an import, a script): its entries in catalog_cache and its counters are dropped, so the response that
+    goes out with the new ETag is built from the new rows.
+    """
+    tokens = []
+    for number, model in enumerate(models):
+        count, last_updated, last_deleted = row[3 * number:3 * number + 3]
+        token = f"{count}-{last_updated.isoformat() if last_updated else ''}-" \
+                f"{last_deleted.isoformat() if last_deleted else ''}"
+
+        if seen_versions.get(model.__tablename__, token) != token:
+            catalog_cache.invalidate(model.__tablename__)
+            catalog_counters.invalidate(model)
+        seen_versions[model.__tablename__] = token
+        tokens.append(token)
+
+    return "|".join(tokens)
+
+
+def table_version(db: Session, *models) -> str:
+    return version_token(models, db.execute(version_statement(*models)).one())
+
+
+async def table_version_async(db: AsyncSession, *models) -> str:
+    return version_token(models, (await db.execute(version_statement(*models))).one())
+
+
+def etag(request: Request, version: str) -> str:
+    """Strong ETag for this URL (path and query) at this table version."""
+    digest = hashlib.sha1(f"{version}|{request.url.path}|{request.url.query}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, current_etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so a W/ prefix added by a proxy still matches
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return current_etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def utc_datetime(value: str | datetime.datetime) -> datetime.datetime:
+    # updated_at values are naive UTC
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.replace(tzinfo=datetime.timezone.utc)
+
+
+def http_date(value: str | datetime.datetime) -> str:
+    return format_datetime(utc_datetime(value), usegmt=True)
+
+
+def not_modified_since(request: Request, last_modified) -> bool:
+    """If-Modified-Since check for a request without If-None-Match (which takes precedence when both are sent)."""
+    header = request.headers.get("if-modified-since")
+    if not header or request.headers.get("if-none-match"):
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    # HTTP dates have whole seconds
+    return utc_datetime(last_modified).replace(microsecond=0) <= since
+
+
+def cache_headers(current_etag: str, cache_control: str, last_modified=None) -> dict:
+    result = {"ETag": current_etag, "Cache-Control": cache_control, "Access-Control-Expose-Headers": "ETag"}
+    if last_modified:
+        result["Last-Modified"] = http_date(last_modified)
+    return result
+
+
+def not_modified(current_etag: str, cache_control: str, headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={**headers, **cache_headers(current_etag, cache_control)})
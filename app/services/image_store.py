@@ -0,0 +1,314 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from fastapi import HTTPException, UploadFile, status
+from services.serializers import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.staticfiles import StaticFiles
+
+from core import config
+from models.models import Food, Drinks, Restaurant, User
+from services import image_variants
+
+# Image directory (under static/images) -> the columns whose values are file names in it
+IMAGE_KINDS = {
+    "food": [(Food, "image")],
+    "drink": [(Drinks, "image")],
+    "logo": [(Restaurant, "logo")],
+    "background": [(Restaurant, "background_image")],
+    "profile_image": [(User, "profile_image")],
+}
+
+URL_PREFIX = "/static/images"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 1024 * 1024
+
+# sha256 of the content plus the extension (and the variant size); only these names never change content
+HASHED_NAME = re.compile(r"[0-9a-f]{64}(\.(thumb|card|full))?(\.[a-z0-9]{1,8})?")
+
+# The sweep renames an orphan candidate to this prefix before its last checks, so save() can't reuse it meanwhile
+TRASH_PREFIX = ".trash-"
+
+
+def image_dir(kind: str) -> str:
+    return os.path.join(os.getcwd(), "static", "images", kind)
+
+
+def image_path(kind: str, name: str) -> str:
+    return os.path.join(image_dir(kind), name)
+
+
+def url(kind: str, name: str) -> str:
+    return f"{URL_PREFIX}/{kind}/{name}"
+
+
+# Extensions sniff() gives stored images
+IMAGE_EXTENSIONS = (".jpg", ".png", ".gif", ".webp", ".avif")
+
+
+def sniff(head: bytes) -> str | None:
+    """File extension for the image format the leading bytes belong to, None if it isn't an accepted image."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return ".avif"
+    return None
+
+
+def fsync_directory(directory: str):
+    # Makes the rename itself durable; directories can't be opened on Windows
+    if hasattr(os, "O_DIRECTORY"):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def save(kind: str, upload: UploadFile) -> str:
+    """Store an uploaded image under the sha256 of its bytes and return the file name.
+
+    Anything that isn't a JPEG, PNG, GIF, WebP or AVIF (by its leading bytes, whatever the file name says)
+    is rejected with 415, and anything over MAX_UPLOAD_BYTES with 413. The upload is hashed first, so a
+    file that is already stored isn't written again. New files are written to a temporary name, fsynced
+    and renamed into place, so readers never see a partial image.
+    """
+    return save_file(kind, upload.file)
+
+
+def reuse(path: str) -> bool:
+    """Refresh the mtime of a stored file that is being reused; False when there is no such file.
+
+    The fresh mtime keeps the sweep off the file until the row pointing at it is committed. A file the sweep
+    has just moved aside counts as missing, so the caller writes it again.
+    """
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def save_file(kind: str, source) -> str:
+    """save() for any seekable binary file object (e.g. an entry of an imported zip archive)."""
+    source.seek(0)
+    chunk = source.read(CHUNK_SIZE)
+    image_extension = sniff(chunk)
+    if image_extension is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Only JPEG, PNG, GIF, WebP and AVIF images can be uploaded")
+
+    digest = hashlib.sha256()
+    size = 0
+    while chunk:
+        size += len(chunk)
+        if size > config.MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"Images can be at most {config.MAX_UPLOAD_BYTES} bytes")
+        digest.update(chunk)
+        chunk = source.read(CHUNK_SIZE)
+
+    name = f"{digest.hexdigest()}{image_extension}"
+    directory = image_dir(kind)
+    path = os.path.join(directory, name)
+
+    if reuse(path):
+        return name
+
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        source.seek(0)
+        with os.fdopen(descriptor, "wb") as file_object:
+            while chunk := source.read(CHUNK_SIZE):
+                file_object.write(chunk)
+            file_object.flush()
+            os.fsync(file_object.fileno())
+        os.replace(temp_path, path)
+        fsync_directory(directory)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    image_variants.schedule(directory, name)
+
+    return name
+
+
+def find_stored(kind: str, reference: str) -> str | None:
+    """Name of an already stored image given as its file name or bare sha256, None if there is none."""
+    reference = reference.strip().lower()
+
+    if re.fullmatch(r"[0-9a-f]{64}", reference):
+        candidates = [reference + image_extension for image_extension in IMAGE_EXTENSIONS]
+    elif re.fullmatch(r"[0-9a-f]{64}\.[a-z0-9]{1,8}", reference):
+        candidates = [reference]
+    else:
+        return None
+
+    for name in candidates:
+        if reuse(image_path(kind, name)):
+            return name
+    return None
+
+
+def referenced_names(db: Session, kind: str) -> set[str]:
+    names = set()
+    for model, column in IMAGE_KINDS[kind]:
+        names.update(db.execute(select(getattr(model, column)).distinct()).scalars())
+    return names
+
+
+def sweep_orphans(db: Session, grace: float | None = None) -> int:
+    """Delete the stored images no row points at any more (python -m services.image_store); returns how many.
+
+    Nothing is deleted while requests run: identical uploads share one file, and another worker may be about to
+    commit a row pointing at a file that looks unreferenced now. Only files untouched for
+    IMAGE_ORPHAN_GRACE_SECONDS and unreferenced are candidates. Each is renamed to a .trash- name first, so from
+    then on save() and find_stored() in any process write it again instead of reusing it. Then the references
+    are read once more and the mtime is checked (a reuse just before the rename refreshed it): a file that
+    turns out to be in use is put back, the others are deleted.
+    """
+    grace = config.IMAGE_ORPHAN_GRACE_SECONDS if grace is None else grace
+    removed = 0
+
+    for kind in IMAGE_KINDS:
+        directory = image_dir(kind)
+        if not os.path.isdir(directory):
+            continue
+
+        # Left behind by a sweep that stopped half way: back in place, they go through the checks again
+        for name in os.listdir(directory):
+            if name.startswith(TRASH_PREFIX):
+                os.replace(os.path.join(directory, name), os.path.join(directory, name[len(TRASH_PREFIX):]))
+
+        cutoff = time.time() - grace
+        referenced = referenced_names(db, kind)
+        trashed = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if (not HASHED_NAME.fullmatch(name) or name.count(".") > 1 or name in referenced
+                    or os.path.getmtime(path) >= cutoff):
+                continue
+            try:
+                os.rename(path, os.path.join(directory, TRASH_PREFIX + name))
+                trashed.append(name)
+            except OSError:
+                # Gone already, or can't be moved: it stays an orphan until the next sweep
+                pass
+        if not trashed:
+            continue
+
+        # A new transaction, so rows committed since the first read are seen (MySQL reads from a snapshot)
+        db.rollback()
+        referenced = referenced_names(db, kind)
+        for name in trashed:
+            path = os.path.join(directory, name)
+            trash_path = os.path.join(directory, TRASH_PREFIX + name)
+            if name in referenced or os.path.getmtime(trash_path) >= cutoff:
+                # Same bytes as any copy save() wrote again meanwhile
+                os.replace(trash_path, path)
+                continue
+
+            # Unless save() wrote it again meanwhile: then the variants belong to the new copy
+            if not os.path.exists(path):
+                image_variants.remove(directory, name)
+            os.remove(trash_path)
+            removed += 1
+
+    return removed
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Serves static/images, marking content-addressed files as cacheable forever."""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if HASHED_NAME.fullmatch(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+class UploadLimitMiddleware:
+    """Answers 413 to multipart requests bigger than MAX_UPLOAD_REQUEST_BYTES (MAX_IMPORT_REQUEST_BYTES
+    under import_prefixes).
+
+    The form (and the files in it) is read before any endpoint runs, so the limit has to apply here: up
+    front from Content-Length, and while streaming for bodies sent without one.
+    """
+
+    def __init__(self, app, import_prefixes: tuple = ()):
+        self.app = app
+        self.import_prefixes = import_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_headers = dict(scope["headers"])
+        if not request_headers.get(b"content-type", b"").startswith(b"multipart/"):
+            return await self.app(scope, receive, send)
+
+        if self.import_prefixes and scope["path"].startswith(self.import_prefixes):
+            limit = config.MAX_IMPORT_REQUEST_BYTES
+        else:
+            limit = config.MAX_UPLOAD_REQUEST_BYTES
+        content_length = request_headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            return await self.reject(scope, receive, send, limit)
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit and not response_started:
+                    # Answer now and tell the app the client is gone, so it stops reading the body
+                    rejected = True
+                    await self.reject(scope, receive, send, limit)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        await self.app(scope, limited_receive, tracked_send)
+
+    @staticmethod
+    async def reject(scope, receive, send, limit: int):
+        response = ORJSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                  content={"detail": f"Request body is larger than {limit} bytes"},
+                                  headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print("orphaned images deleted:", sweep_orphans(session))
+    finally:
+        session.close()
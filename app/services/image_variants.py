@@ -0,0 +1,162 @@
+import glob
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional: without it only the original uploads are served
+    Image = None
+
+from core import config
+
+
+class ImageSize(str, Enum):
+    thumb = "thumb"
+    card = "card"
+    full = "full"
+    original = "original"
+
+
+# Longest side in pixels (smaller images are never upscaled)
+SIZES = {ImageSize.thumb: 128, ImageSize.card: 480, ImageSize.full: 1600}
+
+# Pillow format, file extension, media type
+ENCODINGS = {
+    "avif": ("AVIF", "avif", "image/avif"),
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "png": ("PNG", "png", "image/png"),
+}
+SAVE_OPTIONS = {
+    "AVIF": {"quality": 60},
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+}
+
+pool = None
+
+
+def variant_name(name: str, size: str, extension: str) -> str:
+    return f"{os.path.splitext(name)[0]}.{size}.{extension}"
+
+
+def write_atomic(image, path: str, image_format: str):
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".variant-")
+    try:
+        with os.fdopen(descriptor, "wb") as file_object:
+            image.save(file_object, image_format, **SAVE_OPTIONS[image_format])
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def generate(directory: str, name: str) -> list[str]:
+    """Write every size in AVIF (when Pillow has it), WebP and JPEG/PNG next to the original.
+
+    Runs in the worker processes, so it only depends on Pillow.
+    """
+    with Image.open(os.path.join(directory, name)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    encodings = ["webp", "png" if has_alpha else "jpeg"]
+    if features.check("avif"):
+        encodings.insert(0, "avif")
+
+    written = []
+    for size, edge in SIZES.items():
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+
+        for encoding in encodings:
+            image_format, extension, _ = ENCODINGS[encoding]
+            path = os.path.join(directory, variant_name(name, size.value, extension))
+            write_atomic(variant, path, image_format)
+            written.append(path)
+
+    return written
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global pool
+    if pool is None:
+        # Created on the first upload; the workers only ever run generate()
+        pool = ProcessPoolExecutor(max_workers=config.IMAGE_WORKERS)
+    return pool
+
+
+def report_failure(future):
+    if future.exception() is not None:
+        print(f"Image variants failed: {future.exception()}")
+
+
+def schedule(directory: str, name: str):
+    """Generate the variants of a newly stored image in the background; endpoints serve the original meanwhile."""
+    if Image is None or not config.IMAGE_VARIANTS:
+        return
+    get_pool().submit(generate, directory, name).add_done_callback(report_failure)
+
+
+def remove(directory: str, name: str):
+    for path in glob.glob(os.path.join(directory, glob.escape(os.path.splitext(name)[0]) + ".*.*")):
+        os.remove(path)
+
+
+def accepted_types(accept: str | None) -> set[str]:
+    types = set()
+    for part in (accept or "").split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                types.add(media_type.lower())
+        except ValueError:
+            pass
+    return types
+
+
+def pick(directory: str, name: str, size: ImageSize, accept: str | None) -> tuple[str, str | None]:
+    """Path and media type of the best stored file for this size and Accept header.
+
+    Falls back to the original when the variants don't exist (yet, or Pillow isn't installed).
+    """
+    if size != ImageSize.original:
+        accepted = accepted_types(accept)
+        for encoding in ("avif", "webp", "jpeg", "png"):
+            _, extension, media_type = ENCODINGS[encoding]
+            if encoding in ("avif", "webp") and media_type not in accepted:
+                continue
+            path = os.path.join(directory, variant_name(name, size.value, extension))
+            if os.path.exists(path):
+                return path, media_type
+
+    return os.path.join(directory, name), None
+
+
+def backfill(directory: str) -> int:
+    """Generate missing variants for the images already in a directory (python -m services.image_variants)."""
+    count = 0
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        name = os.path.basename(path)
+        if name.startswith(".") or name.count(".") != 1:
+            continue
+        if not os.path.exists(os.path.join(directory, variant_name(name, ImageSize.thumb.value, "webp"))):
+            try:
+                generate(directory, name)
+                count += 1
+            except Exception as error:
+                print(f"Skipped {name}: {error}")
+    return count
+
+
+if __name__ == "__main__":
+    root = os.path.join(os.getcwd(), "static", "images")
+    for kind in sorted(os.listdir(root)):
+        if os.path.isdir(os.path.join(root, kind)):
+            print(kind, backfill(os.path.join(root, kind)))
@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+from core import config
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies won't change by sending again; 4xx ones, dropped connections and network errors may."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class MailNotConfigured(RuntimeError):
+    pass
+
+
+class MailQueue:
+    """Sends mail from a background thread so requests return as soon as a message is queued.
+
+    The worker keeps one authenticated SMTP connection open and sends everything that is waiting over it
+    (up to batch_size messages) before waiting again; the connection is closed after idle_timeout seconds
+    without mail. A message that fails with a temporary error is set aside and retried on a fresh connection
+    once its backoff (doubled every time) has passed, up to max_retries times; the rest of the queue keeps
+    going meanwhile. Queued mail only lives in memory, so it is lost if the process dies.
+    """
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "", sender: str = "",
+                 use_ssl: bool = True, starttls: bool = False, timeout: float = 30, idle_timeout: float = 30,
+                 batch_size: int = 50, max_retries: int = 5, backoff: float = 1, maxsize: int = 10000):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.messages: queue.Queue = queue.Queue(maxsize)
+        # Messages waiting for a retry, as a heap of (not before, sequence number, message, attempt);
+        # only the worker touches it
+        self.delayed: list = []
+        self.sequence = itertools.count()
+        self.last_sent = 0.0
+        self.lock = threading.Lock()
+        self.worker: threading.Thread | None = None
+        self.smtp: smtplib.SMTP | None = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.connections = 0
+
+    def check_configured(self):
+        """Raise MailNotConfigured unless there is a sender and, for a TLS server, a username and password."""
+        if not self.sender:
+            raise MailNotConfigured("No sender address, set SMTP_USER or MAIL_SENDER")
+        if (self.use_ssl or self.starttls) and not (self.username and self.password):
+            raise MailNotConfigured(f"No credentials for {self.host}, set SMTP_USER and SMTP_PASSWORD")
+
+    def enqueue(self, subject: str, body: str, recipient: str):
+        """Queue a plain text message; raises queue.Full when the worker is too far behind and
+        MailNotConfigured when it could never be sent."""
+        self.check_configured()
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.sender
+        message["To"] = recipient
+        message.set_content(body)
+
+        self.start()
+        self.messages.put_nowait(message)
+
+    def start(self):
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name="mail-queue", daemon=True)
+                self.worker.start()
+
+    def join(self):
+        """Block until every queued message has been sent or given up on."""
+        self.messages.join()
+
+    def close(self):
+        """Send what is queued and stop the worker (app shutdown)."""
+        if self.worker is not None and self.worker.is_alive():
+            self.messages.put(None)
+            self.worker.join()
+
+    def run(self):
+        closing = False
+        while True:
+            batch = self.due(everything=closing)
+
+            if not closing:
+                if not batch:
+                    try:
+                        batch.append((self.messages.get(timeout=self.wait_time()), 0))
+                    except queue.Empty:
+                        if time.monotonic() - self.last_sent >= self.idle_timeout:
+                            self.disconnect()
+                        continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append((self.messages.get_nowait(), 0))
+                    except queue.Empty:
+                        break
+            elif not batch:
+                self.disconnect()
+                return
+
+            self.batches += 1
+            for message, attempt in batch:
+                if message is None:
+                    # close(): what is left gets one more attempt right away
+                    closing = True
+                    self.messages.task_done()
+                    continue
+
+                done = True
+                try:
+                    done = self.deliver(message, attempt, final=closing)
+                finally:
+                    # A message set aside for a retry is done once that retry is
+                    if done:
+                        self.messages.task_done()
+
+    def due(self, everything: bool = False) -> list:
+        """(message, attempt) pairs whose retry is due, all of them when everything is set."""
+        now = time.monotonic()
+        batch = []
+        while self.delayed and len(batch) < self.batch_size and (everything or self.delayed[0][0] <= now):
+            _, _, message, attempt = heapq.heappop(self.delayed)
+            batch.append((message, attempt))
+        return batch
+
+    def wait_time(self) -> float:
+        # Until the next retry is due, at most idle_timeout
+        if self.delayed:
+            return min(self.idle_timeout, max(self.delayed[0][0] - time.monotonic(), 0))
+        return self.idle_timeout
+
+    def connect(self) -> smtplib.SMTP:
+        if self.smtp is None:
+            if self.use_ssl:
+                smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+            else:
+                smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    smtp.starttls()
+                if self.password:
+                    smtp.login(self.username, self.password)
+            except BaseException:
+                smtp.close()
+                raise
+            self.smtp = smtp
+            self.connections += 1
+        return self.smtp
+
+    def disconnect(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self.smtp.close()
+            self.smtp = None
+
+    def deliver(self, message: EmailMessage, attempt: int = 0, final: bool = False) -> bool:
+        """Send message once; False when it failed for now and was set aside to be retried."""
+        try:
+            self.connect().send_message(message)
+            self.sent += 1
+            self.last_sent = time.monotonic()
+            return True
+        except (smtplib.SMTPException, OSError) as error:
+            if is_permanent(error):
+                self.failed += 1
+                print(f"Mail to {message['To']} rejected: {error}")
+                return True
+
+            self.disconnect()
+            if final or attempt == self.max_retries:
+                self.failed += 1
+                print(f"Mail to {message['To']} failed after {attempt + 1} attempts: {error}")
+                return True
+
+            self.retries += 1
+            # A connection the server dropped while idle is simply reopened; anything else backs off
+            if attempt or not isinstance(error, smtplib.SMTPServerDisconnected):
+                delay = min(self.backoff * 2 ** attempt, 60)
+            else:
+                delay = 0
+            heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.sequence), message, attempt + 1))
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.messages.qsize(),
+            "waiting_for_retry": len(self.delayed),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+            "connections": self.connections,
+            "connected": self.smtp is not None,
+        }
+
+
+mail_queue = MailQueue(config.SMTP_HOST, config.SMTP_PORT, config.SMTP_USER, config.SMTP_PASSWORD,
+                       sender=config.MAIL_SENDER, use_ssl=config.SMTP_SSL, starttls=config.SMTP_STARTTLS,
+                       idle_timeout=config.SMTP_IDLE_TIMEOUT, batch_size=config.MAIL_BATCH_SIZE,
+                       max_retries=config.MAIL_MAX_RETRIES, backoff=config.MAIL_RETRY_BACKOFF,
+                       maxsize=config.MAIL_QUEUE_SIZE)
@@ -0,0 +1,131 @@
+import datetime
+import hashlib
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, insert, literal, select, union_all
+from sqlalchemy.orm import Session, selectinload
+
+from core import config
+from models.models import Drinks, Food, IdempotencyKey, Order, OrderLine, utcnow
+from schemas.shemas import OrderAdd
+from services import serializers
+
+# What an order line looks like in responses
+LINE_FIELDS = ("food_id", "drink_id", "quantity", "unit_price")
+
+
+def request_hash(order: OrderAdd) -> str:
+    return hashlib.sha256(orjson.dumps(order.model_dump(), option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+# Built once: the statements are reused as they are, so SQLAlchemy skips rebuilding them and their cache keys
+FOOD_PRICES = select(literal("food").label("item"), Food.food_id.label("item_id"), Food.price) \
+    .where(Food.food_id.in_(bindparam("food_ids", expanding=True)))
+DRINK_PRICES = select(literal("drink").label("item"), Drinks.drink_id.label("item_id"), Drinks.price) \
+    .where(Drinks.drink_id.in_(bindparam("drink_ids", expanding=True)))
+ITEM_PRICES = union_all(FOOD_PRICES, DRINK_PRICES)
+
+INSERT_ORDER = insert(Order.__table__)
+INSERT_LINES = insert(OrderLine.__table__)
+INSERT_KEY = insert(IdempotencyKey.__table__)
+
+
+def unit_prices(connection, order: OrderAdd) -> dict[tuple[str, int], int]:
+    """Current price of every food and drink of the order, {("food" | "drink", id): price}, in one query."""
+    food_ids = list({line.food_id for line in order.lines if line.food_id is not None})
+    drink_ids = list({line.drink_id for line in order.lines if line.drink_id is not None})
+
+    if food_ids and drink_ids:
+        rows = connection.execute(ITEM_PRICES, {"food_ids": food_ids, "drink_ids": drink_ids})
+    elif food_ids:
+        rows = connection.execute(FOOD_PRICES, {"food_ids": food_ids})
+    else:
+        rows = connection.execute(DRINK_PRICES, {"drink_ids": drink_ids})
+
+    return {(row.item, row.item_id): row.price for row in rows}
+
+
+def place_order(db: Session, user_id: int, order: OrderAdd, key: str | None) -> dict:
+    """Insert the order, its lines (one executemany) and the idempotency key; the caller commits.
+
+    The unit prices are the ones the items have now. A key the user already sent fails the last insert on the
+    unique (user_id, key) index, which rolls the whole order back; the caller then answers with replay().
+    """
+    for number, line in enumerate(order.lines, start=1):
+        if (line.food_id is None) == (line.drink_id is None):
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail={"message": f"Line {number} must have either a food_id or a drink_id"})
+
+    # Core statements on the session's connection (and transaction), without the ORM layer
+    connection = db.connection()
+    prices = unit_prices(connection, order)
+
+    lines = []
+    missing = []
+    for line in order.lines:
+        item = ("food", line.food_id) if line.food_id is not None else ("drink", line.drink_id)
+        if item not in prices:
+            missing.append(f"{item[0]} {item[1]}")
+            continue
+        lines.append({"food_id": line.food_id, "drink_id": line.drink_id, "quantity": line.quantity,
+                      "unit_price": prices[item]})
+
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail={"message": f"Not found: {', '.join(missing)}"})
+
+    total_price = sum(line["quantity"] * line["unit_price"] for line in lines)
+    # TIMESTAMP keeps whole seconds, so the response shows what a replay will read back
+    created_at = utcnow().replace(microsecond=0)
+
+    order_id = connection.execute(INSERT_ORDER, {"address_to": order.address_to, "user_id": user_id,
+                                                 "total_price": total_price, "created_at": created_at}
+                                  ).inserted_primary_key[0]
+    connection.execute(INSERT_LINES, [{"order_id": order_id, **line} for line in lines])
+
+    if key is not None:
+        connection.execute(INSERT_KEY, {"user_id": user_id, "key": key, "request_hash": request_hash(order),
+                                        "order_id": order_id, "created_at": created_at})
+
+    return {"order_id": order_id, "address_to": order.address_to, "user_id": user_id, "food_id": None,
+            "drink_id": None, "total_price": total_price, "created_at": created_at, "lines": lines}
+
+
+def order_content(order: Order) -> dict:
+    content = serializers.model_to_dict(order)
+    content["lines"] = [{field: getattr(line, field) for field in LINE_FIELDS} for line in order.lines]
+    return content
+
+
+def replay(db: Session, user_id: int, order: OrderAdd, key: str) -> dict | None:
+    """The order placed earlier with this key, or None when the key is unknown."""
+    record = db.query(IdempotencyKey.request_hash, IdempotencyKey.order_id) \
+        .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).first()
+    if record is None:
+        return None
+
+    if record.request_hash != request_hash(order):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail={"message": "This Idempotency-Key was already used for a different order"})
+
+    placed = db.query(Order).options(selectinload(Order.lines)).filter(Order.order_id == record.order_id).one()
+    return order_content(placed)
+
+
+def purge_idempotency_keys(db: Session) -> int:
+    """Delete the keys older than IDEMPOTENCY_KEY_HOURS; retries after that would place a new order."""
+    cutoff = utcnow() - datetime.timedelta(hours=config.IDEMPOTENCY_KEY_HOURS)
+    deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)).rowcount
+    db.commit()
+    return deleted
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print("idempotency keys deleted:", purge_idempotency_keys(session))
+    finally:
+        session.close()
@@ -0,0 +1,83 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+PER_PAGE = 20
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def matches_column(column, value) -> bool:
+    if value is None or isinstance(value, bool):
+        return False
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return True
+    if python_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, python_type)
+
+
+def decode_cursor(token: str | None, key_columns: list) -> list | None:
+    """Sort key of the last row the client has seen; an empty token means "start from the first row".
+
+    A cursor that doesn't hold one value of the right type per key column (edited by hand, or from another
+    listing) is a 400 here, before it reaches the query.
+    """
+    if not token:
+        return None
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        values = None
+
+    if not isinstance(values, list) or len(values) != len(key_columns) \
+            or not all(matches_column(column, value) for column, value in zip(key_columns, values)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail={"message": "Invalid cursor"})
+
+    return values
+
+
+def after_key(key_columns: list, values: list, descending: bool = False):
+    # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y), which every backend turns into an index range
+    if len(values) != len(key_columns):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail={"message": "Invalid cursor"})
+
+    clauses = []
+    for position, (column, value) in enumerate(zip(key_columns, values)):
+        equal_prefix = [key_columns[i] == values[i] for i in range(position)]
+        clauses.append(and_(*equal_prefix, column < value if descending else column > value))
+
+    return or_(*clauses)
+
+
+def keyset(query, key_columns: list, values: list | None, per_page: int = PER_PAGE, descending: bool = False):
+    """Apply the seek condition, ordering and limit to an ORM query or a select().
+
+    One extra row is fetched so split_page() can tell whether there is a next page.
+    """
+    if values is not None:
+        query = query.filter(after_key(key_columns, values, descending))
+
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    return query.order_by(*order).limit(per_page + 1)
+
+
+def split_page(rows, key_columns: list, per_page: int = PER_PAGE):
+    rows = list(rows)
+    next_cursor = None
+
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in key_columns])
+
+    return rows, next_cursor
@@ -0,0 +1,119 @@
+import datetime
+import re
+from array import array
+from bisect import bisect_right
+from itertools import groupby
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from core import config
+from models.models import WorkTime
+from services.cache import catalog_cache
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+DAYS = {**{name: number for number, name in enumerate(DAY_NAMES)},
+        **{name[:3]: number for number, name in enumerate(DAY_NAMES)}}
+
+TIME = re.compile(r"(\d{1,2})[:.](\d{2})")
+
+timezone = ZoneInfo(config.RESTAURANT_TIMEZONE)
+
+
+def parse_day(value: str) -> int:
+    day = DAYS.get(value.strip().lower())
+    if day is None:
+        raise ValueError(f"day_of_week: '{value}' is not a day of the week")
+    return day
+
+
+def parse_time(value: str, field: str) -> int:
+    match = TIME.fullmatch(value.strip())
+    hour, minute = (int(match.group(1)), int(match.group(2))) if match else (None, None)
+    if match is None or minute > 59 or hour > 24 or (hour == 24 and minute):
+        raise ValueError(f"{field}: '{value}' is not a time (HH:MM)")
+    return hour * 60 + minute
+
+
+def interval(day_of_week: str, opening_time: str, closing_time: str) -> tuple[int, int]:
+    """(open_minute, close_minute) of a work time row.
+
+    A closing time at or before the opening time is on the next day (equal times: open around the clock),
+    so a Sunday night span ends past WEEK.
+    """
+    day = parse_day(day_of_week)
+    start = day * DAY + parse_time(opening_time, "opening_time")
+    end = day * DAY + parse_time(closing_time, "closing_time")
+    if end <= start:
+        end += DAY
+    return start, end
+
+
+def minute_of_week(moment: datetime.datetime | None = None) -> int:
+    """Minute of the week in RESTAURANT_TIMEZONE; a naive moment is taken to be in that zone already."""
+    if moment is None:
+        moment = datetime.datetime.now(timezone)
+    elif moment.tzinfo is not None:
+        moment = moment.astimezone(timezone)
+    return moment.weekday() * DAY + moment.hour * 60 + moment.minute
+
+
+def open_criteria(minute: int):
+    """WHERE clause for work time rows open at minute, as ranges on the (open_minute, close_minute) index.
+
+    A span from Sunday into Monday starts on Sunday (spans are at most a day long), so the second range only
+    looks at the Sunday rows.
+    """
+    return or_(and_(WorkTime.open_minute <= minute, WorkTime.close_minute > minute),
+               and_(WorkTime.open_minute >= WEEK - DAY, WorkTime.close_minute > minute + WEEK))
+
+
+class ScheduleIndex:
+    """Every restaurant's opening hours as intervals sorted by start.
+
+    The intervals of a restaurant are merged first, so overlapping rows don't count twice. open_at() looks at
+    the intervals that started by then, plus the ones wrapping past the end of the week.
+    """
+
+    def __init__(self, rows):
+        intervals = []
+        for restaurant_id, spans in groupby(sorted(rows), key=lambda row: row[0]):
+            merged = []
+            for _, start, end in spans:
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            intervals.extend((start, end, restaurant_id) for start, end in merged)
+
+        intervals.sort()
+        self.starts = array("l", (start for start, _, _ in intervals))
+        self.ends = array("l", (end for _, end, _ in intervals))
+        self.restaurant_ids = array("l", (restaurant_id for _, _, restaurant_id in intervals))
+        self.wrapping = [(end - WEEK, restaurant_id) for _, end, restaurant_id in intervals if end > WEEK]
+
+    def open_at(self, minute: int) -> list[int]:
+        started = bisect_right(self.starts, minute)
+        restaurant_ids = {restaurant_id for end, restaurant_id
+                          in zip(self.ends[:started], self.restaurant_ids[:started]) if end > minute}
+        restaurant_ids.update(restaurant_id for end, restaurant_id in self.wrapping if end > minute)
+        return sorted(restaurant_ids)
+
+
+def get_index(db: Session) -> ScheduleIndex:
+    """The index, kept in catalog_cache under the work_time namespace; writes to work times invalidate it."""
+    key = (WorkTime.__tablename__, "schedule_index")
+    index = catalog_cache.get(key)
+
+    if index is None:
+        generation = catalog_cache.generation(WorkTime.__tablename__)
+        rows = db.execute(select(WorkTime.restaurant_id, WorkTime.open_minute, WorkTime.close_minute)
+                          .where(WorkTime.open_minute.is_not(None), WorkTime.restaurant_id.is_not(None))).all()
+        index = ScheduleIndex(tuple(row) for row in rows)
+        catalog_cache.set(key, index, generation)
+
+    return index
@@ -0,0 +1,70 @@
+import re
+
+from sqlalchemy import func, inspect, literal_column, or_, select, table, column
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from models.models import Food, Drinks, Restaurant
+from services import pagination, serializers
+
+# model -> columns covered by the full-text index (MySQL FULLTEXT / SQLite FTS5, see the search migration)
+SEARCH_FIELDS = {
+    Food: ("food_name", "description"),
+    Drinks: ("drink_name", "description"),
+    Restaurant: ("restaurant_name", "description"),
+}
+
+# (bind, table name) -> whether that table's FTS5 table exists (a SQLite database built with create_all() has none)
+fts_available: dict = {}
+
+
+def search_terms(q: str) -> list[str]:
+    # Only word characters reach the engine, so user input can't inject FTS5 / boolean-mode operators
+    return re.findall(r"\w+", q.lower())[:10]
+
+
+def has_fts(db: Session, model) -> bool:
+    key = (db.get_bind(), model.__tablename__)
+    if key not in fts_available:
+        fts_available[key] = inspect(key[0]).has_table(f"{model.__tablename__}_fts")
+    return fts_available[key]
+
+
+def search_statement(db: Session, model, terms: list[str]):
+    """select() of the model's columns for rows matching every term (as a prefix), best match first."""
+    primary_key = model.__mapper__.primary_key[0]
+    columns = [getattr(model, name) for name in SEARCH_FIELDS[model]]
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        score = match(*columns, against=" ".join(f"+{term}*" for term in terms)).in_boolean_mode()
+        return select(*serializers.columns(model)).where(score > 0).order_by(score.desc(), primary_key)
+
+    if dialect == "sqlite" and has_fts(db, model):
+        fts = table(f"{model.__tablename__}_fts", column("rowid"))
+        fts_name = literal_column(fts.name)
+        # bm25() is lower-is-better
+        score = func.bm25(fts_name)
+        return (select(*serializers.columns(model))
+                .join_from(fts, model, primary_key == fts.c.rowid)
+                .where(fts_name.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+                .order_by(score, primary_key))
+
+    # No inverted index on this backend: a plain scan, good enough for local testing only
+    criteria = [or_(*(column_.ilike(f"%{term}%") for column_ in columns)) for term in terms]
+    return select(*serializers.columns(model)).where(*criteria).order_by(primary_key)
+
+
+def search(db: Session, model, q: str, page: int = 1, per_page: int = pagination.PER_PAGE):
+    """One page of ranked matches as (list of column dicts, has_next).
+
+    There is no total count: counting every match would cost as much as the search itself.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return [], False
+
+    statement = search_statement(db, model, terms).offset((page - 1) * per_page).limit(per_page + 1)
+    rows = db.execute(statement).all()
+
+    return [serializers.row_to_dict(row) for row in rows[:per_page]], len(rows) > per_page
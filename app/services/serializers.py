@@ -0,0 +1,55 @@
+import decimal
+import operator
+from functools import lru_cache
+
+import orjson
+from fastapi.responses import ORJSONResponse as BaseORJSONResponse
+
+
+def encode_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(BaseORJSONResponse):
+    """JSON response encoded by orjson.
+
+    Datetimes, dates and enums are encoded natively, so rows go out as they come from the database;
+    non-string keys (the per-pid metrics) are turned into strings like the standard library does.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def dumps(content) -> bytes:
+    """content encoded like ORJSONResponse does, for bodies that are rendered once and cached."""
+    return orjson.dumps(content, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def columns(model) -> tuple:
+    """The model's table columns, for selecting plain rows instead of ORM objects."""
+    return tuple(model.__table__.columns)
+
+
+@lru_cache(maxsize=None)
+def row_serializer(model):
+    """Function turning an instance of model into {column name: value}, built once per model."""
+    mapper = model.__mapper__
+    names = tuple(column.name for column in model.__table__.columns)
+    getter = operator.attrgetter(*(mapper.get_property_by_column(column).key for column in model.__table__.columns))
+
+    if len(names) == 1:
+        return lambda instance: {names[0]: getter(instance)}
+    return lambda instance: dict(zip(names, getter(instance)))
+
+
+def model_to_dict(instance) -> dict:
+    return row_serializer(type(instance))(instance)
+
+
+def row_to_dict(row) -> dict:
+    """A Core row (db.query(*columns) / select(*columns)) as {column name: value}."""
+    return dict(row._mapping)
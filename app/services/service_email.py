@@ -1,13 +1,6 @@
-import smtplib
-from email.mime.text import MIMEText
+from services.mail_queue import mail_queue
 
 
-def send_email(subject, body, sender, recipient, password):
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = sender
-    msg['To'] = recipient
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp_server:
-        smtp_server.login(sender, password)
-        smtp_server.sendmail(sender, recipient, msg.as_string())
-    print("Message sent!")
+def send_email(subject, body, recipient):
+    # Returns once the message is queued; the mail queue worker delivers it
+    mail_queue.enqueue(subject, body, recipient)
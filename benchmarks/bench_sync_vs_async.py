@@ -0,0 +1,113 @@
+"""Throughput comparison of the sync and async catalog read paths.
+
+Runs both versions of the hot read endpoints side by side against a local
+SQLite database (aiosqlite for the async engine) and prints requests/second:
+
+    python benchmarks/bench_sync_vs_async.py --requests 2000 --concurrency 50
+
+Point DATABASE_URL at MySQL to measure the real deployment instead.
+
+The catalog cache and the listing counters are turned off (CATALOG_CACHE_SIZE=0, COUNTER_RECONCILE_SECONDS=0)
+so every request goes to the database; otherwise both paths mostly measure cache hits. Set them to measure the
+cached deployment.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app")
+sys.path.insert(0, os.path.abspath(APP_DIR))
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("CATALOG_CACHE_SIZE", "0")
+os.environ.setdefault("COUNTER_RECONCILE_SECONDS", "0")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+import database  # noqa: E402
+from models.models import Base, Food, Drinks, Restaurant  # noqa: E402
+from api.andpoints import food, drinks, restaurant  # noqa: E402
+
+# (name, route, request url, sync handler, async handler)
+ENDPOINTS = [
+    ("foods page", "/foods", "/foods?page=3", food.get_all_foods, food.get_all_foods_async),
+    ("food by id", "/foods/{food_id}", "/foods/42", food.get_food_by_id, food.get_food_by_id_async),
+    ("drinks page", "/drinks", "/drinks?page=3", drinks.get_all_drinks, drinks.get_all_drinks_async),
+    ("restaurant by id", "/restaurants/{restaurant_id}", "/restaurants/7",
+     restaurant.get_restaurant_by_id, restaurant.get_restaurant_by_id_async),
+]
+
+
+def seed(rows: int):
+    database.engine.echo = False
+    Base.metadata.create_all(bind=database.engine)
+
+    db = database.SessionLocal()
+    try:
+        if db.query(Restaurant).count():
+            return
+        db.add_all(Restaurant(restaurant_name=f"restaurant {i}", kind="cafe", description="bench",
+                              restaurant_email=f"r{i}@bench.local", phone_number="0", address="bench",
+                              logo="logo.png", background_image="bg.jpeg", rating=4.5)
+                   for i in range(1, 51))
+        db.add_all(Food(kind="salads", price=1000, cook_time=10, image="food.jpeg", food_name=f"food {i}",
+                        description="bench", rating=4.0, restaurant_id=i % 50 + 1) for i in range(rows))
+        db.add_all(Drinks(kind="carbonated", price=500, image="drink.jpeg", drink_name=f"drink {i}",
+                          description="bench", rating=4.0, restaurant_id=i % 50 + 1) for i in range(rows))
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+    for _, route, _, sync_handler, async_handler in ENDPOINTS:
+        app.add_api_route(route, sync_handler if mode == "sync" else async_handler, methods=["GET"])
+    return app
+
+
+async def run(app: FastAPI, url: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(url)
+
+        async def worker():
+            while not queue.empty():
+                response = await client.get(queue.get_nowait())
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    database.get_async_sessionmaker()
+
+    apps = {"sync": build_app("sync"), "async": build_app("async")}
+
+    print(f"{'endpoint':<20}{'sync req/s':>14}{'async req/s':>14}{'speedup':>10}")
+    for name, _, url, _, _ in ENDPOINTS:
+        sync_rps = await run(apps["sync"], url, args.requests, args.concurrency)
+        async_rps = await run(apps["async"], url, args.requests, args.concurrency)
+        print(f"{name:<20}{sync_rps:>14.0f}{async_rps:>14.0f}{async_rps / sync_rps:>9.2f}x")
+
+    await database.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
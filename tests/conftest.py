@@ -0,0 +1,44 @@
+"""Shared test setup: the app directory on sys.path, one throwaway SQLite database and a client for the app.
+
+Every test module starts from empty tables and cold caches (clean_database), so no module sees another's rows.
+"""
+import os
+import sys
+import tempfile
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app"))
+sys.path.insert(0, APP_DIR)
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+from core import security  # noqa: E402
+from services import catalog_counters, favorites, http_cache  # noqa: E402
+from services.cache import catalog_cache  # noqa: E402
+
+
+def clear_caches():
+    catalog_cache.clear()
+    catalog_counters.counts.clear()
+    http_cache.seen_versions.clear()
+    favorites.favorites_cache.clear()
+    security.principal_cache.clear()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def clean_database():
+    # Children first, so the foreign keys hold at every step
+    with database.engine.begin() as connection:
+        for table in reversed(database.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    clear_caches()
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
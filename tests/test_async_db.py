@@ -0,0 +1,110 @@
+"""USE_ASYNC_DB=1 under aiosqlite gives the same responses as the sync path.
+
+The routes are picked when the app is imported, so the async app runs in a child process on the same database
+file and sends back what it answered.
+
+    python -m pytest tests/test_async_db.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import database
+from core import security
+from models.models import User, Card, Food, Drinks, Restaurant, WorkTime
+
+pytest.importorskip("aiosqlite")
+
+# Runs in the child: imports the app with the async routes and answers every (url, headers) pair
+ASYNC_CLIENT = """
+import json, sys
+from fastapi.testclient import TestClient
+import main
+from core import security
+
+client = TestClient(main.app)
+responses = [client.get(url, headers=headers) for url, headers in json.loads(sys.argv[1])]
+print(json.dumps({"current_user": security.current_user.__name__,
+                  "responses": [[response.status_code, response.json()] for response in responses]}))
+"""
+
+
+@pytest.fixture(scope="module")
+def data():
+    db = database.SessionLocal()
+    try:
+        restaurants = [Restaurant(restaurant_name=f"async {number}", kind="cafe", description="test",
+                                  restaurant_email=f"async{number}@example.com", phone_number="0", address="test",
+                                  logo="logo.png", background_image="background.jpeg", rating=4.5)
+                       for number in range(3)]
+        db.add_all(restaurants)
+        db.flush()
+
+        restaurant_id = restaurants[0].restaurant_id
+        foods = [Food(kind=("salads", "soups")[number % 2], price=100 + number, cook_time=10, image="food.jpeg",
+                      food_name=f"food {number}", description="test", rating=4, restaurant_id=restaurant_id)
+                 for number in range(25)]
+        drinks = [Drinks(kind="juices", price=50 + number, image="drink.jpeg", drink_name=f"drink {number}",
+                         description="test", rating=4, restaurant_id=restaurant_id) for number in range(3)]
+        user = User(name="user", email="async@example.com", password="not used", phone_number="0", status=True)
+        db.add_all([*foods, *drinks, user,
+                    WorkTime(day_of_week="Monday", opening_time="09:00", closing_time="18:00",
+                             restaurant_id=restaurant_id, open_minute=540, close_minute=1080)])
+        db.flush()
+        db.add(Card(card_number=1, card_valid_thru="01/2030", card_name="user", card_cvv=123, user_id=user.user_id))
+        db.commit()
+
+        return {"restaurant_id": restaurant_id, "food_id": foods[0].food_id, "drink_id": drinks[0].drink_id,
+                "user_id": user.user_id}
+    finally:
+        db.close()
+
+
+def requests(data) -> list:
+    cards = {"Authorization": f"Bearer {security.create_access_token({'user_id': data['user_id']})}"}
+    urls = [
+        "/api/food/get_all_foods",
+        "/api/food/get_all_foods?page=2",
+        "/api/food/get_all_foods?after=",
+        f"/api/food/get_food_by_id/{data['food_id']}",
+        "/api/food/get_food_by_id/999999",
+        "/api/drink/get_all_drinks",
+        "/api/drink/get_all_drinks?after=",
+        f"/api/drink/get_drink_by_id/{data['drink_id']}",
+        "/api/restaurant/get_all_restaurants",
+        "/api/restaurant/get_all_restaurants?after=",
+        f"/api/restaurant/get_restaurant_by_id/{data['restaurant_id']}",
+        f"/api/restaurant/menu/{data['restaurant_id']}",
+    ]
+    return [(url, {}) for url in urls] + [("/api/cards/get-all-cards-by-user", cards)]
+
+
+def async_responses(requests: list) -> dict:
+    url = database.engine.url
+    environment = {**os.environ, "USE_ASYNC_DB": "1", "RUN_MIGRATIONS_ON_STARTUP": "0",
+                   "DATABASE_URL": url.render_as_string(hide_password=False),
+                   "ASYNC_DATABASE_URL": url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)}
+    result = subprocess.run([sys.executable, "-c", ASYNC_CLIENT, json.dumps(requests)],
+                            cwd=os.path.dirname(database.__file__), env=environment, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    # The last line; check_connection() prints before it
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_async_routes_answer_like_the_sync_ones(client, data):
+    if database.engine.dialect.name != "sqlite":
+        pytest.skip("compares against aiosqlite")
+
+    pairs = requests(data)
+    expected = [[response.status_code, response.json()]
+                for response in (client.get(url, headers=headers) for url, headers in pairs)]
+
+    content = async_responses(pairs)
+
+    assert content["current_user"] == "get_current_user_async"
+    for (url, _), sync_response, async_response in zip(pairs, expected, content["responses"]):
+        assert async_response == sync_response, url
@@ -0,0 +1,98 @@
+"""ETags and Last-Modified of the catalog routes, including writes this worker didn't make.
+
+    python -m pytest tests/test_http_cache.py
+"""
+import email.utils
+import time
+
+import pytest
+
+import database
+from models.models import Food, Restaurant
+
+ALL_FOODS = "/api/food/get_all_foods"
+
+
+@pytest.fixture(scope="module")
+def restaurant_id():
+    db = database.SessionLocal()
+    try:
+        restaurant = Restaurant(restaurant_name="etags", kind="cafe", description="test",
+                                restaurant_email="etags@example.com", phone_number="0", address="test",
+                                logo="logo.png", background_image="background.jpeg", rating=4.5)
+        db.add(restaurant)
+        db.commit()
+        return restaurant.restaurant_id
+    finally:
+        db.close()
+
+
+def add_food(restaurant_id: int, name: str) -> int:
+    # A session of its own, like another worker or a script: nothing in this process is invalidated
+    db = database.SessionLocal()
+    try:
+        food = Food(kind="salads", price=100, cook_time=10, image="food.jpeg", food_name=name, description="test",
+                    rating=4, restaurant_id=restaurant_id)
+        db.add(food)
+        db.commit()
+        return food.food_id
+    finally:
+        db.close()
+
+
+def revalidate(client, url: str, etag: str):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_insert_from_another_session_changes_the_list_etag(client, restaurant_id):
+    add_food(restaurant_id, "first")
+    first = client.get(ALL_FOODS)
+    assert revalidate(client, ALL_FOODS, first.headers["etag"]).status_code == 304
+
+    add_food(restaurant_id, "second")
+    response = revalidate(client, ALL_FOODS, first.headers["etag"])
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert "second" in [food["food_name"] for food in response.json()["foods"]]
+
+
+def test_update_and_delete_from_another_session_change_the_item_etag(client, restaurant_id):
+    food_id = add_food(restaurant_id, "changing")
+    url = f"/api/food/get_food_by_id/{food_id}"
+    first = client.get(url)
+
+    db = database.SessionLocal()
+    try:
+        db.get(Food, food_id).price = 250
+        db.commit()
+    finally:
+        db.close()
+    updated = revalidate(client, url, first.headers["etag"])
+
+    assert updated.status_code == 200
+    assert updated.json()["food"]["price"] == 250
+
+    listed = client.get(ALL_FOODS)
+    db = database.SessionLocal()
+    try:
+        db.delete(db.get(Food, add_food(restaurant_id, "deleted")))
+        db.commit()
+    finally:
+        db.close()
+
+    assert revalidate(client, ALL_FOODS, listed.headers["etag"]).status_code == 200
+
+
+def test_if_modified_since(client, restaurant_id):
+    url = f"/api/food/get_food_by_id/{add_food(restaurant_id, 'dated')}"
+    response = client.get(url)
+    last_modified = response.headers["last-modified"]
+    earlier = email.utils.formatdate(time.time() - 3600, usegmt=True)
+
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get(url, headers={"If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match wins when both are sent
+    assert client.get(url, headers={"If-Modified-Since": last_modified,
+                                    "If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,96 @@
+"""The orphaned image sweep against uploads running at the same time in other processes.
+
+    python -m pytest tests/test_image_store.py
+"""
+import io
+import os
+import time
+
+import pytest
+
+import database
+from core import config
+from models.models import Food, Restaurant
+from services import image_store
+
+PNG = b"\x89PNG\r\n\x1a\n"
+HOUR_AGO = time.time() - 3600
+
+
+@pytest.fixture(autouse=True)
+def images(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "IMAGE_VARIANTS", False)
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+def store(content: bytes, modified: float = HOUR_AGO) -> str:
+    name = image_store.save_file("food", io.BytesIO(PNG + content))
+    os.utime(image_store.image_path("food", name), (modified, modified))
+    return name
+
+
+def stored(name: str) -> bool:
+    return os.path.exists(image_store.image_path("food", name))
+
+
+def test_sweep_deletes_old_unreferenced_files_and_their_variants(db):
+    orphan, used, fresh = store(b"orphan"), store(b"used"), store(b"fresh", time.time())
+    variant = image_store.image_path("food", orphan.replace(".png", ".thumb.webp"))
+    open(variant, "wb").close()
+
+    restaurant = Restaurant(restaurant_name="images", kind="cafe", description="test",
+                            restaurant_email="images@example.com", phone_number="0", address="test",
+                            logo="logo.png", background_image="background.jpeg", rating=4.5)
+    db.add(restaurant)
+    db.flush()
+    db.add(Food(kind="salads", price=1, cook_time=10, image=used, food_name="salad", description="test", rating=4,
+                restaurant_id=restaurant.restaurant_id))
+    db.commit()
+
+    assert image_store.sweep_orphans(db, grace=60) == 1
+    assert not stored(orphan) and not os.path.exists(variant)
+    assert stored(used) and stored(fresh)
+    assert not any(name.startswith(image_store.TRASH_PREFIX) for name in os.listdir(image_store.image_dir("food")))
+
+
+def test_upload_after_the_file_was_moved_aside_writes_it_again(db, monkeypatch):
+    name = store(b"uploaded again")
+    reads = []
+
+    def referenced_names(db, kind):
+        # The second read comes after the rename: another worker stores the same image right then
+        reads.append(kind)
+        if len(reads) == 2:
+            assert image_store.save_file("food", io.BytesIO(PNG + b"uploaded again")) == name
+        return set()
+
+    monkeypatch.setattr(image_store, "referenced_names", referenced_names)
+
+    assert image_store.sweep_orphans(db, grace=60) == 1
+    assert stored(name)
+    with open(image_store.image_path("food", name), "rb") as file_object:
+        assert file_object.read() == PNG + b"uploaded again"
+
+
+def test_file_referenced_while_moved_aside_is_put_back(db, monkeypatch):
+    name = store(b"referenced meanwhile")
+    reads = iter([set(), {name}])
+    monkeypatch.setattr(image_store, "referenced_names", lambda db, kind: next(reads))
+
+    assert image_store.sweep_orphans(db, grace=60) == 0
+    assert stored(name)
+
+
+def test_reuse_refreshes_the_mtime(db):
+    name = store(b"reused")
+
+    assert image_store.find_stored("food", name.removesuffix(".png")) == name
+    assert os.path.getmtime(image_store.image_path("food", name)) > HOUR_AGO + 60
+    assert image_store.sweep_orphans(db, grace=60) == 0
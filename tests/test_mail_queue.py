@@ -0,0 +1,155 @@
+"""The mail queue against a stand-in SMTP server on 127.0.0.1: batching, connection reuse and retries.
+
+    python -m pytest tests/test_mail_queue.py
+"""
+import io
+import socketserver
+import threading
+import time
+
+import pytest
+
+from core import config
+from services import mail_queue as mail_queue_module
+from services.mail_queue import MailQueue
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib. server.replies holds the RCPT reply codes to give a recipient, in order."""
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 test ESMTP")
+        recipients = []
+
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                codes = self.server.replies.get(address)
+                code = codes.pop(0) if codes else 250
+                if code == 250:
+                    recipients.append(address)
+                self.reply(f"{code} {'OK' if code == 250 else 'not accepted'}")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.release.wait(10)
+                self.server.delivered.extend(recipients)
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                # EHLO, MAIL, RSET, NOOP
+                recipients = [] if verb in ("MAIL", "RSET") else recipients
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.replies = {}
+    server.delivered = []
+    # Cleared to hold every message in DATA until it is set again
+    server.release = threading.Event()
+    server.release.set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def local_queue(server, **options) -> MailQueue:
+    return MailQueue("127.0.0.1", server.server_address[1], sender="app@example.com", use_ssl=False,
+                     **{"backoff": 0.01, "max_retries": 2, **options})
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_queued_messages_share_one_connection(smtp_server):
+    mail = local_queue(smtp_server)
+    recipients = [f"user{number}@example.com" for number in range(5)]
+    for recipient in recipients:
+        mail.enqueue("subject", "body", recipient)
+    mail.join()
+    mail.close()
+
+    assert smtp_server.delivered == recipients
+    assert smtp_server.connections == mail.connections == 1
+    assert mail.stats()["sent"] == 5
+
+
+def test_temporary_error_is_retried(smtp_server):
+    smtp_server.replies["later@example.com"] = [451]
+    mail = local_queue(smtp_server)
+    mail.enqueue("subject", "body", "later@example.com")
+    mail.join()
+    mail.close()
+
+    assert smtp_server.delivered == ["later@example.com"]
+    assert (mail.sent, mail.retries, mail.failed) == (1, 1, 0)
+
+
+def test_permanent_error_is_not_retried(smtp_server):
+    smtp_server.replies["nobody@example.com"] = [550, 250]
+    mail = local_queue(smtp_server)
+    mail.enqueue("subject", "body", "nobody@example.com")
+    mail.join()
+    mail.close()
+
+    assert smtp_server.delivered == []
+    assert (mail.sent, mail.retries, mail.failed) == (0, 0, 1)
+
+
+def test_retry_waits_without_holding_up_the_queue(smtp_server):
+    smtp_server.replies["later@example.com"] = [451]
+    mail = local_queue(smtp_server, backoff=60)
+    mail.enqueue("subject", "body", "later@example.com")
+    mail.enqueue("subject", "body", "next@example.com")
+
+    assert wait_for(lambda: "next@example.com" in smtp_server.delivered)
+    assert mail.stats()["waiting_for_retry"] == 1
+
+    # Closing gives the waiting message its last attempt right away
+    mail.close()
+    assert smtp_server.delivered == ["next@example.com", "later@example.com"]
+
+
+def test_registration_returns_before_the_mail_is_delivered(client, smtp_server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "IMAGE_VARIANTS", False)
+    mail = local_queue(smtp_server)
+    monkeypatch.setattr(mail_queue_module, "mail_queue", mail)
+    monkeypatch.setattr("services.service_email.mail_queue", mail)
+    smtp_server.release.clear()
+
+    response = client.post("/api/auth/add-user",
+                           data={"name": "new", "email": "new@example.com", "password": "secret",
+                                 "confirm_password": "secret", "phone_number": "0"},
+                           files={"profile_image": ("me.png", io.BytesIO(PNG), "image/png")})
+
+    assert response.status_code == 201, response.text
+    assert smtp_server.delivered == []
+
+    smtp_server.release.set()
+    mail.join()
+    mail.close()
+    assert smtp_server.delivered == ["new@example.com"]
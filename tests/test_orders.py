@@ -0,0 +1,124 @@
+"""Placing orders: price snapshots, Idempotency-Key replays and the errors a client can get back.
+
+    python -m pytest tests/test_orders.py
+"""
+
+import pytest
+
+import database
+from core import security
+from models.models import User, Food, Drinks, Restaurant, Order, IdempotencyKey
+
+PLACE_ORDER = "/api/orders/place_order"
+
+
+@pytest.fixture(scope="module")
+def data():
+    db = database.SessionLocal()
+    try:
+        restaurant = Restaurant(restaurant_name="orders", kind="cafe", description="test",
+                                restaurant_email="orders@example.com", phone_number="0", address="test",
+                                logo="logo.png", background_image="background.jpeg", rating=4.5)
+        db.add(restaurant)
+        db.flush()
+
+        food = Food(kind="salads", price=1200, cook_time=10, image="food.jpeg", food_name="salad",
+                    description="test", rating=4, restaurant_id=restaurant.restaurant_id)
+        drink = Drinks(kind="juices", price=500, image="drink.jpeg", drink_name="juice", description="test",
+                       rating=4, restaurant_id=restaurant.restaurant_id)
+        users = [User(name="user", email=f"orders-{number}@example.com", password="not used", phone_number="0",
+                      status=True) for number in range(2)]
+        db.add_all([food, drink, *users])
+        db.commit()
+
+        return {"food_id": food.food_id, "drink_id": drink.drink_id, "user_ids": [user.user_id for user in users]}
+    finally:
+        db.close()
+
+
+def auth(user_id: int, key: str | None = None) -> dict:
+    headers = {"Authorization": f"Bearer {security.create_access_token({'user_id': user_id})}"}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return headers
+
+
+def order_body(data, address: str = "Main street 1") -> dict:
+    return {"address_to": address, "lines": [{"food_id": data["food_id"], "quantity": 2},
+                                             {"drink_id": data["drink_id"], "quantity": 1}]}
+
+
+def count_rows(model, **filters) -> int:
+    db = database.SessionLocal()
+    try:
+        return db.query(model).filter_by(**filters).count()
+    finally:
+        db.close()
+
+
+def test_order_snapshots_the_prices(client, data):
+    response = client.post(PLACE_ORDER, json=order_body(data), headers=auth(data["user_ids"][0]))
+
+    assert response.status_code == 201, response.text
+    content = response.json()
+    assert content["total_price"] == 2 * 1200 + 500
+    assert [line["unit_price"] for line in content["lines"]] == [1200, 500]
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_retry_with_the_same_key_replays_the_order(client, data):
+    user_id = data["user_ids"][0]
+    first = client.post(PLACE_ORDER, json=order_body(data), headers=auth(user_id, "replay"))
+    retry = client.post(PLACE_ORDER, json=order_body(data), headers=auth(user_id, "replay"))
+
+    assert first.status_code == 201, first.text
+    assert retry.status_code == 200, retry.text
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert count_rows(IdempotencyKey, user_id=user_id, key="replay") == 1
+    assert count_rows(Order, user_id=user_id, address_to="Main street 1") == 2
+
+
+def test_same_key_with_another_payload_is_rejected(client, data):
+    user_id = data["user_ids"][0]
+    assert client.post(PLACE_ORDER, json=order_body(data), headers=auth(user_id, "changed")).status_code == 201
+
+    response = client.post(PLACE_ORDER, json=order_body(data, "Other street 2"), headers=auth(user_id, "changed"))
+
+    assert response.status_code == 422
+    assert count_rows(Order, user_id=user_id, address_to="Other street 2") == 0
+
+
+def test_keys_are_per_user(client, data):
+    first, second = data["user_ids"]
+    assert client.post(PLACE_ORDER, json=order_body(data), headers=auth(first, "shared")).status_code == 201
+
+    response = client.post(PLACE_ORDER, json=order_body(data), headers=auth(second, "shared"))
+
+    assert response.status_code == 201
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_unknown_item_is_404_and_places_nothing(client, data):
+    user_id = data["user_ids"][1]
+    before = count_rows(Order, user_id=user_id)
+    body = {"address_to": "Nowhere 404", "lines": [{"food_id": data["food_id"], "quantity": 1},
+                                                  {"drink_id": 999999, "quantity": 1}]}
+
+    response = client.post(PLACE_ORDER, json=body, headers=auth(user_id, "unknown"))
+
+    assert response.status_code == 404
+    assert "drink 999999" in response.json()["detail"]["message"]
+    assert count_rows(Order, user_id=user_id) == before
+    assert count_rows(IdempotencyKey, user_id=user_id, key="unknown") == 0
+
+
+@pytest.mark.parametrize("line", [{"quantity": 1}, {"food_id": 1, "drink_id": 1, "quantity": 1}])
+def test_line_needs_exactly_one_item(client, data, line):
+    response = client.post(PLACE_ORDER, json={"address_to": "a", "lines": [line]}, headers=auth(data["user_ids"][0]))
+
+    assert response.status_code == 422
+
+
+def test_placing_an_order_needs_a_user(client, data):
+    assert client.post(PLACE_ORDER, json=order_body(data)).status_code == 401
@@ -0,0 +1,135 @@
+"""Cursor (after=) pagination: every row exactly once while the table changes, and bad cursors rejected.
+
+    python -m pytest tests/test_pagination.py
+"""
+import base64
+import itertools
+
+import pytest
+from sqlalchemy import insert
+
+import database
+from models.models import Food, Restaurant
+from services import pagination
+from services.cache import catalog_cache
+
+FOODS = 55
+# Few distinct prices, so sorting by price needs the food_id tie-breaker in the cursor
+PRICES = 4
+
+restaurant_numbers = itertools.count()
+
+
+@pytest.fixture
+def restaurant_id():
+    db = database.SessionLocal()
+    try:
+        number = next(restaurant_numbers)
+        restaurant = Restaurant(restaurant_name=f"pages {number}", kind="cafe", description="test",
+                                restaurant_email=f"pages{number}@example.com", phone_number="0", address="test",
+                                logo="logo.png", background_image="background.jpeg", rating=4.5)
+        db.add(restaurant)
+        db.flush()
+        add_foods(db, restaurant.restaurant_id, range(FOODS))
+        db.commit()
+        return restaurant.restaurant_id
+    finally:
+        db.close()
+
+
+def add_foods(db, restaurant_id: int, numbers):
+    db.execute(insert(Food.__table__), [
+        dict(kind="salads", price=number % PRICES, cook_time=10, image="food.jpeg", food_name=f"page food {number}",
+             description="test", rating=4, restaurant_id=restaurant_id) for number in numbers
+    ])
+
+
+def food_ids(restaurant_id: int, **order) -> list[int]:
+    db = database.SessionLocal()
+    try:
+        columns = [Food.price, Food.food_id] if order.get("sort") == "price" else [Food.food_id]
+        if order.get("order") == "desc":
+            columns = [column.desc() for column in columns]
+        return [row.food_id for row in db.query(Food.food_id).filter(Food.restaurant_id == restaurant_id)
+                .order_by(*columns)]
+    finally:
+        db.close()
+
+
+def page(client, restaurant_id: int, after: str, **order) -> dict:
+    response = client.get("/api/food", params={"restaurant_id": restaurant_id, "after": after, **order})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("order", [{}, {"sort": "price"}, {"sort": "price", "order": "desc"}])
+def test_pages_cover_every_row_once(client, restaurant_id, order):
+    seen = []
+    after = ""
+    while after is not None:
+        content = page(client, restaurant_id, after, **order)
+        assert len(content["foods"]) <= pagination.PER_PAGE
+        seen.extend(food["food_id"] for food in content["foods"])
+        after = content["next_cursor"]
+
+    assert seen == food_ids(restaurant_id, **order)
+
+
+def test_cursor_is_stable_while_rows_change(client, restaurant_id):
+    first = page(client, restaurant_id, "")
+    seen = [food["food_id"] for food in first["foods"]]
+
+    # A row before the cursor goes away and new rows are added after it
+    db = database.SessionLocal()
+    try:
+        db.query(Food).filter(Food.food_id == seen[0]).delete()
+        add_foods(db, restaurant_id, range(FOODS, FOODS + 3))
+        db.commit()
+    finally:
+        db.close()
+    catalog_cache.clear()
+
+    after = first["next_cursor"]
+    while after is not None:
+        content = page(client, restaurant_id, after)
+        seen.extend(food["food_id"] for food in content["foods"])
+        after = content["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == FOODS + 3
+    assert seen[1:] == food_ids(restaurant_id)
+
+
+def cursor(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+TAMPERED = [
+    "not base64 !",
+    cursor(b"\xff\xfe"),
+    cursor(b"{}"),
+    cursor(b"[]"),
+    cursor(b'"12"'),
+    pagination.encode_cursor(["12"]),
+    pagination.encode_cursor([None]),
+    pagination.encode_cursor([True]),
+    pagination.encode_cursor([1.5]),
+    pagination.encode_cursor([[1]]),
+    pagination.encode_cursor([{"food_id": 1}]),
+    pagination.encode_cursor([1, 2]),
+]
+
+
+@pytest.mark.parametrize("url", [
+    "/api/food",
+    "/api/food/get_all_salads",
+    "/api/drink/get_all_drinks",
+    "/api/restaurant/get_all_restaurants",
+    "/api/favorite_foods/get_all_favorite_foods_by_user_id/1",
+    "/api/favorite_restaurants/get_all_favorite_restaurants_by_user_id/1",
+])
+@pytest.mark.parametrize("after", TAMPERED)
+def test_malformed_cursor_is_rejected(client, url, after):
+    response = client.get(url, params={"after": after})
+
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == {"message": "Invalid cursor"}
@@ -0,0 +1,114 @@
+"""Read replica routing with two SQLite files: reads go to the replica, except right after the client's own write.
+
+    python -m pytest tests/test_read_replicas.py
+"""
+import itertools
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import database
+from core import config, security
+from models.models import User, Card
+
+CARDS = "/api/cards/get-all-cards-by-user"
+
+
+@pytest.fixture(scope="module")
+def replica(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('replica')}/replica.db")
+    database.Base.metadata.create_all(engine)
+    replica_sessions = [sessionmaker(autocommit=False, autoflush=False, bind=engine)]
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(database, "ReplicaSessionLocals", replica_sessions)
+        patch.setattr(database, "replica_sessions", itertools.cycle(replica_sessions))
+        yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def user_id(replica):
+    # The same user on both, with a card only the replica has (as if the primary's cards hadn't replicated yet)
+    ids = []
+    for session_class in (database.SessionLocal, sessionmaker(bind=replica)):
+        db = session_class()
+        try:
+            user = User(name="user", email="replicas@example.com", password="not used", phone_number="0",
+                        status=True)
+            db.add(user)
+            db.flush()
+            if session_class is not database.SessionLocal:
+                db.add(Card(card_number=1, card_valid_thru="01/2030", card_name="replica", card_cvv=123,
+                            user_id=user.user_id))
+            db.commit()
+            ids.append(user.user_id)
+        finally:
+            db.close()
+
+    assert ids[0] == ids[1]
+    return ids[0]
+
+
+@pytest.fixture
+def engines_used(replica):
+    used = []
+    listeners = [(database.engine, lambda *args: used.append("primary")),
+                 (replica, lambda *args: used.append("replica"))]
+    for engine, listener in listeners:
+        event.listen(engine, "before_cursor_execute", listener)
+    yield used
+    for engine, listener in listeners:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {security.create_access_token({'user_id': user_id})}"}
+
+
+def card_names(client, user_id: int, engines_used: list) -> list[str]:
+    # Cold, so get_current_user has to load the user too
+    security.principal_cache.clear()
+    engines_used.clear()
+
+    response = client.get(CARDS, headers=auth(user_id))
+    assert response.status_code == 200, response.text
+    return [card["card_name"] for card in response.json()]
+
+
+@pytest.fixture(autouse=True)
+def no_cookies(client):
+    client.cookies.clear()
+    yield
+    client.cookies.clear()
+
+
+def test_reads_go_to_the_replica(client, user_id, engines_used):
+    assert card_names(client, user_id, engines_used) == ["replica"]
+    # Both the user lookup and the cards query
+    assert engines_used == ["replica", "replica"]
+
+
+def test_read_after_own_write_goes_to_the_primary(client, user_id, engines_used):
+    response = client.post("/api/cards/add-card", headers=auth(user_id),
+                           json={"card_number": 2, "card_valid_thru": "01/2031", "card_name": "primary",
+                                 "card_cvv": 456})
+    assert response.status_code == 200, response.text
+    assert database.WRITE_COOKIE in response.cookies
+
+    assert card_names(client, user_id, engines_used) == ["primary"]
+    assert set(engines_used) == {"primary"}
+
+
+@pytest.mark.parametrize("written_at", [
+    time.time() - config.READ_YOUR_WRITES_SECONDS - 1,
+    time.time() + 3600,
+    "soon",
+])
+def test_old_or_invalid_cookie_reads_from_the_replica(client, user_id, engines_used, written_at):
+    client.cookies.set(database.WRITE_COOKIE, str(written_at))
+
+    assert card_names(client, user_id, engines_used) == ["replica"]
+    assert set(engines_used) == {"replica"}
@@ -0,0 +1,103 @@
+"""Opening hours as minute-of-week intervals: spans past midnight and past the end of the week, and bad input.
+
+    python -m pytest tests/test_schedule_index.py
+"""
+
+import pytest
+
+import database
+from models.models import Restaurant
+from services.schedule_index import DAY, WEEK, ScheduleIndex, interval
+
+SUNDAY = 6 * DAY
+# 2026-10-19 is a Monday
+MONDAY_1AM = "2026-10-19T01:00:00"
+MONDAY_2AM = "2026-10-19T02:00:00"
+
+
+def test_overnight_span_ends_next_day():
+    assert interval("Friday", "20:00", "03:30") == (4 * DAY + 20 * 60, 5 * DAY + 3 * 60 + 30)
+
+
+def test_sunday_night_span_ends_past_the_week():
+    assert interval("sun", "22:00", "02:00") == (SUNDAY + 22 * 60, WEEK + 2 * 60)
+
+
+def test_equal_times_are_open_around_the_clock():
+    assert interval("Monday", "00:00", "00:00") == (0, DAY)
+
+
+@pytest.mark.parametrize("day_of_week, opening_time, closing_time, field", [
+    ("Funday", "09:00", "18:00", "day_of_week"),
+    ("Monday", "25:00", "18:00", "opening_time"),
+    ("Monday", "09:00", "18:60", "closing_time"),
+    ("Monday", "09:00", "six", "closing_time"),
+])
+def test_invalid_values_name_their_field(day_of_week, opening_time, closing_time, field):
+    with pytest.raises(ValueError, match=field):
+        interval(day_of_week, opening_time, closing_time)
+
+
+def test_index_wraps_past_the_end_of_the_week():
+    index = ScheduleIndex([(1, *interval("Sunday", "22:00", "02:00")), (2, *interval("Monday", "09:00", "18:00"))])
+
+    assert index.open_at(SUNDAY + 23 * 60) == [1]
+    assert index.open_at(60) == [1]
+    assert index.open_at(2 * 60) == []
+    assert index.open_at(10 * 60) == [2]
+
+
+def test_index_merges_overlapping_rows():
+    index = ScheduleIndex([(1, *interval("Monday", "09:00", "14:00")), (1, *interval("Monday", "12:00", "18:00"))])
+
+    assert index.open_at(13 * 60) == [1]
+    assert index.open_at(17 * 60) == [1]
+    assert len(index.starts) == 1
+
+
+@pytest.fixture(scope="module")
+def restaurant_id():
+    db = database.SessionLocal()
+    try:
+        restaurant = Restaurant(restaurant_name="night owl", kind="cafe", description="test",
+                                restaurant_email="owl@example.com", phone_number="0", address="test",
+                                logo="logo.png", background_image="background.jpeg", rating=4.5)
+        db.add(restaurant)
+        db.commit()
+        return restaurant.restaurant_id
+    finally:
+        db.close()
+
+
+def add_work_time(client, restaurant_id: int, day_of_week: str, opening_time: str, closing_time: str):
+    return client.post("/api/restaurant/work-time/add",
+                       json={"restaurant_id": restaurant_id, "day_of_week": day_of_week,
+                             "opening_time": opening_time, "closing_time": closing_time})
+
+
+def open_ids(client, at: str, expand: bool) -> list[int]:
+    response = client.get("/api/restaurant/work-time/open", params={"at": at, "expand": expand})
+    assert response.status_code == 200, response.text
+    content = response.json()
+    if expand:
+        return [restaurant["restaurant_id"] for restaurant in content["restaurants"]]
+    return content["restaurant_ids"]
+
+
+@pytest.mark.parametrize("expand", [False, True])
+def test_sunday_night_is_open_early_monday(client, restaurant_id, expand):
+    assert add_work_time(client, restaurant_id, "Sunday", "22:00", "02:00").status_code == 201
+
+    assert restaurant_id in open_ids(client, MONDAY_1AM, expand)
+    assert restaurant_id not in open_ids(client, MONDAY_2AM, expand)
+    # 21:00 UTC on Sunday is 01:00 on Monday in Asia/Yerevan
+    assert restaurant_id in open_ids(client, "2026-10-18T21:00:00+00:00", expand)
+
+
+@pytest.mark.parametrize("day_of_week, opening_time, field", [("Funday", "09:00", "day_of_week"),
+                                                              ("Monday", "9am", "opening_time")])
+def test_add_rejects_invalid_values(client, restaurant_id, day_of_week, opening_time, field):
+    response = add_work_time(client, restaurant_id, day_of_week, opening_time, "18:00")
+
+    assert response.status_code == 400
+    assert field in response.json()["detail"]
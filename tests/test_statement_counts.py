@@ -0,0 +1,169 @@
+"""SQL statements per request for the endpoints that load related rows.
+
+Every endpoint is called for an owner with a single related row and for one with many. The number of
+statements has to be the same (no query per row), so a lazy load slipping back in fails here.
+
+    python -m pytest tests/test_statement_counts.py
+"""
+
+import pytest
+from sqlalchemy import event, insert
+
+import database
+from core import security
+from models.models import (User, Card, Food, Drinks, Restaurant, WorkTime, FavoriteFood,
+                           FavoriteRestaurant, Order, OrderLine)
+from services import favorites
+from services.cache import catalog_cache
+
+# Related rows of the "few" and the "many" owner
+FEW = 1
+MANY = 40
+
+
+def add_restaurants(db, group: str, count: int) -> list[int]:
+    db.execute(insert(Restaurant.__table__), [
+        dict(restaurant_name=f"{group} {number}", kind="cafe", description="test",
+             restaurant_email=f"{group}-{number}@example.com", phone_number="0", address="test", logo="logo.png",
+             background_image="background.jpeg", rating=4.5) for number in range(count)
+    ])
+    return [row.restaurant_id for row in db.query(Restaurant.restaurant_id)
+            .filter(Restaurant.restaurant_email.like(f"{group}-%")).order_by(Restaurant.restaurant_id)]
+
+
+def add_menu(db, restaurant_id: int, count: int) -> list[int]:
+    db.execute(insert(Food.__table__), [
+        dict(kind=("salads", "soups")[number % 2], price=number, cook_time=10, image="food.jpeg",
+             food_name=f"food {number}", description="test", rating=4, restaurant_id=restaurant_id)
+        for number in range(count)
+    ])
+    db.execute(insert(Drinks.__table__), [
+        dict(kind="juices", price=number, image="drink.jpeg", drink_name=f"drink {number}", description="test",
+             rating=4, restaurant_id=restaurant_id) for number in range(count)
+    ])
+    db.execute(insert(WorkTime.__table__), [
+        dict(day_of_week="Monday", opening_time="09:00", closing_time="18:00", restaurant_id=restaurant_id,
+             open_minute=540 + number, close_minute=1080) for number in range(count)
+    ])
+    return [row.food_id for row in db.query(Food.food_id).filter(Food.restaurant_id == restaurant_id)]
+
+
+def add_user(db, email: str, count: int, food_ids: list[int], restaurant_ids: list[int]) -> int:
+    user = User(name="user", email=email, password="not used", phone_number="0", status=True)
+    db.add(user)
+    db.flush()
+
+    db.execute(insert(Card.__table__), [
+        dict(card_number=number, card_valid_thru="01/2030", card_name="user", card_cvv=123, user_id=user.user_id)
+        for number in range(count)
+    ])
+    db.execute(insert(FavoriteFood.__table__), [
+        dict(user_id=user.user_id, food_id=food_id) for food_id in food_ids[:count]
+    ])
+    db.execute(insert(FavoriteRestaurant.__table__), [
+        dict(user_id=user.user_id, restaurant_id=restaurant_id) for restaurant_id in restaurant_ids[:count]
+    ])
+    db.execute(insert(Order.__table__), [
+        dict(address_to="test", user_id=user.user_id, total_price=count) for _ in range(count)
+    ])
+    db.execute(insert(OrderLine.__table__), [
+        dict(order_id=row.order_id, food_id=food_id, quantity=1, unit_price=1)
+        for row in db.query(Order.order_id).filter(Order.user_id == user.user_id) for food_id in food_ids[:count]
+    ])
+    return user.user_id
+
+
+@pytest.fixture(scope="module")
+def data():
+    db = database.SessionLocal()
+    try:
+        few_restaurant, many_restaurant = add_restaurants(db, "owner", 2)
+        add_menu(db, few_restaurant, FEW)
+        food_ids = add_menu(db, many_restaurant, MANY)
+        restaurant_ids = [few_restaurant, many_restaurant] + add_restaurants(db, "favorite", MANY)
+
+        users = {"few": add_user(db, "few@example.com", FEW, food_ids, restaurant_ids),
+                 "many": add_user(db, "many@example.com", MANY, food_ids, restaurant_ids)}
+        db.commit()
+    finally:
+        db.close()
+
+    return {"restaurants": {"few": few_restaurant, "many": many_restaurant}, "users": users}
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(database.engine, "before_cursor_execute", record)
+
+
+def count_statements(client, statements, url: str, **kwargs) -> int:
+    # Cold caches, so the request really loads what it returns
+    catalog_cache.clear()
+    favorites.favorites_cache.clear()
+    security.principal_cache.clear()
+    statements.clear()
+
+    response = client.get(url, **kwargs)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def auth(user_id: int) -> dict:
+    return {"headers": {"Authorization": f"Bearer {security.create_access_token({'user_id': user_id})}"}}
+
+
+@pytest.mark.parametrize("url", [
+    "/api/restaurant/menu/{restaurant}",
+    "/api/restaurant/work-time/get_all_work_times/{restaurant}",
+])
+def test_restaurant_endpoints(client, statements, data, url):
+    few = count_statements(client, statements, url.format(restaurant=data["restaurants"]["few"]))
+    many = count_statements(client, statements, url.format(restaurant=data["restaurants"]["many"]))
+    assert few == many
+
+
+def test_menu_loads_everything(client, data):
+    content = client.get(f"/api/restaurant/menu/{data['restaurants']['many']}").json()
+    assert sum(len(foods) for foods in content["foods"].values()) == MANY
+    assert len(content["drinks"]["juices"]) == MANY
+    assert len(content["work_times"]) == MANY
+
+
+@pytest.mark.parametrize("url", [
+    "/api/favorite_foods/get_all_favorite_foods_by_user_id/{user}?expand=true",
+    "/api/favorite_foods/get_all_favorite_foods_by_user_id/{user}?expand=true&after=",
+    "/api/favorite_restaurants/get_all_favorite_restaurants_by_user_id/{user}?expand=true",
+    "/api/favorite_restaurants/get_all_favorite_restaurants_by_user_id/{user}?expand=true&after=",
+    "/api/favorites/contains/{user}?food_ids=1&food_ids=2&restaurant_ids=1",
+])
+def test_favorites_endpoints(client, statements, data, url):
+    few = count_statements(client, statements, url.format(user=data["users"]["few"]))
+    many = count_statements(client, statements, url.format(user=data["users"]["many"]))
+    assert few == many
+
+
+@pytest.mark.parametrize("url", ["/api/auth/profile", "/api/cards/get-all-cards-by-user", "/api/orders/get_orders"])
+def test_user_endpoints(client, statements, data, url):
+    few = count_statements(client, statements, url, **auth(data["users"]["few"]))
+    many = count_statements(client, statements, url, **auth(data["users"]["many"]))
+    assert few == many
+
+
+def test_profile_loads_everything(client, data):
+    content = client.get("/api/auth/profile", **auth(data["users"]["many"])).json()
+    assert len(content["cards"]) == len(content["favorite_foods"]) == MANY
+    assert len(content["favorite_restaurants"]) == len(content["orders"]) == MANY
+    assert "password" not in content["user"]
+    assert all("card_cvv" not in card for card in content["cards"])
+
+
+def test_orders_load_their_lines(client, data):
+    content = client.get("/api/orders/get_orders", **auth(data["users"]["many"])).json()
+    assert all(len(order["lines"]) == MANY for order in content["orders"])